@@ -6,12 +6,14 @@ Este script proporciona una interfaz unificada para ejecutar todos los
 componentes del análisis de series temporales.
 
 Uso:
-    python main.py --modo [analisis|dashboard|notebook]
+    python main.py --modo [analisis|dashboard|notebook|catalogo|sql]
     
 Opciones:
     analisis  : Ejecuta el análisis básico y genera reportes
     dashboard : Lanza el dashboard web interactivo
     notebook  : Abre Jupyter Lab con el notebook de análisis
+    catalogo  : Lista las series disponibles leyendo solo los encabezados
+    sql       : Ejecuta una consulta SQL sobre la base del modelo procesado
     completo  : Ejecuta análisis y lanza dashboard
 """
 
@@ -53,32 +55,28 @@ def verificar_dependencias():
         print("   Ejecuta: pip install -r requirements.txt")
         return False
 
-def ejecutar_analisis():
+def ejecutar_analisis(workers=None, usar_cache=True, compacto=None,
+                      origen='data/raw/Datos_Series_Leo.xlsx'):
     """Ejecuta el análisis básico de las series"""
     print("🔄 Ejecutando análisis básico...")
     
     try:
         # Importar y ejecutar análisis
-        from src.analizar_series import construir_modelo
-        from src.utils import limpiar_dataframe
+        from src.ingesta_multiple import resolver_libros
+        from src.modelo import cargar_modelo_canonico
         from scripts.generar_dataframe_categorias import generar_dataframes_categorias
         
-        archivo_excel = 'data/raw/Datos_Series_Leo.xlsx'
-        
-        if not os.path.exists(archivo_excel):
-            print(f"❌ No se encontró el archivo: {archivo_excel}")
+        if not resolver_libros(origen):
+            print(f"❌ No se encontró el archivo: {origen}")
             print("   Por favor, coloca el archivo en la carpeta data/raw/")
             return False
         
-        # Cargar y procesar datos
-        metadatos, datos = construir_modelo(archivo_excel)
-        datos = limpiar_dataframe(datos)
+        # Cargar el modelo canónico (series válidas, limpias y enriquecidas)
+        metadatos_validos, datos_finales = cargar_modelo_canonico(
+            origen, usar_cache=usar_cache, workers=workers, compacto=compacto
+        )
         
         # Generar análisis por categorías
-        metadatos_validos = metadatos.dropna(subset=['tipo', 'categoria'])
-        series_validas = metadatos_validos['id_serie'].unique()
-        datos_finales = datos[datos['id_serie'].isin(series_validas)]
-        
         df_por_tipo, df_por_categoria = generar_dataframes_categorias(
             metadatos_validos, datos_finales
         )
@@ -112,7 +110,8 @@ def ejecutar_analisis():
         print(f"❌ Error durante el análisis: {e}")
         return False
 
-def lanzar_dashboard():
+def lanzar_dashboard(workers=None, usar_cache=True, compacto=None,
+                     origen='data/raw/Datos_Series_Leo.xlsx', carga_diferida=None):
     """Lanza el dashboard web interactivo modular"""
     print("🚀 Lanzando dashboard web modular...")
     
@@ -120,7 +119,10 @@ def lanzar_dashboard():
         from visualizations.dashboard_modular import SeriesTemporalesDashboard
         print("📊 Dashboard modular iniciado")
         
-        dashboard = SeriesTemporalesDashboard()
+        dashboard = SeriesTemporalesDashboard(
+            origen, workers=workers, usar_cache=usar_cache, compacto=compacto,
+            carga_diferida=carga_diferida
+        )
         dashboard.run(debug=False)
         
     except ImportError:
@@ -146,44 +148,54 @@ def abrir_notebook():
         print(f"❌ Error al abrir notebook: {e}")
         return False
 
-def generar_reportes():
-    """Genera reportes automáticos en múltiples formatos"""
+def generar_reportes(workers=None, usar_cache=True, compacto=None,
+                     origen='data/raw/Datos_Series_Leo.xlsx', fuera_de_memoria=False):
+    """
+    Genera reportes automáticos en múltiples formatos
+
+    Con fuera_de_memoria, las estadísticas y el gráfico de resumen salen de
+    agregados por bloques (ver src.agregacion.agregar_fuera_de_memoria) y el
+    modelo nunca se carga completo; la mediana y los cuartiles son estimados.
+    Las hojas se leen de a una, por lo que no admite workers.
+    """
     print("📊 Generando reportes automáticos...")
     
     try:
         # Importar módulos necesarios
-        from src.analizar_series import construir_modelo
-        from src.utils import limpiar_dataframe
+        from src.ingesta_multiple import resolver_libros
+        from src.agregacion import agregar_fuera_de_memoria
+        from src.almacen_series import AlmacenSeries
+        from src.modelo import cargar_modelo_canonico
         from src.reportes import GeneradorReportes
         
-        archivo_excel = 'data/raw/Datos_Series_Leo.xlsx'
+        if fuera_de_memoria and workers:
+            print("❌ --workers no se puede usar con --fuera-de-memoria: las hojas se leen de a una")
+            return False
         
-        if not os.path.exists(archivo_excel):
-            print(f"❌ No se encontró el archivo: {archivo_excel}")
+        if not resolver_libros(origen):
+            print(f"❌ No se encontró el archivo: {origen}")
             print("   Por favor, coloca el archivo en la carpeta data/raw/")
             return False
         
-        # Cargar y procesar datos
-        print("🔄 Cargando datos...")
-        metadatos, datos = construir_modelo(archivo_excel)
-        datos = limpiar_dataframe(datos)
-        
-        # Filtrar datos válidos
-        metadatos_validos = metadatos.dropna(subset=['tipo', 'categoria'])
-        series_validas = metadatos_validos['id_serie'].unique()
-        datos_finales = datos[datos['id_serie'].isin(series_validas)]
-        
-        # Agregar información de tipo y categoría
-        datos_finales['tipo'] = datos_finales['id_serie'].map(
-            metadatos_validos.set_index('id_serie')['tipo']
-        )
-        datos_finales['categoria'] = datos_finales['id_serie'].map(
-            metadatos_validos.set_index('id_serie')['categoria']
-        )
-        
-        # Generar reportes
-        print("🔄 Generando reportes...")
-        generador = GeneradorReportes(datos_finales, metadatos_validos)
+        if fuera_de_memoria:
+            # Agregar por bloques: de la caché del modelo canónico o de a una hoja
+            print("🔄 Agregando datos por bloques...")
+            metadatos_validos, agregado = agregar_fuera_de_memoria(
+                origen, con_graficos=True, usar_cache=usar_cache
+            )
+            print("🔄 Generando reportes...")
+            generador = GeneradorReportes(None, metadatos_validos, agregado=agregado)
+        else:
+            # Cargar y procesar datos
+            print("🔄 Cargando datos...")
+            metadatos_validos, datos_finales = cargar_modelo_canonico(
+                origen, usar_cache=usar_cache, workers=workers, compacto=compacto
+            )
+            
+            # Generar reportes
+            print("🔄 Generando reportes...")
+            almacen = AlmacenSeries.desde_modelo(metadatos_validos, datos_finales)
+            generador = GeneradorReportes(datos_finales, metadatos_validos, almacen)
         
         # Generar todos los formatos
         archivos_generados = generador.generar_todos_formatos()
@@ -246,6 +258,72 @@ def listar_reportes():
         print(f"❌ Error al listar reportes: {e}")
         return False
 
+def listar_catalogo(origen='data/raw/Datos_Series_Leo.xlsx'):
+    """Lista las series disponibles leyendo solo los encabezados de las hojas"""
+    print("📋 Listando catálogo de series...")
+    
+    try:
+        from src.analizar_series import escanear_catalogo
+        from src.ingesta_multiple import resolver_libros
+        
+        libros = resolver_libros(origen)
+        if not libros:
+            print(f"❌ No se encontró el archivo: {origen}")
+            return False
+        
+        for libro in libros:
+            catalogo = escanear_catalogo(libro)
+            print(f"\n📄 {libro.name}: {len(catalogo)} series en {catalogo['hoja'].nunique()} hojas")
+            resumen = catalogo.groupby(['tipo', 'categoria']).size()
+            for (tipo, categoria), series in resumen.items():
+                print(f"   - {tipo} / {categoria}: {series}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error al listar el catálogo: {e}")
+        return False
+
+def consultar_base_sql(consulta=None, workers=None, usar_cache=True,
+                       origen='data/raw/Datos_Series_Leo.xlsx'):
+    """Ejecuta una consulta SQL sobre la base SQLite del modelo procesado"""
+    print("🗄️ Consultando la base SQL del modelo...")
+    
+    try:
+        import time
+        from src.base_sql import abrir_base_sql, consultar_sql
+        from src.ingesta_multiple import resolver_libros
+        
+        if not resolver_libros(origen):
+            print(f"❌ No se encontró el archivo: {origen}")
+            return False
+        
+        ruta = abrir_base_sql(origen, usar_cache=usar_cache, workers=workers)
+        print(f"📁 Base: {ruta}")
+        
+        if not consulta:
+            tablas = consultar_sql(
+                "SELECT name AS tabla, type AS tipo FROM sqlite_master "
+                "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY type, name",
+                ruta
+            )
+            print(tablas.to_string(index=False))
+            print("\n💡 Ejemplo:")
+            print('   python main.py --modo sql --consulta "SELECT tipo, COUNT(*) AS series '
+                  'FROM series GROUP BY tipo"')
+            return True
+        
+        inicio = time.perf_counter()
+        resultado = consultar_sql(consulta, ruta)
+        milisegundos = (time.perf_counter() - inicio) * 1000
+        print(resultado.to_string(index=False, max_rows=50))
+        print(f"\n⏱️ {len(resultado)} filas en {milisegundos:.1f} ms")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error en la consulta SQL: {e}")
+        return False
+
 def mostrar_ayuda():
     """Muestra información de ayuda"""
     print("""
@@ -289,6 +367,25 @@ con múltiples opciones de visualización y generación de reportes automáticos
 6. Análisis Completo + Dashboard:
    python main.py --modo completo
 
+7. Catálogo de Series (solo encabezados, sin leer los datos):
+   python main.py --modo catalogo
+
+8. Consultas SQL sobre el modelo procesado (SQLite en data/processed/):
+   python main.py --modo sql --consulta "SELECT tipo, COUNT(*) FROM series GROUP BY tipo"
+   Tablas: series, observaciones, resumen_series y la vista datos
+
+⚙️ Opciones:
+   --workers N    Lee las hojas del Excel en N procesos en paralelo
+   --sin-cache    Ignora la caché del modelo y vuelve a leer el Excel
+   --compacto     Usa tipos compactos (categóricas) para reducir memoria
+   --origen RUTA  Libro, carpeta o patrón (ej. 'data/raw/*.xlsx') a ingerir;
+                  con varios libros los id_serie se prefijan con el archivo
+   --carga-diferida  Dashboard con solo el catálogo en memoria; cada serie
+                  se lee al seleccionarla (un único libro)
+   --consulta SQL Sentencia a ejecutar en el modo sql (sin ella, lista las tablas)
+   --fuera-de-memoria  Reportes agregando los datos por bloques, sin cargar
+                  el modelo completo (mediana y cuartiles estimados)
+
 📊 Funcionalidades de Reportes:
 - Generación automática de PDF, Word y HTML
 - Gráficos embebidos y estadísticas detalladas
@@ -321,10 +418,49 @@ def main():
     )
     parser.add_argument(
         '--modo', 
-        choices=['analisis', 'dashboard', 'notebook', 'reportes', 'listar-reportes', 'completo', 'help'],
+        choices=['analisis', 'dashboard', 'notebook', 'reportes', 'listar-reportes', 'catalogo',
+                 'sql', 'completo', 'help'],
         default='help',
         help='Modo de ejecución'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Procesos para leer las hojas del Excel en paralelo (por defecto INGESTA_CONFIG)'
+    )
+    parser.add_argument(
+        '--sin-cache',
+        action='store_true',
+        help='Ignora la caché de data/processed/cache y vuelve a leer el Excel'
+    )
+    parser.add_argument(
+        '--compacto',
+        action='store_true',
+        default=None,
+        help='Carga el modelo con columnas categóricas (por defecto INGESTA_CONFIG)'
+    )
+    parser.add_argument(
+        '--origen',
+        default='data/raw/Datos_Series_Leo.xlsx',
+        help='Libro Excel, carpeta o patrón glob con los libros a ingerir'
+    )
+    parser.add_argument(
+        '--carga-diferida',
+        action='store_true',
+        default=None,
+        help='Dashboard: arranca con el catálogo y lee cada serie al pedirla (por defecto DASHBOARD_CONFIG)'
+    )
+    parser.add_argument(
+        '--consulta',
+        default=None,
+        help='Modo sql: sentencia SQL a ejecutar sobre la base del modelo procesado'
+    )
+    parser.add_argument(
+        '--fuera-de-memoria',
+        action='store_true',
+        help='Modo reportes: agrega los datos por bloques sin cargar el modelo completo'
+    )
     
     args = parser.parse_args()
     
@@ -344,25 +480,33 @@ def main():
         return
     
     # Ejecutar según el modo seleccionado
+    usar_cache = not args.sin_cache
+    
     if args.modo == 'analisis':
-        ejecutar_analisis()
+        ejecutar_analisis(args.workers, usar_cache, args.compacto, args.origen)
         
     elif args.modo == 'dashboard':
-        lanzar_dashboard()
+        lanzar_dashboard(args.workers, usar_cache, args.compacto, args.origen, args.carga_diferida)
         
     elif args.modo == 'notebook':
         abrir_notebook()
         
     elif args.modo == 'reportes':
-        generar_reportes()
+        generar_reportes(args.workers, usar_cache, args.compacto, args.origen, args.fuera_de_memoria)
         
     elif args.modo == 'listar-reportes':
         listar_reportes()
         
+    elif args.modo == 'catalogo':
+        listar_catalogo(args.origen)
+        
+    elif args.modo == 'sql':
+        consultar_base_sql(args.consulta, args.workers, usar_cache, args.origen)
+        
     elif args.modo == 'completo':
-        if ejecutar_analisis():
+        if ejecutar_analisis(args.workers, usar_cache, args.compacto, args.origen):
             print("\n" + "="*50)
-            lanzar_dashboard()
+            lanzar_dashboard(args.workers, usar_cache, args.compacto, args.origen, args.carga_diferida)
     
     print("\n🎯 Proceso completado")
 
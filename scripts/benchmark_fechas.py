@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Mide la conversión de fechas de una hoja con la capa de fechas.py
+
+Arma en memoria las celdas de fecha de una hoja grande (la columna de fechas
+y las dos filas de fecha del encabezado, una celda por serie) y compara el
+parseo anterior (pd.to_datetime sobre la columna y una llamada por celda del
+encabezado) con convertir_fechas, para fechas tipadas, seriales de Excel y
+texto. Las columnas de valores no intervienen en el parseo de fechas, por lo
+que no se generan.
+
+Con seriales y texto día/mes el resultado difiere del anterior a propósito:
+antes los seriales se leían como nanosegundos desde 1970 y los textos
+ambiguos como mes/día.
+"""
+
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.fechas import EPOCA_EXCEL, convertir_fechas, inferir_formato
+
+
+def celdas_de_hoja(variante, n_filas, n_columnas):
+    """Devuelve (columna de fechas, filas de encabezado) como celdas crudas"""
+    fechas = pd.date_range('1900-03-01', periods=n_filas, freq='D')
+    inicios = fechas[np.arange(n_columnas) % n_filas]
+    fines = fechas[-1 - np.arange(n_columnas) % n_filas]
+
+    def como_celdas(indice):
+        if variante == 'tipadas':
+            return np.array(indice.to_pydatetime(), dtype=object)
+        if variante == 'seriales':
+            dias = (indice.to_numpy() - EPOCA_EXCEL) / np.timedelta64(1, 'D')
+            return dias.astype(object)
+        return np.array(indice.strftime('%d/%m/%Y'), dtype=object)
+
+    return como_celdas(fechas), np.stack([como_celdas(inicios), como_celdas(fines)])
+
+
+def parseo_anterior(columna, encabezado):
+    """Parseo previo: to_datetime sobre la columna y una llamada por celda del encabezado"""
+    # Las celdas ambiguas se parseaban con mes primero, avisando en cada una
+    warnings.simplefilter('ignore', UserWarning)
+    fechas = pd.to_datetime(pd.Series(columna), errors='coerce').to_numpy()
+    limites = [
+        pd.DatetimeIndex([pd.to_datetime(valor, errors='coerce') for valor in fila]).to_numpy()
+        for fila in encabezado
+    ]
+    return fechas, limites
+
+
+def parseo_nuevo(columna, encabezado):
+    """Parseo con fechas.py: un formato por parte de la hoja y una llamada para todo el encabezado"""
+    formato_encabezado = inferir_formato(encabezado.ravel())
+    formato_datos = inferir_formato(columna, preferido=formato_encabezado)
+    if formato_datos != formato_encabezado:
+        formato_encabezado = inferir_formato(encabezado.ravel(), preferido=formato_datos)
+    fechas = convertir_fechas(columna, formato_datos)
+    limites = convertir_fechas(encabezado.ravel(), formato_encabezado).reshape(2, -1)
+    return fechas, list(limites)
+
+
+def medir(funcion, repeticiones, *args):
+    """Devuelve el mejor tiempo de funcion y su resultado"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parseo de fechas de una hoja")
+    parser.add_argument('--filas', type=int, default=50_000, help="Filas de la columna de fechas")
+    parser.add_argument('--columnas', type=int, default=2_000, help="Series (celdas por fila de encabezado)")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Repeticiones por variante")
+    args = parser.parse_args()
+
+    print(f"📄 Hoja sintética: {args.filas} filas de fechas x {args.columnas} series")
+    for variante in ('tipadas', 'seriales', 'texto'):
+        columna, encabezado = celdas_de_hoja(variante, args.filas, args.columnas)
+        t_anterior, (fechas_ant, limites_ant) = medir(parseo_anterior, args.repeticiones, columna, encabezado)
+        t_nuevo, (fechas, limites) = medir(parseo_nuevo, args.repeticiones, columna, encabezado)
+
+        validas = np.count_nonzero(~np.isnat(fechas))
+        coinciden = np.array_equal(fechas_ant.astype(fechas.dtype), fechas, equal_nan=True) and all(
+            np.array_equal(a.astype(b.dtype), b, equal_nan=True) for a, b in zip(limites_ant, limites)
+        )
+        print(f"⏱️ {variante:<9} anterior {t_anterior:7.3f} s | nuevo {t_nuevo:7.3f} s | "
+              f"x{t_anterior / t_nuevo:6.1f} | fechas válidas {validas} | "
+              f"{'iguales' if coinciden else 'distintas'} al anterior")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Compara los motores de lectura de Excel sobre un mismo libro
+
+Mide el tiempo de construir_modelo con cada motor disponible y verifica que
+todos produzcan los mismos metadatos y datos.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.crear_datos_ejemplo import crear_libro_sintetico
+from src.analizar_series import construir_modelo
+from src.lectores_excel import motores_disponibles
+
+
+def medir_motor(ruta, motor, repeticiones):
+    """Devuelve el mejor tiempo de construir_modelo y el resultado obtenido"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = construir_modelo(ruta, motor=motor, workers=1)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores de lectura de Excel")
+    parser.add_argument('--archivo', help="Libro a leer (por defecto se genera uno sintético)")
+    parser.add_argument('--hojas', type=int, default=3, help="Hojas del libro sintético")
+    parser.add_argument('--columnas', type=int, default=200, help="Series por hoja del libro sintético")
+    parser.add_argument('--filas', type=int, default=400, help="Filas de datos del libro sintético")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Repeticiones por motor")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = args.archivo
+        if ruta is None:
+            ruta = crear_libro_sintetico(
+                Path(directorio) / 'benchmark.xlsx',
+                n_hojas=args.hojas, n_columnas=args.columnas, n_filas=args.filas
+            )
+            print(f"📄 Libro sintético: {args.hojas} hojas x {args.columnas} series x {args.filas} filas")
+
+        resultados = {}
+        for motor in motores_disponibles():
+            tiempo, resultados[motor] = medir_motor(ruta, motor, args.repeticiones)
+            print(f"⏱️ {motor:<10} {tiempo:8.3f} s")
+
+    motores = list(resultados)
+    metadatos_ref, datos_ref = resultados[motores[0]]
+    for motor in motores[1:]:
+        metadatos, datos = resultados[motor]
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+    print(f"✅ Resultados idénticos entre motores: {', '.join(motores)}")
+
+
+if __name__ == "__main__":
+    main()
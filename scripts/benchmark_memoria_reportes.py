@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Mide la memoria pico de una corrida de reportes según el formato de la caché
+
+Para cada formato del modelo canónico (CACHE_CONFIG['formato_modelo']) arma
+la caché de un libro y luego, en un proceso nuevo, repite lo que hace
+main.generar_reportes antes de escribir los archivos: carga el modelo desde
+la caché, arma el almacén, calcula las estadísticas de GeneradorReportes y
+el gráfico de resumen. Informa la memoria residente pico de ese proceso por
+encima de la que tenía después de importar los módulos (en Linux el pico se
+reinicia con /proc/self/clear_refs para no contar el de las importaciones).
+
+Con Arrow, la caché se mapea en memoria y fecha, valor y clave_serie no se
+copian; con Parquet se decodifica el archivo y se convierte a pandas.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+FORMATOS = ('parquet', 'arrow')
+
+
+def memoria_pico_mb():
+    """
+    Memoria residente pico del proceso actual, en MB.
+
+    En Linux se lee VmHWM: ru_maxrss se hereda del proceso padre a través de
+    exec y no se reinicia con clear_refs.
+    """
+    try:
+        for linea in Path('/proc/self/status').read_text().splitlines():
+            if linea.startswith('VmHWM:'):
+                return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reiniciar_pico():
+    """Lleva el pico de memoria residente al valor actual (solo Linux)"""
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+    except OSError:
+        pass
+
+
+def corrida_de_reportes(libro, directorio_cache, formato):
+    """Carga el modelo de la caché y arma lo que usan los reportes; devuelve las mediciones"""
+    from src.almacen_series import AlmacenSeries
+    from src.config import CACHE_CONFIG
+    from src.modelo import cargar_modelo_canonico
+    from src.reportes import GeneradorReportes
+    from src.reportes.utils_reportes import crear_grafico_resumen
+
+    reiniciar_pico()
+    base = memoria_pico_mb()
+    inicio = time.perf_counter()
+    with patch.dict(CACHE_CONFIG, {'directorio': directorio_cache, 'formato_modelo': formato}):
+        metadatos, datos = cargar_modelo_canonico(libro)
+        carga = memoria_pico_mb() - base
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+        generador = GeneradorReportes(datos, metadatos, almacen)
+        crear_grafico_resumen(datos, metadatos, almacen)
+    return {
+        'carga_mb': carga,
+        'pico_mb': memoria_pico_mb() - base,
+        'segundos': time.perf_counter() - inicio,
+        'total_datos': generador.estadisticas['total_datos'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de los reportes por formato de caché")
+    parser.add_argument('--archivo', help="Libro a leer (por defecto se genera uno sintético)")
+    parser.add_argument('--hojas', type=int, default=4, help="Hojas del libro sintético")
+    parser.add_argument('--columnas', type=int, default=500, help="Series por hoja del libro sintético")
+    parser.add_argument('--filas', type=int, default=1000, help="Filas de datos del libro sintético")
+    parser.add_argument('--medir', nargs=3, metavar=('LIBRO', 'CACHE', 'FORMATO'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(corrida_de_reportes(*args.medir)))
+        return
+
+    from scripts.crear_datos_ejemplo import crear_libro_sintetico
+    from src.config import CACHE_CONFIG
+    from src.modelo import cargar_modelo_canonico
+
+    with tempfile.TemporaryDirectory() as directorio:
+        libro = args.archivo
+        if libro is None:
+            libro = crear_libro_sintetico(
+                Path(directorio) / 'benchmark.xlsx',
+                n_hojas=args.hojas, n_columnas=args.columnas, n_filas=args.filas
+            )
+            print(f"📄 Libro sintético: {args.hojas} hojas x {args.columnas} series x {args.filas} filas")
+
+        for formato in FORMATOS:
+            cache = str(Path(directorio) / f"cache_{formato}")
+            with patch.dict(CACHE_CONFIG, {'directorio': cache, 'formato_modelo': formato}):
+                cargar_modelo_canonico(libro)
+            salida = subprocess.run(
+                [sys.executable, __file__, '--medir', str(libro), cache, formato],
+                capture_output=True, text=True, check=True
+            ).stdout
+            medida = json.loads(salida.strip().splitlines()[-1])
+            print(f"⏱️ {formato:<8} carga {medida['carga_mb']:7.1f} MB | pico {medida['pico_mb']:7.1f} MB | "
+                  f"{medida['segundos']:6.2f} s | {medida['total_datos']} filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Compara las estadísticas de reportes en un solo proceso y repartidas en workers
+
+Genera un libro sintético (o usa --archivo), arma el modelo canónico y mide
+generar_estadisticas en el proceso actual contra estadisticas_en_paralelo y
+resumir_series con distinta cantidad de procesos worker. La ganancia depende
+de los núcleos disponibles: con uno solo, el reparto solo agrega el costo de
+escribir el archivo Arrow y levantar el pool.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.crear_datos_ejemplo import crear_libro_sintetico
+from src.analizar_series import construir_modelo
+from src.modelo import preparar_modelo
+from src.procesamiento_paralelo import estadisticas_en_paralelo, resumir_series
+from src.reportes.utils_reportes import generar_estadisticas
+
+
+def medir(funcion, repeticiones):
+    """Devuelve el mejor tiempo de varias ejecuciones de funcion"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del análisis repartido en procesos worker")
+    parser.add_argument('--archivo', help="Libro a leer (por defecto se genera uno sintético)")
+    parser.add_argument('--hojas', type=int, default=4, help="Hojas del libro sintético")
+    parser.add_argument('--columnas', type=int, default=500, help="Series por hoja del libro sintético")
+    parser.add_argument('--filas', type=int, default=1000, help="Filas de datos del libro sintético")
+    parser.add_argument('--workers', type=int, nargs='+', help="Cantidades de workers a medir")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, nucleos})
+
+    with tempfile.TemporaryDirectory() as directorio:
+        libro = args.archivo or crear_libro_sintetico(
+            Path(directorio) / 'benchmark.xlsx',
+            n_hojas=args.hojas, n_columnas=args.columnas, n_filas=args.filas
+        )
+        metadatos, datos = preparar_modelo(*construir_modelo(libro))
+
+    print(f"📄 Modelo: {len(metadatos)} series, {len(datos)} filas; {nucleos} núcleos")
+    base = medir(lambda: generar_estadisticas(datos, metadatos), args.repeticiones)
+    print(f"⏱️ generar_estadisticas (un proceso): {base:.3f} s")
+    for n in workers:
+        estadisticas = medir(lambda: estadisticas_en_paralelo(metadatos, datos, workers=n), args.repeticiones)
+        resumen = medir(lambda: resumir_series(metadatos, datos, workers=n), args.repeticiones)
+        print(f"⏱️ {n:>2} workers: estadisticas_en_paralelo {estadisticas:.3f} s "
+              f"(x{base / estadisticas:.2f}) | resumir_series {resumen:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
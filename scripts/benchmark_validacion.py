@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Mide el costo de la validación de calidad frente a la lectura del libro
+
+Construye el modelo de un libro (sintético o indicado) con construir_modelo,
+mide validacion.validar_modelo sobre el resultado y muestra qué fracción del
+tiempo de lectura agrega la validación.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.crear_datos_ejemplo import crear_libro_sintetico
+from src.analizar_series import construir_modelo
+from src.validacion import imprimir_reporte_calidad, validar_modelo
+
+
+def medir(funcion, repeticiones, *args):
+    """Devuelve el mejor tiempo de funcion y su resultado"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la validación de calidad")
+    parser.add_argument('--archivo', help="Libro a leer (por defecto se genera uno sintético)")
+    parser.add_argument('--hojas', type=int, default=4, help="Hojas del libro sintético")
+    parser.add_argument('--columnas', type=int, default=250, help="Series por hoja del libro sintético")
+    parser.add_argument('--filas', type=int, default=600, help="Filas de datos del libro sintético")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Repeticiones por etapa")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = args.archivo
+        if ruta is None:
+            ruta = crear_libro_sintetico(
+                Path(directorio) / 'benchmark.xlsx',
+                n_hojas=args.hojas, n_columnas=args.columnas, n_filas=args.filas
+            )
+            print(f"📄 Libro sintético: {args.hojas} hojas x {args.columnas} series x {args.filas} filas")
+        t_lectura, (metadatos, datos) = medir(construir_modelo, 1, ruta)
+
+    t_validacion, calidad = medir(validar_modelo, args.repeticiones, metadatos, datos)
+    print(f"⏱️ lectura    {t_lectura:8.3f} s ({len(datos)} filas, {len(metadatos)} series)")
+    print(f"⏱️ validación {t_validacion:8.3f} s ({t_validacion / t_lectura:.1%} de la lectura)")
+    imprimir_reporte_calidad(calidad)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,73 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
+from openpyxl import Workbook
+
+def crear_libro_sintetico(ruta, n_hojas=3, n_columnas=50, n_filas=240,
+                          fraccion_vacia=0.2, semilla=0, fraccion_huecos=0.0,
+                          fechas_irregulares=False):
+    """
+    Crea un libro Excel sintético con la estructura esperada por construir_modelo.
+
+    Cada hoja tiene la fila 0 con nombres, las filas 1-5 con metadatos
+    (fecha inicio, tipo, categoría, unidad, fecha fin) y los datos desde
+    la fila 6, con la columna 0 como fechas mensuales. Una fracción de las
+    series termina antes que el resto para simular series cortas.
+
+    Args:
+        ruta: Ruta del archivo Excel a crear
+        n_hojas: Cantidad de hojas
+        n_columnas: Cantidad de series por hoja
+        n_filas: Cantidad de observaciones por serie
+        fraccion_vacia: Fracción de series que terminan a mitad del período
+        semilla: Semilla del generador aleatorio
+        fraccion_huecos: Fracción de celdas vacías dentro del período de cada
+            serie (huecos interiores, además de los finales)
+        fechas_irregulares: Si es True, la columna de fechas mezcla celdas de
+            fecha con fechas escritas como texto, repite una fecha en filas
+            consecutivas e incluye un texto que no es fecha
+
+    Returns:
+        str: Ruta del archivo creado
+    """
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range('1990-01-01', periods=n_filas, freq='MS').to_pydatetime()
+    tipos = ['Económico', 'Social', 'Ambiental', 'Financiero']
+    categorias = ['PIB', 'Inflación', 'Empleo', 'Población', 'Temperatura', 'Tasas']
+
+    celdas_fecha = list(fechas)
+    if fechas_irregulares:
+        # Fechas como texto en filas alternadas, una fecha repetida y un texto inválido
+        for i in range(1, n_filas, 3):
+            celdas_fecha[i] = fechas[i].strftime('%Y-%m-%d')
+        if n_filas > 4:
+            celdas_fecha[n_filas // 2] = celdas_fecha[n_filas // 2 - 1]
+            celdas_fecha[n_filas // 3] = 's/d'
+
+    libro = Workbook(write_only=True)
+    for h in range(n_hojas):
+        hoja = libro.create_sheet(f'Hoja{h + 1}')
+        largos = np.full(n_columnas, n_filas)
+        cortas = rng.random(n_columnas) < fraccion_vacia
+        largos[cortas] = rng.integers(1, n_filas, cortas.sum())
+        valores = rng.normal(100, 25, size=(n_filas, n_columnas)).round(4)
+        huecos = rng.random((n_filas, n_columnas)) < fraccion_huecos
+        # La primera observación se conserva para que el hueco quede dentro del período
+        huecos[0] = False
+
+        hoja.append(['Fecha'] + [f'Serie {c + 1}' for c in range(n_columnas)])
+        hoja.append([None] + [fechas[0]] * n_columnas)
+        hoja.append([None] + [tipos[(h + c) % len(tipos)] for c in range(n_columnas)])
+        hoja.append([None] + [categorias[c % len(categorias)] for c in range(n_columnas)])
+        hoja.append([None] + ['Unidades'] * n_columnas)
+        hoja.append([None] + [fechas[largo - 1] for largo in largos])
+        for i, fecha in enumerate(celdas_fecha):
+            fila = [fecha]
+            fila.extend(valores[i, c] if i < largos[c] and not huecos[i, c] else None for c in range(n_columnas))
+            hoja.append(fila)
+
+    libro.save(ruta)
+    return str(ruta)
 
 def crear_datos_ejemplo():
     """Crea un archivo Excel de ejemplo con el formato correcto"""
@@ -1,6 +1,6 @@
 import pandas as pd
-from src.analizar_series import construir_modelo
-from src.utils import limpiar_dataframe
+from src.catalogo import filtrar_por_claves
+from src.modelo import cargar_modelo_canonico
 import matplotlib.pyplot as plt
 
 def generar_dataframes_categorias(metadatos, datos):
@@ -10,40 +10,26 @@ def generar_dataframes_categorias(metadatos, datos):
     df_por_tipo = {}
     # Filtrar y agrupar los datos por tipo
     for tipo_unico in sorted(metadatos['tipo'].dropna().unique()):
-        ids = metadatos.loc[metadatos['tipo'] == tipo_unico, 'id_serie']
-        df_por_tipo[tipo_unico] = datos[datos['id_serie'].isin(ids)].copy()
+        claves = metadatos.loc[metadatos['tipo'] == tipo_unico, 'clave_serie']
+        df_por_tipo[tipo_unico] = filtrar_por_claves(datos, claves)
 
     df_por_categoria = {}
     # Filtrar y agrupar los datos por categoría
     for cat_unica in sorted(metadatos['categoria'].dropna().unique()):
-        ids = metadatos.loc[metadatos['categoria'] == cat_unica, 'id_serie']
-        df_por_categoria[cat_unica] = datos[datos['id_serie'].isin(ids)].copy()
+        claves = metadatos.loc[metadatos['categoria'] == cat_unica, 'clave_serie']
+        df_por_categoria[cat_unica] = filtrar_por_claves(datos, claves)
 
     return df_por_tipo, df_por_categoria
 
 
 if __name__ == '__main__':
-    # Cargar el modelo (metadatos y datos desde el archivo Excel)
-    metadatos_series, datos_series = construir_modelo('Datos_Series_Leo.xlsx')
-
-    # Limpieza previa de los datos (eliminar valores faltantes o incorrectos)
-    print(f"Total registros originales: {len(datos_series)}")
-    datos_series = limpiar_dataframe(datos_series)
-    print(f"Total registros luego de limpiar datos: {len(datos_series)}\n")
-
-    # Asegurar que metadatos tengan tipo y categoría válidos
-    metadatos_series = metadatos_series.dropna(subset=['tipo', 'categoria']).copy()
-    # Filtrar también los datos para que coincidan solo con series válidas
-    series_validas = metadatos_series['id_serie'].unique()
-    datos_series = datos_series[datos_series['id_serie'].isin(series_validas)].copy()
+    # Cargar el modelo canónico: datos limpios y solo series con tipo y categoría válidos
+    metadatos_series, datos_series = cargar_modelo_canonico('Datos_Series_Leo.xlsx')
+    print(f"Total registros de series válidas: {len(datos_series)}\n")
 
     # Generar diccionarios filtrados por tipo y por categoría
     df_por_tipo, df_por_categoria = generar_dataframes_categorias(metadatos_series, datos_series)
 
-    # Limpiar valores NaN de cada dataframe
-    df_por_tipo = {tipo: limpiar_dataframe(df) for tipo, df in df_por_tipo.items()}
-    df_por_categoria = {categoria: limpiar_dataframe(df) for categoria, df in df_por_categoria.items()}
-
     # Mostrar resumen por tipo
     print("== RESUMEN POR TIPO ==")
     for tipo, df in df_por_tipo.items():
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Reporte de memoria del modelo completo frente al modelo compacto
+
+Construye el modelo del libro indicado y muestra los bytes por columna de
+metadatos y datos antes y después de compactar_modelo.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analizar_series import construir_modelo
+from src.utils import compactar_modelo, reporte_memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reporte de memoria del modelo compacto")
+    parser.add_argument('--archivo', default='data/raw/Datos_Series_Leo.xlsx', help="Libro Excel a leer")
+    parser.add_argument('--float32', action='store_true', help="Guardar valor como float32")
+    args = parser.parse_args()
+
+    if not Path(args.archivo).exists():
+        print(f"❌ No se encontró el archivo: {args.archivo}")
+        return
+
+    print(f"🔄 Construyendo modelo de {args.archivo}...")
+    metadatos, datos = construir_modelo(args.archivo, compacto=False)
+    metadatos_c, datos_c = compactar_modelo(metadatos, datos, valor_float32=args.float32)
+
+    for nombre, antes, despues in [('metadatos', metadatos, metadatos_c), ('datos', datos, datos_c)]:
+        print(f"\n📊 {nombre} ({len(antes):,} filas)")
+        print(reporte_memoria(antes, despues).to_string(float_format=lambda x: f"{x:,.1f}"))
+
+
+if __name__ == "__main__":
+    main()
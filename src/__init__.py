@@ -3,12 +3,21 @@ Paquete para análisis de series temporales.
 
 Este paquete contiene módulos para:
 - Cargar y procesar datos desde Excel
-- Limpiar y transformar datos
+- Cachear el modelo procesado en formato columnar
+- Unir varios libros Excel en un único modelo
+- Limpiar, filtrar y enriquecer el modelo una sola vez (modelo canónico)
 - Generar análisis por categorías y tipos
+- Calcular estadísticas por bloques sin cargar todo el modelo en memoria
+- Repartir el análisis por fragmentos de series en procesos worker
 """
 
-from .analizar_series import construir_modelo
-from .utils import limpiar_dataframe
+from .agregacion import estadisticas_fuera_de_memoria
+from .analizar_series import construir_modelo, escanear_catalogo
+from .cache_modelo import construir_modelo_cacheado
+from .ingesta_multiple import construir_modelo_multiple
+from .modelo import cargar_modelo_canonico, preparar_modelo
+from .procesamiento_paralelo import estadisticas_en_paralelo, resumir_series
+from .utils import compactar_modelo, limpiar_dataframe
 
 __version__ = "1.0.0"
 __author__ = "Análisis de Datos" 
\ No newline at end of file
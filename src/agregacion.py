@@ -0,0 +1,467 @@
+"""
+Agregación por bloques para modelos que no entran en memoria
+
+Calcula las estadísticas de los reportes (ver reportes.generar_estadisticas)
+recorriendo datos en bloques de tamaño acotado y combinando agregados
+parciales, sin tener nunca todo el modelo en memoria:
+
+- Por grupo (global, por tipo y por categoría) se guardan cantidad,
+  promedio, suma de cuadrados de las desviaciones (M2), mínimo y máximo.
+  Dos parciales se combinan con la fórmula de Chan et al.; de ahí salen la
+  media y la desviación estándar muestral sin perder precisión como con
+  suma y suma de cuadrados crudas.
+- La mediana se estima con BosquejoCuantiles, un histograma de cubetas
+  logarítmicas (al estilo DDSketch) con error relativo acotado que también
+  se combina sumando cubetas. Como no es exacta, va en su propia clave
+  (valor_mediana_estimada, con su cota en error_relativo_mediana) y
+  valor_mediana solo se completa cuando se conoce la mediana exacta.
+
+Los bloques salen del archivo del modelo canónico en caché (Arrow IPC
+mapeado en memoria o Parquet leído por lotes), del modelo armado de a una
+hoja desde la caché por hoja o el libro (ver modelo.iterar_modelo_por_hojas),
+de un AlmacenSeries (con mmap, los arreglos se leen de a un slice) o de un
+DataFrame ya cargado.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache_modelo import _leer_frame, _leer_manifiesto
+from .config import CACHE_CONFIG, DATA_CONFIG
+from .ingesta_multiple import resolver_libros
+from .intercambio_arrow import EXTENSION_IPC, a_pandas, abrir_ipc
+from .modelo import _huella_modelo, _nombre_modelo, iterar_modelo_por_hojas
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depende del entorno
+    pq = None
+
+# Columnas de datos que necesita la agregación
+COLUMNAS_AGREGACION = ['fecha', 'valor', 'tipo', 'categoria']
+
+# Error relativo por defecto de los cuantiles estimados (unas 3500 cubetas por
+# cada factor 1000 de rango de magnitudes)
+PRECISION_CUANTILES = 0.001
+
+# Columnas de un resumen parcial (una fila por grupo)
+COLUMNAS_RESUMEN = ['cantidad', 'promedio', 'm2', 'minimo', 'maximo']
+
+class BosquejoCuantiles:
+    """Histograma logarítmico combinable para estimar cuantiles con error relativo acotado"""
+
+    def __init__(self, precision=PRECISION_CUANTILES):
+        """
+        Args:
+            precision: Error relativo máximo de los cuantiles estimados
+        """
+        self.precision = precision
+        self.gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = np.log(self.gamma)
+        self.positivos = pd.Series(dtype=np.int64)
+        self.negativos = pd.Series(dtype=np.int64)
+        self.ceros = 0
+
+    @property
+    def cantidad(self):
+        """Cantidad de valores agregados"""
+        return int(self.positivos.sum() + self.negativos.sum() + self.ceros)
+
+    def _cubetas(self, magnitudes):
+        """Cuenta magnitudes (> 0) por índice de cubeta logarítmica"""
+        indices = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        unicos, cuentas = np.unique(indices, return_counts=True)
+        return pd.Series(cuentas, index=unicos)
+
+    def agregar(self, valores):
+        """Agrega un arreglo de valores (los NaN se ignoran)"""
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        self.positivos = self.positivos.add(self._cubetas(valores[valores > 0]), fill_value=0).astype(np.int64)
+        self.negativos = self.negativos.add(self._cubetas(-valores[valores < 0]), fill_value=0).astype(np.int64)
+        self.ceros += int(np.count_nonzero(valores == 0))
+        return self
+
+    def combinar(self, otro):
+        """Suma las cubetas de otro bosquejo con la misma precisión"""
+        if otro.precision != self.precision:
+            raise ValueError("Solo se combinan bosquejos con la misma precisión")
+        self.positivos = self.positivos.add(otro.positivos, fill_value=0).astype(np.int64)
+        self.negativos = self.negativos.add(otro.negativos, fill_value=0).astype(np.int64)
+        self.ceros += otro.ceros
+        return self
+
+    def _representante(self, indice):
+        """Valor que representa a la cubeta (gamma^(i-1), gamma^i]"""
+        return 2 * self.gamma ** indice / (self.gamma + 1)
+
+    def _valor_en(self, rango):
+        """Valor aproximado del elemento de rango (base 0) en orden creciente"""
+        # Los negativos van de mayor a menor magnitud, luego los ceros y los positivos
+        negativos = self.negativos.sort_index(ascending=False)
+        acumulado = negativos.cumsum().to_numpy()
+        if rango < (acumulado[-1] if len(acumulado) else 0):
+            return -self._representante(negativos.index[np.searchsorted(acumulado, rango, side='right')])
+        rango -= acumulado[-1] if len(acumulado) else 0
+        if rango < self.ceros:
+            return 0.0
+        rango -= self.ceros
+        positivos = self.positivos.sort_index()
+        acumulado = positivos.cumsum().to_numpy()
+        return self._representante(positivos.index[np.searchsorted(acumulado, rango, side='right')])
+
+    def cuantil(self, q):
+        """
+        Estima el cuantil q (0 a 1), interpolando como pandas entre dos rangos.
+
+        Returns:
+            float: Cuantil estimado, o NaN si el bosquejo está vacío
+        """
+        cantidad = self.cantidad
+        if cantidad == 0:
+            return np.nan
+        posicion = q * (cantidad - 1)
+        bajo, alto = int(np.floor(posicion)), int(np.ceil(posicion))
+        fraccion = posicion - bajo
+        return (1 - fraccion) * self._valor_en(bajo) + fraccion * self._valor_en(alto)
+
+def _resumen_vacio():
+    """Resumen parcial sin grupos"""
+    return pd.DataFrame({columna: pd.Series(dtype=float) for columna in COLUMNAS_RESUMEN})
+
+def resumir(valores, grupos=None):
+    """
+    Resumen parcial de un bloque de valores, por grupo si se indican.
+
+    Args:
+        valores: Serie o arreglo de valores (los NaN se ignoran)
+        grupos: Etiquetas de grupo alineadas con valores; None para un único grupo
+
+    Returns:
+        pd.DataFrame: Columnas de COLUMNAS_RESUMEN, indexado por grupo
+    """
+    valores = np.asarray(valores, dtype=float)
+    if grupos is None:
+        codigos, etiquetas = np.zeros(len(valores), dtype=np.intp), pd.Index([0])
+    elif isinstance(getattr(grupos, 'dtype', None), pd.CategoricalDtype):
+        # Las categóricas ya traen sus códigos: no hace falta factorizar
+        codigos, etiquetas = np.asarray(grupos.cat.codes if isinstance(grupos, pd.Series) else grupos.codes), \
+            pd.Index(grupos.dtype.categories)
+    else:
+        grupos = np.asarray(grupos)
+        codigos, etiquetas = pd.factorize(grupos if grupos.dtype.kind in 'iuM' else grupos.astype(object))
+    validos = ~np.isnan(valores) & (codigos >= 0)
+    codigos, valores = codigos[validos], valores[validos]
+
+    cantidad = np.bincount(codigos, minlength=len(etiquetas))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio = np.bincount(codigos, valores, minlength=len(etiquetas)) / cantidad
+    m2 = np.bincount(codigos, (valores - promedio[codigos]) ** 2, minlength=len(etiquetas))
+    minimo = np.full(len(etiquetas), np.inf)
+    maximo = np.full(len(etiquetas), -np.inf)
+    np.minimum.at(minimo, codigos, valores)
+    np.maximum.at(maximo, codigos, valores)
+
+    presentes = cantidad > 0
+    return pd.DataFrame({
+        'cantidad': cantidad[presentes], 'promedio': promedio[presentes], 'm2': m2[presentes],
+        'minimo': minimo[presentes], 'maximo': maximo[presentes],
+    }, index=etiquetas[presentes])
+
+def combinar_resumenes(a, b):
+    """
+    Combina dos resúmenes parciales grupo por grupo (Chan et al.).
+
+    Returns:
+        pd.DataFrame: Resumen de la unión de ambos bloques
+    """
+    a, b = a.align(b, join='outer')
+    n_a, n_b = a['cantidad'].fillna(0), b['cantidad'].fillna(0)
+    n = n_a + n_b
+    delta = b['promedio'].fillna(0) - a['promedio'].fillna(0)
+    return pd.DataFrame({
+        'cantidad': n.astype(np.int64),
+        'promedio': (a['promedio'].fillna(0) * n_a + b['promedio'].fillna(0) * n_b) / n,
+        'm2': a['m2'].fillna(0) + b['m2'].fillna(0) + delta ** 2 * n_a * n_b / n,
+        'minimo': np.fmin(a['minimo'], b['minimo']),
+        'maximo': np.fmax(a['maximo'], b['maximo']),
+    })
+
+class AgregadoEstadisticas:
+    """Agregados parciales de las estadísticas de reportes, combinables entre bloques"""
+
+    def __init__(self, precision=PRECISION_CUANTILES, con_graficos=False):
+        """
+        Args:
+            precision: Error relativo de la mediana estimada (ver BosquejoCuantiles)
+            con_graficos: Si es True, también acumula lo que usa el gráfico de
+                resumen de los reportes: el promedio por mes y un bosquejo de
+                cuantiles por tipo (ver medias_mensuales y cajas_por_tipo)
+        """
+        self.resumen = _resumen_vacio()
+        self.por_tipo = _resumen_vacio()
+        self.por_categoria = _resumen_vacio()
+        self.bosquejo = BosquejoCuantiles(precision)
+        self.filas = 0
+        self.fecha_min = None
+        self.fecha_max = None
+        self.con_graficos = con_graficos
+        self.por_mes = _resumen_vacio()
+        self.bosquejos_por_tipo = {}
+
+    def agregar(self, bloque):
+        """
+        Agrega un bloque de datos.
+
+        Args:
+            bloque: DataFrame con fecha, valor, tipo y categoria
+
+        Returns:
+            AgregadoEstadisticas: self, para encadenar
+        """
+        valores = bloque['valor']
+        self.filas += len(bloque)
+        self.resumen = combinar_resumenes(self.resumen, resumir(valores))
+        self.por_tipo = combinar_resumenes(self.por_tipo, resumir(valores, bloque['tipo']))
+        self.por_categoria = combinar_resumenes(self.por_categoria, resumir(valores, bloque['categoria']))
+        self.bosquejo.agregar(valores)
+        if len(bloque):
+            fechas = bloque['fecha']
+            self.fecha_min = fechas.min() if self.fecha_min is None else min(self.fecha_min, fechas.min())
+            self.fecha_max = fechas.max() if self.fecha_max is None else max(self.fecha_max, fechas.max())
+        if self.con_graficos:
+            meses = bloque['fecha'].to_numpy().astype('datetime64[M]')
+            self.por_mes = combinar_resumenes(self.por_mes, resumir(valores, meses))
+            codigos, tipos = pd.factorize(bloque['tipo'])
+            valores = np.asarray(valores, dtype=float)
+            for codigo, tipo in enumerate(tipos):
+                bosquejo = self.bosquejos_por_tipo.setdefault(tipo, BosquejoCuantiles(self.bosquejo.precision))
+                bosquejo.agregar(valores[codigos == codigo])
+        return self
+
+    def combinar(self, otro):
+        """
+        Suma los agregados de otro AgregadoEstadisticas (por ejemplo, de otro proceso).
+
+        Returns:
+            AgregadoEstadisticas: self, para encadenar
+        """
+        self.filas += otro.filas
+        self.resumen = combinar_resumenes(self.resumen, otro.resumen)
+        self.por_tipo = combinar_resumenes(self.por_tipo, otro.por_tipo)
+        self.por_categoria = combinar_resumenes(self.por_categoria, otro.por_categoria)
+        self.bosquejo.combinar(otro.bosquejo)
+        self.por_mes = combinar_resumenes(self.por_mes, otro.por_mes)
+        for tipo, bosquejo in otro.bosquejos_por_tipo.items():
+            self.bosquejos_por_tipo.setdefault(tipo, BosquejoCuantiles(self.bosquejo.precision)).combinar(bosquejo)
+        for fecha, elegir in (('fecha_min', min), ('fecha_max', max)):
+            propia, ajena = getattr(self, fecha), getattr(otro, fecha)
+            setattr(self, fecha, ajena if propia is None else propia if ajena is None else elegir(propia, ajena))
+        return self
+
+    @staticmethod
+    def _tabla(resumen):
+        """Resumen por grupo con las columnas de groupby().agg(['count', 'mean', 'std', 'min', 'max'])"""
+        cantidad = resumen['cantidad'].astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            desviacion = np.sqrt(resumen['m2'] / (cantidad - 1)).where(cantidad > 1)
+        tabla = pd.DataFrame({
+            'count': cantidad, 'mean': resumen['promedio'], 'std': desviacion,
+            'min': resumen['minimo'], 'max': resumen['maximo'],
+        })
+        return tabla.sort_index()
+
+    def medias_mensuales(self):
+        """
+        Promedio de los valores de cada mes (requiere con_graficos).
+
+        Returns:
+            pd.DataFrame: Columnas fecha (primer día del mes) y valor, ordenado por fecha
+        """
+        medias = self.por_mes['promedio'].sort_index()
+        return pd.DataFrame({'fecha': pd.DatetimeIndex(medias.index), 'valor': medias.to_numpy()})
+
+    def cajas_por_tipo(self):
+        """
+        Cuartiles estimados y extremos exactos de los valores de cada tipo (requiere con_graficos).
+
+        Returns:
+            pd.DataFrame: Columnas q1, mediana, q3, minimo y maximo, indexado por tipo
+        """
+        cajas = pd.DataFrame({
+            'q1': {tipo: b.cuantil(0.25) for tipo, b in self.bosquejos_por_tipo.items()},
+            'mediana': {tipo: b.cuantil(0.5) for tipo, b in self.bosquejos_por_tipo.items()},
+            'q3': {tipo: b.cuantil(0.75) for tipo, b in self.bosquejos_por_tipo.items()},
+        }, columns=['q1', 'mediana', 'q3'])
+        return cajas.join(self.por_tipo[['minimo', 'maximo']]).sort_index()
+
+    def estadisticas(self, metadatos, mediana=None):
+        """
+        Arma el diccionario de generar_estadisticas con los agregados acumulados.
+
+        Los valores son exactos salvo redondeo de punto flotante, excepto la
+        mediana del bosquejo, que va en valor_mediana_estimada con su error
+        relativo máximo en error_relativo_mediana. valor_mediana queda en None
+        si no se indica la mediana exacta.
+
+        Args:
+            metadatos: Metadatos del modelo (una fila por serie)
+            mediana: Mediana exacta de los valores, si quien llama la conoce
+
+        Returns:
+            dict: Claves de reportes.generar_estadisticas, con
+                valor_mediana_estimada y error_relativo_mediana además en
+                estadisticas_numericas
+        """
+        globales = self._tabla(self.resumen).iloc[0] if len(self.resumen) else None
+        return {
+            'fecha_generacion': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'total_series': len(metadatos),
+            'total_datos': self.filas,
+            'rango_fechas': {
+                'inicio': pd.Timestamp(self.fecha_min).strftime('%Y-%m-%d'),
+                'fin': pd.Timestamp(self.fecha_max).strftime('%Y-%m-%d')
+            },
+            'tipos_unicos': metadatos['tipo'].nunique(),
+            'categorias_unicas': metadatos['categoria'].nunique(),
+            'estadisticas_numericas': {
+                'valor_min': globales['min'],
+                'valor_max': globales['max'],
+                'valor_promedio': globales['mean'],
+                'valor_mediana': mediana,
+                'valor_mediana_estimada': float(
+                    np.clip(self.bosquejo.cuantil(0.5), globales['min'], globales['max'])
+                ),
+                'error_relativo_mediana': self.bosquejo.precision,
+                'desviacion_estandar': globales['std']
+            },
+            'estadisticas_por_tipo': self._tabla(self.por_tipo).round(2).to_dict('index'),
+            'estadisticas_por_categoria': self._tabla(self.por_categoria).round(2).to_dict('index')
+        }
+
+def iterar_dataframe(datos, filas_por_bloque=None):
+    """Recorre un DataFrame ya cargado en bloques de filas_por_bloque filas"""
+    filas_por_bloque = filas_por_bloque or DATA_CONFIG['filas_por_bloque']
+    for inicio in range(0, len(datos), filas_por_bloque):
+        yield datos.iloc[inicio:inicio + filas_por_bloque]
+
+def iterar_archivo(ruta, filas_por_bloque=None, columnas=COLUMNAS_AGREGACION):
+    """
+    Lee un archivo guardado con _guardar_frame de a filas_por_bloque filas.
+
+    Un archivo Arrow IPC se mapea en memoria y se recorre en slices de la
+    tabla; con Parquet solo se decodifica un lote por vez. En ambos casos se
+    leen solo las columnas pedidas. Un pickle no admite lectura parcial y se
+    carga completo.
+    """
+    filas_por_bloque = filas_por_bloque or DATA_CONFIG['filas_por_bloque']
+    ruta = Path(ruta)
+    if ruta.suffix == EXTENSION_IPC:
+        tabla = abrir_ipc(ruta).select(list(columnas))
+        for inicio in range(0, tabla.num_rows, filas_por_bloque):
+            yield a_pandas(tabla.slice(inicio, filas_por_bloque))
+        return
+    if ruta.suffix != '.parquet' or pq is None:
+        yield from iterar_dataframe(_leer_frame(ruta)[list(columnas)], filas_por_bloque)
+        return
+    archivo = pq.ParquetFile(ruta)
+    for lote in archivo.iter_batches(batch_size=filas_por_bloque, columns=list(columnas)):
+        yield lote.to_pandas()
+
+def iterar_almacen(almacen, filas_por_bloque=None):
+    """
+    Recorre un AlmacenSeries en bloques de filas.
+
+    Cada bloque toma un slice de los arreglos (con el almacén abierto con
+    mmap solo se leen esas páginas) y agrega tipo y categoria por clave.
+    """
+    filas_por_bloque = filas_por_bloque or DATA_CONFIG['filas_por_bloque']
+    tipos = almacen.catalogo['tipo'].array
+    categorias = almacen.catalogo['categoria'].array
+    for inicio in range(0, almacen.filas, filas_por_bloque):
+        fin = inicio + filas_por_bloque
+        claves = almacen.claves_filas[inicio:fin]
+        yield pd.DataFrame({
+            'fecha': almacen.fechas[inicio:fin],
+            'valor': almacen.valores[inicio:fin],
+            'tipo': tipos.take(claves),
+            'categoria': categorias.take(claves),
+        })
+
+def estadisticas_por_bloques(bloques, metadatos, precision=PRECISION_CUANTILES):
+    """
+    Calcula las estadísticas de reportes recorriendo bloques de datos.
+
+    Args:
+        bloques: Iterable de DataFrames con fecha, valor, tipo y categoria
+            (ver iterar_archivo, iterar_almacen, iterar_dataframe)
+        metadatos: Metadatos del modelo
+        precision: Error relativo de la mediana estimada
+
+    Returns:
+        dict: Ver AgregadoEstadisticas.estadisticas
+    """
+    agregado = AgregadoEstadisticas(precision)
+    for bloque in bloques:
+        agregado.agregar(bloque)
+    return agregado.estadisticas(metadatos)
+
+def agregar_fuera_de_memoria(origen, filas_por_bloque=None, directorio_cache=None, con_graficos=False,
+                             usar_cache=True):
+    """
+    Agrega el modelo canónico de origen sin cargarlo completo.
+
+    Si el modelo canónico está vigente en caché (ver
+    modelo.cargar_modelo_canonico), su archivo de datos se lee de a
+    filas_por_bloque filas. Si no, el modelo se arma de a una hoja con
+    modelo.iterar_modelo_por_hojas (desde la caché por hoja o el libro) y
+    cada hoja se agrega y se descarta: nunca está en memoria más de una hoja.
+    En ambos casos solo se juntan completos los metadatos (una fila por serie).
+
+    Args:
+        origen: Libro, carpeta o patrón (ver ingesta_multiple.resolver_libros)
+        filas_por_bloque: Filas por bloque. Por defecto DATA_CONFIG['filas_por_bloque']
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+        con_graficos: Ver AgregadoEstadisticas
+        usar_cache: Si es False, no lee ni escribe ninguna caché: el modelo
+            siempre se arma de a una hoja desde el libro
+
+    Returns:
+        tuple: (metadatos, AgregadoEstadisticas)
+    """
+    directorio_cache = Path(directorio_cache or CACHE_CONFIG['directorio'])
+    agregado = AgregadoEstadisticas(con_graficos=con_graficos)
+    manifiesto = _leer_manifiesto(directorio_cache / f"{_nombre_modelo(origen)}.json") if usar_cache else None
+    if manifiesto and manifiesto.get('huella') == _huella_modelo(resolver_libros(origen)):
+        archivos = manifiesto['archivos']
+        for bloque in iterar_archivo(directorio_cache / archivos['datos'], filas_por_bloque):
+            agregado.agregar(bloque)
+        return _leer_frame(directorio_cache / archivos['metadatos']), agregado
+
+    partes = []
+    for metadatos, datos in iterar_modelo_por_hojas(origen, directorio_cache, usar_cache=usar_cache):
+        for bloque in iterar_dataframe(datos[COLUMNAS_AGREGACION], filas_por_bloque):
+            agregado.agregar(bloque)
+        partes.append(metadatos)
+    if not partes:
+        return pd.DataFrame(columns=['id_serie', 'tipo', 'categoria']), agregado
+    # clave_serie es local a cada hoja: no identifica a la serie en el origen
+    return pd.concat(partes, ignore_index=True).drop(columns='clave_serie'), agregado
+
+def estadisticas_fuera_de_memoria(origen, filas_por_bloque=None, directorio_cache=None):
+    """
+    Estadísticas de reportes del modelo canónico de origen sin cargarlo completo.
+
+    Args:
+        origen: Libro, carpeta o patrón (ver ingesta_multiple.resolver_libros)
+        filas_por_bloque: Filas por bloque. Por defecto DATA_CONFIG['filas_por_bloque']
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+
+    Returns:
+        dict: Ver AgregadoEstadisticas.estadisticas; valor_mediana queda en
+            None y la mediana va estimada en valor_mediana_estimada
+    """
+    metadatos, agregado = agregar_fuera_de_memoria(origen, filas_por_bloque, directorio_cache)
+    return agregado.estadisticas(metadatos)
@@ -0,0 +1,477 @@
+"""
+Almacén de series en arreglos contiguos
+
+Guarda las observaciones del modelo ordenadas por clave_serie (y por fecha
+dentro de cada serie) en arreglos NumPy, con un arreglo de desplazamientos
+al estilo CSR: las filas de la serie k ocupan el rango
+desplazamientos[k]:desplazamientos[k + 1]. Obtener una serie es un slice y
+obtener varias es concatenar sus rangos, sin recorrer todas las filas del
+modelo como hace una máscara booleana sobre el DataFrame largo.
+
+Como las fechas están ordenadas dentro de cada serie, las consultas por rango
+de fechas se resuelven con búsqueda binaria: en las series pedidas o, para
+todas las series, en un índice global de fechas ordenadas que se arma la
+primera vez que se usa. Del mismo modo, matriz() arma una sola vez la matriz
+alineada fecha × serie (ver matriz_alineada.py) para operaciones entre series.
+
+El almacén puede guardarse en disco como archivos .npy más el catálogo y
+abrirse mapeado en memoria (solo lectura): varios procesos que abren el mismo
+almacén comparten una única copia física a través de la caché de páginas del
+sistema operativo. La matriz alineada de un almacén guardado se escribe en
+su directorio la primera vez que se pide y también se comparte mapeada.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache_modelo import _guardar_frame, _leer_frame
+from .catalogo import construir_catalogo, enriquecer_datos
+from .config import CACHE_CONFIG, INGESTA_CONFIG
+from .ingesta_multiple import resolver_libros
+from .matriz_alineada import MatrizAlineada
+from .modelo import _huella_modelo
+
+# Incrementar cuando cambie el formato de los archivos del almacén
+VERSION_ALMACEN = '1'
+
+# Arreglos que se guardan como .npy y se abren con mmap
+ARREGLOS_ALMACEN = ('fechas', 'valores', 'claves_filas', 'desplazamientos')
+
+class AlmacenSeries:
+    """Observaciones de las series en arreglos contiguos indexados por clave_serie"""
+
+    def __init__(self, metadatos, fechas, valores, desplazamientos, claves_filas=None):
+        """
+        Args:
+            metadatos: Metadatos con clave_serie (ver catalogo.asignar_claves)
+            fechas: Fechas de todas las series, ordenadas por clave y fecha
+            valores: Valores alineados con fechas
+            desplazamientos: Inicio de cada serie en fechas/valores, con un
+                elemento final igual a la cantidad total de filas
+            claves_filas: clave_serie de cada fila (int32); por defecto se
+                deduce de desplazamientos
+        """
+        self.metadatos = metadatos
+        self.catalogo = construir_catalogo(metadatos)
+        self.fechas = fechas
+        self.valores = valores
+        self.desplazamientos = desplazamientos
+        if claves_filas is None:
+            claves_filas = np.repeat(np.arange(len(desplazamientos) - 1, dtype=np.int32),
+                                     np.diff(desplazamientos))
+        self.claves_filas = claves_filas
+        self._orden_fechas = None
+        self._fechas_ordenadas = None
+        self._matriz = None
+        # Directorio del que se abrió el almacén (ver abrir); None si está en memoria
+        self.directorio = None
+        # Los huecos del catálogo (claves sin metadatos) no entran al índice
+        self._indice_ids = pd.Index(metadatos['id_serie'].astype(object))
+        self._claves_ids = metadatos['clave_serie'].to_numpy()
+
+    @classmethod
+    def desde_modelo(cls, metadatos, datos):
+        """
+        Arma el almacén a partir del resultado de construir_modelo.
+
+        Las filas de series sin metadatos (CLAVE_SIN_METADATOS) se descartan.
+        Si datos ya viene ordenado por serie y fecha, como lo deja
+        construir_modelo, no se reordena.
+
+        Args:
+            metadatos: DataFrame de metadatos con clave_serie
+            datos: DataFrame largo con clave_serie, fecha y valor
+
+        Returns:
+            AlmacenSeries: Almacén con una serie por clave de metadatos
+        """
+        cantidad = int(metadatos['clave_serie'].max()) + 1 if len(metadatos) else 0
+        claves = datos['clave_serie'].to_numpy()
+        fechas = datos['fecha'].to_numpy()
+        valores = datos['valor'].to_numpy()
+        validas = (claves >= 0) & (claves < cantidad)
+        # Si no hay filas para descartar, los arreglos son vistas de las columnas
+        if not validas.all():
+            claves, fechas, valores = claves[validas], fechas[validas], valores[validas]
+
+        misma_serie = claves[1:] == claves[:-1]
+        ordenado = (claves[1:] > claves[:-1]) | (misma_serie & (fechas[1:] >= fechas[:-1]))
+        if not ordenado.all():
+            orden = np.lexsort((fechas, claves))
+            claves, fechas, valores = claves[orden], fechas[orden], valores[orden]
+
+        desplazamientos = np.zeros(cantidad + 1, dtype=np.int64)
+        np.cumsum(np.bincount(claves, minlength=cantidad), out=desplazamientos[1:])
+        return cls(
+            metadatos, np.ascontiguousarray(fechas), np.ascontiguousarray(valores),
+            desplazamientos, np.ascontiguousarray(claves, dtype=np.int32)
+        )
+
+    def guardar(self, directorio):
+        """
+        Escribe el almacén en directorio: un .npy por arreglo y el catálogo.
+
+        Args:
+            directorio: Directorio destino (se crea si no existe)
+        """
+        directorio = Path(directorio)
+        directorio.mkdir(parents=True, exist_ok=True)
+        for nombre in ARREGLOS_ALMACEN:
+            np.save(directorio / f"{nombre}.npy", getattr(self, nombre))
+        archivo_metadatos = _guardar_frame(self.metadatos, directorio, 'metadatos')
+        (directorio / 'almacen.json').write_text(json.dumps({
+            'version': VERSION_ALMACEN, 'filas': self.filas, 'metadatos': archivo_metadatos
+        }))
+
+    @classmethod
+    def abrir(cls, directorio):
+        """
+        Abre un almacén guardado con guardar, mapeando los arreglos en memoria.
+
+        Los arreglos son de solo lectura y se leen del disco a medida que se
+        usan; procesos distintos que abren el mismo directorio comparten las
+        páginas en memoria.
+
+        Args:
+            directorio: Directorio escrito por guardar
+
+        Returns:
+            AlmacenSeries: Almacén respaldado por los archivos
+
+        Raises:
+            ValueError: Si el directorio es de otra versión del formato
+        """
+        directorio = Path(directorio)
+        descripcion = json.loads((directorio / 'almacen.json').read_text())
+        if descripcion.get('version') != VERSION_ALMACEN:
+            raise ValueError(f"Almacén con formato {descripcion.get('version')}, se esperaba {VERSION_ALMACEN}")
+        # view(np.ndarray) conserva el mapeo pero evita que la subclase memmap
+        # se propague a las columnas de pandas
+        arreglos = {
+            nombre: np.load(directorio / f"{nombre}.npy", mmap_mode='r').view(np.ndarray)
+            for nombre in ARREGLOS_ALMACEN
+        }
+        almacen = cls(_leer_frame(directorio / descripcion['metadatos']), **arreglos)
+        almacen.directorio = directorio
+        return almacen
+
+    def __len__(self):
+        """Cantidad de series (claves) del almacén"""
+        return len(self.desplazamientos) - 1
+
+    @property
+    def filas(self):
+        """Cantidad total de observaciones"""
+        return len(self.valores)
+
+    def largos(self):
+        """Cantidad de observaciones de cada serie, indexada por clave"""
+        return np.diff(self.desplazamientos)
+
+    def claves(self, ids):
+        """
+        Traduce id_serie a clave_serie.
+
+        Raises:
+            KeyError: Si algún id_serie no está en el almacén
+        """
+        posiciones = self._indice_ids.get_indexer(pd.Index(ids).astype(object))
+        if (posiciones < 0).any():
+            faltantes = pd.Index(ids)[posiciones < 0]
+            raise KeyError(f"Series fuera del almacén: {', '.join(map(str, faltantes[:5]))}")
+        return self._claves_ids[posiciones]
+
+    def claves_por(self, tipo=None, categoria=None):
+        """
+        Claves de las series con el tipo y/o la categoría indicados.
+
+        El filtro recorre los metadatos (una fila por serie), no las observaciones.
+
+        Returns:
+            np.ndarray: Claves en orden creciente
+        """
+        seleccion = np.ones(len(self.metadatos), dtype=bool)
+        if tipo is not None:
+            seleccion &= (self.metadatos['tipo'] == tipo).to_numpy()
+        if categoria is not None:
+            seleccion &= (self.metadatos['categoria'] == categoria).to_numpy()
+        return np.sort(self.metadatos['clave_serie'].to_numpy()[seleccion])
+
+    def serie(self, clave):
+        """
+        Devuelve las observaciones de una serie sin copiarlas.
+
+        Returns:
+            tuple: (fechas, valores) como vistas de los arreglos del almacén
+        """
+        inicio, fin = self.desplazamientos[clave], self.desplazamientos[clave + 1]
+        return self.fechas[inicio:fin], self.valores[inicio:fin]
+
+    def _posiciones(self, claves):
+        """Posiciones de las filas de claves, concatenando sus rangos en orden"""
+        claves = np.asarray(claves, dtype=np.int64)
+        inicios = self.desplazamientos[claves]
+        largos = self.desplazamientos[claves + 1] - inicios
+        # Cada fila del resultado es inicio de su serie + posición dentro de ella
+        comienzo_en_resultado = np.cumsum(largos) - largos
+        posiciones = np.repeat(inicios - comienzo_en_resultado, largos) + np.arange(largos.sum())
+        return posiciones, np.repeat(claves, largos)
+
+    def seleccionar(self, claves):
+        """
+        Devuelve las observaciones de varias series, una a continuación de otra.
+
+        Args:
+            claves: Claves de las series, en el orden deseado
+
+        Returns:
+            tuple: (claves, fechas, valores) con una entrada por observación
+        """
+        posiciones, claves_filas = self._posiciones(claves)
+        return claves_filas.astype(np.int32), self.fechas[posiciones], self.valores[posiciones]
+
+    def _limite(self, fecha):
+        """Convierte un límite del rango a la unidad de fechas (None si no hay límite)"""
+        if fecha is None:
+            return None
+        return np.datetime64(pd.Timestamp(fecha).to_datetime64()).astype(self.fechas.dtype)
+
+    def _indice_global(self):
+        """Arma (una vez) el orden de todas las filas por fecha"""
+        if self._orden_fechas is None:
+            orden = np.argsort(self.fechas, kind='stable')
+            self._fechas_ordenadas = self.fechas[orden]
+            self._orden_fechas = orden
+        return self._orden_fechas, self._fechas_ordenadas
+
+    def matriz(self):
+        """
+        Matriz alineada fecha × serie del almacén, armada la primera vez que se pide.
+
+        En un almacén abierto desde disco la matriz se guarda en su
+        subdirectorio matriz y se abre mapeada: el primer proceso que la pide
+        la arma y los demás solo la mapean. Si el directorio no admite
+        escritura, la matriz queda solo en memoria.
+
+        Returns:
+            MatrizAlineada: Una columna por clave, con NaN donde falta el dato
+        """
+        if self._matriz is None:
+            self._matriz = (
+                MatrizAlineada.desde_almacen(self) if self.directorio is None
+                else self._matriz_compartida()
+            )
+        return self._matriz
+
+    def _matriz_compartida(self):
+        """Abre la matriz guardada en el directorio del almacén, escribiéndola antes si hace falta"""
+        destino = self.directorio / 'matriz'
+        matriz = None
+        if not destino.exists():
+            matriz = MatrizAlineada.desde_almacen(self)
+            temporal = self.directorio / f".matriz.{os.getpid()}"
+            shutil.rmtree(temporal, ignore_errors=True)
+            try:
+                matriz.guardar(temporal)
+                os.rename(temporal, destino)
+            except OSError:
+                shutil.rmtree(temporal, ignore_errors=True)
+        try:
+            return MatrizAlineada.abrir(destino, self.catalogo)
+        except (OSError, ValueError):
+            return matriz if matriz is not None else MatrizAlineada.desde_almacen(self)
+
+    def posiciones_en_rango(self, inicio=None, fin=None, claves=None):
+        """
+        Posiciones de las filas con fecha entre inicio y fin (ambos incluidos).
+
+        Con claves, se hace una búsqueda binaria dentro de cada serie pedida;
+        sin claves, en el índice global de fechas. En ambos casos el costo es
+        logarítmico en la cantidad de filas más lineal en el resultado.
+
+        Args:
+            inicio: Fecha mínima (str, Timestamp o datetime64); None para no acotar
+            fin: Fecha máxima; None para no acotar
+            claves: Claves de las series; None para todas
+
+        Returns:
+            np.ndarray: Posiciones en orden de serie y fecha, como en a_dataframe
+        """
+        inicio, fin = self._limite(inicio), self._limite(fin)
+        if inicio is None and fin is None:
+            if claves is None:
+                return np.arange(self.filas)
+            return self._posiciones(claves)[0]
+
+        if claves is None:
+            orden, fechas = self._indice_global()
+            desde = 0 if inicio is None else np.searchsorted(fechas, inicio, side='left')
+            hasta = len(fechas) if fin is None else np.searchsorted(fechas, fin, side='right')
+            # Volver al orden del almacén (serie y fecha)
+            return np.sort(orden[desde:hasta])
+
+        partes = []
+        for clave in np.asarray(claves, dtype=np.int64):
+            comienzo, final = self.desplazamientos[clave], self.desplazamientos[clave + 1]
+            fechas = self.fechas[comienzo:final]
+            desde = 0 if inicio is None else np.searchsorted(fechas, inicio, side='left')
+            hasta = len(fechas) if fin is None else np.searchsorted(fechas, fin, side='right')
+            partes.append(np.arange(comienzo + desde, comienzo + hasta))
+        return np.concatenate(partes) if partes else np.empty(0, dtype=np.int64)
+
+    def consultar_rango(self, inicio=None, fin=None, claves=None, columnas=()):
+        """
+        Filas de las series pedidas con fecha entre inicio y fin, en formato largo.
+
+        Reemplaza al filtro datos[(datos['fecha'] >= inicio) & (datos['fecha'] <= fin)]
+        sin recorrer todas las filas.
+
+        Args:
+            inicio: Fecha mínima; None para no acotar
+            fin: Fecha máxima; None para no acotar
+            claves: Claves de las series; None para todas
+            columnas: Columnas del catálogo a agregar (ver a_dataframe)
+
+        Returns:
+            pd.DataFrame: Columnas de a_dataframe, en orden de serie y fecha
+        """
+        posiciones = self.posiciones_en_rango(inicio, fin, claves)
+        return self._armar_dataframe(
+            self.claves_filas[posiciones], self.fechas[posiciones], self.valores[posiciones], columnas
+        )
+
+    def a_dataframe(self, claves=None, columnas=()):
+        """
+        Convierte el almacén (o parte de él) al DataFrame largo del modelo.
+
+        Args:
+            claves: Claves a incluir; None para todas
+            columnas: Columnas del catálogo a agregar (por ejemplo tipo y categoria)
+
+        Returns:
+            pd.DataFrame: Columnas id_serie, clave_serie, fecha y valor, más columnas
+        """
+        if claves is None:
+            claves_filas, fechas, valores = self.claves_filas, self.fechas, self.valores
+        else:
+            claves_filas, fechas, valores = self.seleccionar(claves)
+        return self._armar_dataframe(claves_filas, fechas, valores, columnas)
+
+    def _armar_dataframe(self, claves_filas, fechas, valores, columnas):
+        """Arma el DataFrame largo del modelo a partir de arreglos alineados"""
+        datos = pd.DataFrame({
+            'id_serie':    self.catalogo['id_serie'].array.take(claves_filas),
+            'clave_serie': claves_filas,
+            'fecha':       fechas,
+            'valor':       valores,
+        })
+        return enriquecer_datos(datos, self.catalogo, columnas) if columnas else datos
+
+    def a_dataframe_compartido(self, columnas=()):
+        """
+        DataFrame largo de todo el almacén que reutiliza sus arreglos sin copiarlos.
+
+        clave_serie, fecha y valor son vistas de los arreglos (mapeados en
+        memoria si el almacén se abrió con abrir); id_serie y las columnas del
+        catálogo quedan como categóricas, igual que en el modelo compacto, de
+        modo que cada proceso solo agrega uno o dos bytes por fila.
+
+        Args:
+            columnas: Columnas del catálogo a agregar
+
+        Returns:
+            pd.DataFrame: De solo lectura, con las columnas de a_dataframe
+        """
+        catalogo = self.catalogo.copy()
+        # Las claves sin metadatos no tienen filas, pero las categorías no admiten nulos
+        vacios = catalogo['id_serie'].isna()
+        catalogo['id_serie'] = catalogo['id_serie'].astype(object).where(
+            ~vacios, [f"__clave{clave}" for clave in catalogo.index]
+        )
+
+        datos = pd.DataFrame({
+            'id_serie':    pd.Categorical.from_codes(
+                self.claves_filas, categories=pd.Index(catalogo['id_serie'], dtype=str)
+            ),
+            'clave_serie': self.claves_filas,
+            'fecha':       self.fechas,
+            'valor':       self.valores,
+        }, copy=False)
+        # Sin enriquecer_datos, que copia el DataFrame completo
+        for columna in columnas:
+            datos[columna] = catalogo[columna].astype('category').array.take(self.claves_filas)
+        return datos
+
+def _nombre_almacen(origen):
+    """Nombre del almacén de origen: su nombre legible más un hash corto de la ruta absoluta"""
+    ruta = Path(origen).resolve()
+    legible = re.sub(r'[^\w.-]+', '_', ruta.stem).strip('_') or 'origen'
+    return f"almacen_{legible}_{hashlib.sha1(str(ruta).encode()).hexdigest()[:8]}"
+
+def _huella_origen(libros, compacto=None):
+    """
+    Huella del almacén de un origen: el formato del almacén, la huella del
+    modelo canónico del que se arma (libros, VERSION_MODELO y validación; ver
+    modelo._huella_modelo) y las opciones que cambian sus tipos
+    """
+    if compacto is None:
+        compacto = INGESTA_CONFIG['modelo_compacto']
+    valor_float32 = bool(compacto) and INGESTA_CONFIG['valor_float32']
+    return hashlib.sha256(
+        f"almacen={VERSION_ALMACEN};modelo={_huella_modelo(libros)};"
+        f"compacto={bool(compacto)};float32={valor_float32};".encode()
+    ).hexdigest()
+
+def abrir_almacen_compartido(origen, construir, directorio=None, compacto=None):
+    """
+    Abre el almacén de origen mapeado en memoria, escribiéndolo antes si hace falta.
+
+    El almacén se guarda en un subdirectorio cuyo nombre incluye la huella del
+    modelo canónico de origen y la opción compacto, así que una vez escrito no
+    cambia: el primer proceso lo
+    construye y los siguientes (por ejemplo, otros workers del dashboard) solo
+    lo mapean. Si dos procesos lo construyen a la vez, gana el primero en
+    renombrar su directorio temporal y el otro usa ese.
+
+    Args:
+        origen: Libro, carpeta o patrón (ver ingesta_multiple.resolver_libros)
+        construir: Función sin argumentos que devuelve (metadatos, datos); solo
+            se llama si no hay un almacén vigente
+        directorio: Directorio de almacenes. Por defecto CACHE_CONFIG['directorio_almacen']
+        compacto: La opción compacto con que construir arma el modelo. Por
+            defecto INGESTA_CONFIG['modelo_compacto']
+
+    Returns:
+        AlmacenSeries: Almacén abierto con AlmacenSeries.abrir
+    """
+    directorio = Path(directorio or CACHE_CONFIG['directorio_almacen'])
+    nombre = _nombre_almacen(origen)
+    destino = directorio / f"{nombre}_{_huella_origen(resolver_libros(origen), compacto)[:16]}"
+
+    if destino.exists():
+        try:
+            return AlmacenSeries.abrir(destino)
+        except (OSError, ValueError, KeyError):
+            shutil.rmtree(destino, ignore_errors=True)
+
+    metadatos, datos = construir()
+    temporal = directorio / f".{destino.name}.{os.getpid()}"
+    shutil.rmtree(temporal, ignore_errors=True)
+    AlmacenSeries.desde_modelo(metadatos, datos).guardar(temporal)
+    try:
+        os.rename(temporal, destino)
+    except OSError:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    # Los almacenes de versiones anteriores del origen ya no se usan
+    for anterior in directorio.glob(f"{nombre}_*"):
+        if anterior != destino:
+            shutil.rmtree(anterior, ignore_errors=True)
+    return AlmacenSeries.abrir(destino)
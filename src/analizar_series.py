@@ -1,69 +1,344 @@
+from collections import Counter
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 from pandas import Timestamp
 import matplotlib.pyplot as plt
 
-def construir_modelo(ruta_archivo):
-    # Cargar el archivo Excel
-    libro = pd.ExcelFile(ruta_archivo)
+from .catalogo import asignar_claves
+from .config import EXCEL_STRUCTURE, INGESTA_CONFIG
+from .fechas import convertir_fechas, inferir_formato
+from .lectores_excel import abrir_libro, seleccionar_motor
+from .utils import compactar_modelo
+
+COLUMNAS_METADATOS = ['id_serie', 'hoja', 'tipo', 'categoria', 'unidad', 'fecha_inicio', 'fecha_fin']
+COLUMNAS_DATOS = ['id_serie', 'fecha', 'valor']
+
+FILAS_METADATOS   = EXCEL_STRUCTURE['metadata_rows']
+FILA_INICIO_DATOS = EXCEL_STRUCTURE['data_start_row']
+
+# Cantidad de veces que se decodificó cada hoja desde el libro
+CONTADOR_PARSEOS = Counter()
+
+# Celdas vacías (o fuera de rango) descartadas en la última lectura de cada hoja
+CELDAS_OMITIDAS = {}
+
+def reiniciar_contador_parseos():
+    """Reinicia el contador de decodificaciones de hojas"""
+    CONTADOR_PARSEOS.clear()
+
+def _registrar_celdas_omitidas(resultados):
+    """Actualiza CELDAS_OMITIDAS con los resultados {hoja: (filas_meta, datos)}"""
+    for hoja, (_, datos) in resultados.items():
+        CELDAS_OMITIDAS[hoja] = 0 if datos is None else datos.attrs.get('celdas_omitidas', 0)
+
+def reporte_celdas_omitidas():
+    """
+    Devuelve cuántas celdas se descartaron por hoja en la última lectura.
+
+    Returns:
+        DataFrame: Columnas hoja y celdas_omitidas
+    """
+    return pd.DataFrame(list(CELDAS_OMITIDAS.items()), columns=['hoja', 'celdas_omitidas'])
 
+def _parsear_hoja(libro, hoja):
+    """Decodifica una hoja completa del libro registrándola en CONTADOR_PARSEOS"""
+    CONTADOR_PARSEOS[hoja] += 1
+    return libro.parse(hoja, header=None)
+
+def _extraer_metadatos_hoja(df, hoja, limites=None):
+    """
+    Extrae una fila de metadatos por columna desde las filas de encabezado.
+
+    Args:
+        df: DataFrame de la hoja leído con header=None
+        hoja: Nombre de la hoja
+        limites: (inicio, fin) ya calculados con _limites_fechas, para no
+            volver a convertir las fechas del encabezado
+
+    Returns:
+        list: Diccionarios con las claves de COLUMNAS_METADATOS
+    """
+    inicios, fines = (pd.DatetimeIndex(fechas) for fechas in (limites or _limites_fechas(df)))
     filas_meta = []
-    for hoja in libro.sheet_names:
-        df = libro.parse(hoja, header=None)
-        for col in df.columns:
-            id_serie = f"{hoja}__col{col}"
-
-            inicio_raw    = df.iloc[1, col]
-            tipo_raw      = df.iloc[2, col]
-            categoria_raw = df.iloc[3, col]
-            unidad        = df.iloc[4, col]
-            fin_raw       = df.iloc[5, col]
-
-            tipo = None if isinstance(tipo_raw, Timestamp) else str(tipo_raw).strip()
-            categoria = None if isinstance(categoria_raw, Timestamp) else str(categoria_raw).strip()
-
-            fecha_inicio = pd.to_datetime(inicio_raw, errors='coerce')
-            fecha_fin    = pd.to_datetime(fin_raw,    errors='coerce')
-
-            filas_meta.append({
-                'id_serie':     id_serie,
-                'hoja':         hoja,
-                'tipo':         tipo,
-                'categoria':    categoria,
-                'unidad':       unidad,
-                'fecha_inicio': fecha_inicio,
-                'fecha_fin':    fecha_fin
-            })
+    for posicion, col in enumerate(df.columns):
+        tipo_raw      = df.iloc[FILAS_METADATOS['tipo'], col]
+        categoria_raw = df.iloc[FILAS_METADATOS['categoria'], col]
+        unidad        = df.iloc[FILAS_METADATOS['unidad'], col]
+
+        tipo = None if isinstance(tipo_raw, Timestamp) else str(tipo_raw).strip()
+        categoria = None if isinstance(categoria_raw, Timestamp) else str(categoria_raw).strip()
+
+        filas_meta.append({
+            'id_serie':     f"{hoja}__col{col}",
+            'hoja':         hoja,
+            'tipo':         tipo,
+            'categoria':    categoria,
+            'unidad':       unidad,
+            'fecha_inicio': inicios[posicion],
+            'fecha_fin':    fines[posicion]
+        })
+    return filas_meta
+
+def _formato_fechas_hoja(df, fechas_datos=None):
+    """
+    Infiere una vez por hoja el formato de las fechas escritas como texto.
+
+    La columna de fechas y las filas de fecha del encabezado pueden estar
+    escritas en formatos distintos, así que cada parte tiene el suyo. La otra
+    parte solo desempata: una fecha ambigua de una (01/05/2020) se resuelve
+    con la evidencia de la otra (13/05/2020) cuando ambas usan el mismo formato.
+
+    Args:
+        df: Hoja (o sus filas de encabezado) leída con header=None
+        fechas_datos: Celdas de la columna de fechas; por defecto las de df
+
+    Returns:
+        tuple: (formato de la columna de fechas, formato del encabezado), cada
+            uno str o None (ver fechas.inferir_formato)
+    """
+    if fechas_datos is None:
+        fechas_datos = df.iloc[FILA_INICIO_DATOS:, 0]
+    filas = df.iloc[[FILAS_METADATOS['fecha_inicio'], FILAS_METADATOS['fecha_fin']]]
+    encabezado = filas.to_numpy(dtype=object).ravel()
+
+    formato_encabezado = inferir_formato(encabezado)
+    formato_datos = inferir_formato(fechas_datos, preferido=formato_encabezado)
+    if formato_datos != formato_encabezado:
+        formato_encabezado = inferir_formato(encabezado, preferido=formato_datos)
+    return formato_datos, formato_encabezado
+
+def _limites_fechas(df, formato_fechas=None):
+    """
+    Lee fecha_inicio/fecha_fin de las filas de encabezado de cada columna.
+
+    Las dos filas se convierten juntas en una sola llamada a convertir_fechas.
+
+    Args:
+        df: Hoja (o al menos sus filas de encabezado) leída con header=None
+        formato_fechas: Formato de las fechas en texto del encabezado (ver
+            _formato_fechas_hoja); por defecto se infiere de las dos filas
+
+    Returns:
+        tuple: (inicio, fin) como arreglos datetime64 alineados con df.columns,
+            con NaT donde la fecha falta o no es válida
+    """
+    filas = df.iloc[[FILAS_METADATOS['fecha_inicio'], FILAS_METADATOS['fecha_fin']]]
+    fechas = convertir_fechas(filas.to_numpy(dtype=object).ravel(), formato_fechas).reshape(2, -1)
+    return fechas[0], fechas[1]
+
+def _reestructurar_bloque(bloque, hoja, limites=None, formato_fechas=None):
+    """
+    Convierte un bloque de filas de datos al formato largo.
+
+    La primera columna contiene las fechas y cada columna restante una serie.
+    Solo se generan filas para las celdas con fecha y valor numérico: los
+    vacíos al inicio, intermedios y al final de cada serie se descartan antes
+    de armar el resultado. La cantidad descartada queda en
+    ``attrs['celdas_omitidas']``. El resultado queda ordenado por columna y
+    luego por fila, igual que el recorrido celda a celda original.
+
+    Args:
+        bloque: Filas de datos de una hoja, con columnas numeradas por posición
+        hoja: Nombre de la hoja
+        limites: (inicio, fin) de _limites_fechas alineados con bloque.columns;
+            si se indican, también se descartan las celdas fuera de ese rango
+        formato_fechas: Formato de la columna de fechas si está escrita como
+            texto (ver fechas.inferir_formato); por defecto se infiere del bloque
+
+    Returns:
+        pd.DataFrame: Columnas id_serie, fecha y valor
+    """
+    idx_fecha = bloque.columns[0]
+    columnas  = bloque.columns.drop(idx_fecha)
+
+    fechas  = convertir_fechas(bloque[idx_fecha], formato_fechas)
+    valores = bloque[columnas].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    ids     = np.array([f"{hoja}__col{col}" for col in columnas], dtype=object)
+
+    mascara = ~np.isnan(valores) & ~np.isnat(fechas)[:, None]
+    if limites is not None:
+        inicio, fin = (np.asarray(limite)[1:len(bloque.columns)] for limite in limites)
+        mascara &= np.isnat(inicio) | (fechas[:, None] >= inicio)
+        mascara &= np.isnat(fin) | (fechas[:, None] <= fin)
+
+    # Recorrer la máscara transpuesta da el orden columna -> fila
+    pos_columna, pos_fila = np.nonzero(mascara.T)
+    datos = pd.DataFrame({
+        'id_serie': ids[pos_columna],
+        'fecha':    fechas[pos_fila],
+        'valor':    valores[pos_fila, pos_columna],
+    })
+    datos.attrs['celdas_omitidas'] = int(mascara.size - len(datos))
+    return datos
+
+def _reestructurar_hoja(df, hoja, limites=None, formato_fechas=None):
+    """Convierte el bloque de datos de una hoja (filas 6+) al formato largo."""
+    return _reestructurar_bloque(df.iloc[FILA_INICIO_DATOS:], hoja, limites, formato_fechas)
+
+def _procesar_hoja(df, hoja):
+    """
+    Obtiene metadatos y datos de una hoja a partir de una única lectura.
 
+    Returns:
+        tuple: (lista de filas de metadatos, DataFrame largo o None si la hoja está vacía)
+    """
+    if len(df.columns) == 0:
+        return [], None
+    formato_datos, formato_encabezado = _formato_fechas_hoja(df)
+    limites = _limites_fechas(df, formato_encabezado)
+    recorte = limites if INGESTA_CONFIG['recortar_por_metadatos'] else None
+    return (
+        _extraer_metadatos_hoja(df, hoja, limites),
+        _reestructurar_hoja(df, hoja, recorte, formato_datos),
+    )
+
+def _consolidar_modelo(filas_meta, bloques):
+    """
+    Une los resultados por hoja y descarta series sin tipo/categoría o sin valores.
+
+    Args:
+        filas_meta: Filas de metadatos de todas las hojas, en orden
+        bloques: DataFrames largos por hoja, en el mismo orden
+
+    Returns:
+        tuple: (metadatos, datos) con la clave entera clave_serie (ver catalogo)
+    """
     metadatos = (
-        pd.DataFrame(filas_meta)
+        pd.DataFrame(filas_meta, columns=COLUMNAS_METADATOS)
           .dropna(subset=['tipo','categoria'])
-          [['id_serie','hoja','tipo','categoria','unidad','fecha_inicio','fecha_fin']]
           .reset_index(drop=True)
     )
 
-    filas_datos = []
-    for hoja in libro.sheet_names:
-        df = libro.parse(hoja, header=None)
-        idx_fecha = df.columns[0]
-        fechas    = pd.to_datetime(df.iloc[6:, idx_fecha], errors='coerce')
-
-        for col in df.columns.drop(idx_fecha):
-            id_serie = f"{hoja}__col{col}"
-            valores  = pd.to_numeric(df.iloc[6:, col], errors='coerce')
-            for fecha, valor in zip(fechas, valores):
-                filas_datos.append({'id_serie': id_serie, 'fecha': fecha, 'valor': valor})
-
+    bloques = [bloque for bloque in bloques if bloque is not None]
     datos = (
-        pd.DataFrame(filas_datos)
-          .dropna(subset=['fecha'])
-          .reset_index(drop=True)
+        pd.concat(bloques, ignore_index=True) if bloques
+        else pd.DataFrame(columns=COLUMNAS_DATOS)
     )
+    datos = datos.dropna(subset=['fecha']).reset_index(drop=True)
 
     ids_con_valor = datos.dropna(subset=['valor'])['id_serie'].unique()
     metadatos = metadatos[metadatos['id_serie'].isin(ids_con_valor)].reset_index(drop=True)
     datos     = datos    [datos['id_serie'].isin(ids_con_valor)].reset_index(drop=True)
 
-    return metadatos, datos
+    return asignar_claves(metadatos, datos)
+
+def _procesar_hojas_en_worker(ruta_archivo, hojas, motor=None):
+    """
+    Abre el libro dentro de un proceso worker y procesa las hojas asignadas.
+
+    Returns:
+        dict: {hoja: (filas_meta, datos)}
+    """
+    libro = abrir_libro(ruta_archivo, motor)
+    return {hoja: _procesar_hoja(_parsear_hoja(libro, hoja), hoja) for hoja in hojas}
+
+def _procesar_hojas_en_paralelo(ruta_archivo, hojas, workers, motor=None):
+    """
+    Reparte las hojas entre un pool de procesos y devuelve los resultados.
+
+    Las hojas se asignan en forma intercalada para equilibrar la carga; cada
+    worker abre el libro una sola vez para todas sus hojas.
+
+    Returns:
+        dict: {hoja: (filas_meta, datos)}
+    """
+    grupos = [hojas[i::workers] for i in range(workers)]
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for parcial in pool.map(_procesar_hojas_en_worker, [ruta_archivo] * workers, grupos,
+                                [motor] * workers):
+            resultados.update(parcial)
+    CONTADOR_PARSEOS.update(hojas)
+    return resultados
+
+def _compactar_si_corresponde(modelo, compacto=None):
+    """Aplica compactar_modelo si compacto (o INGESTA_CONFIG['modelo_compacto']) lo pide"""
+    if compacto is None:
+        compacto = INGESTA_CONFIG['modelo_compacto']
+    if not compacto:
+        return modelo
+    return compactar_modelo(*modelo, valor_float32=INGESTA_CONFIG['valor_float32'])
+
+def construir_modelo(ruta_archivo, streaming=False, workers=None, motor=None, compacto=None):
+    """
+    Construye los DataFrames de metadatos y datos a partir del libro Excel.
+
+    Cada hoja se decodifica una sola vez; de esa lectura se extraen tanto las
+    filas de metadatos (EXCEL_STRUCTURE['metadata_rows']) como el bloque de
+    datos desde EXCEL_STRUCTURE['data_start_row'].
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        streaming: Si es True, lee el libro por bloques de filas con el
+            iterador de solo lectura de openpyxl (ver lectura_streaming)
+        workers: Cantidad de procesos para leer hojas en paralelo. Por defecto
+            INGESTA_CONFIG['workers']; con 1 se procesa en forma secuencial.
+            No aplica al modo streaming.
+        motor: Motor de lectura de Excel ('auto', 'calamine', 'openpyxl').
+            Por defecto INGESTA_CONFIG['motor_excel'] (ver lectores_excel).
+            El modo streaming usa siempre openpyxl.
+        compacto: Si es True, devuelve el modelo con tipos compactos (ver
+            utils.compactar_modelo). Por defecto INGESTA_CONFIG['modelo_compacto'].
+
+    Returns:
+        tuple: (metadatos, datos)
+    """
+    if streaming:
+        from .lectura_streaming import construir_modelo_streaming
+        return _compactar_si_corresponde(construir_modelo_streaming(ruta_archivo), compacto)
+
+    motor = seleccionar_motor(motor)
+    libro = abrir_libro(ruta_archivo, motor)
+    hojas = list(libro.sheet_names)
+    workers = min(workers or INGESTA_CONFIG['workers'], len(hojas))
+
+    if workers > 1:
+        resultados = _procesar_hojas_en_paralelo(ruta_archivo, hojas, workers, motor)
+    else:
+        resultados = {hoja: _procesar_hoja(_parsear_hoja(libro, hoja), hoja) for hoja in hojas}
+    _registrar_celdas_omitidas(resultados)
+
+    filas_meta = []
+    bloques = []
+    for hoja in hojas:
+        meta_hoja, datos_hoja = resultados[hoja]
+        filas_meta.extend(meta_hoja)
+        bloques.append(datos_hoja)
+
+    return _compactar_si_corresponde(_consolidar_modelo(filas_meta, bloques), compacto)
+
+def escanear_catalogo(ruta_archivo, motor=None):
+    """
+    Lee solo las filas de encabezado de cada hoja y devuelve los metadatos.
+
+    No decodifica el bloque de datos, por lo que sirve para listar las series
+    disponibles (por ejemplo, para llenar filtros) sin construir el modelo.
+    A diferencia de construir_modelo, incluye también las series que no
+    tienen ningún valor, ya que eso solo se sabe leyendo los datos.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        motor: Motor de lectura de Excel (ver construir_modelo)
+
+    Returns:
+        pd.DataFrame: Metadatos con las columnas de COLUMNAS_METADATOS
+    """
+    libro = abrir_libro(ruta_archivo, motor)
+    filas_meta = []
+    for hoja in libro.sheet_names:
+        encabezado = libro.parse(hoja, header=None, nrows=FILA_INICIO_DATOS)
+        encabezado = encabezado.reindex(range(FILA_INICIO_DATOS))
+        # La primera columna es la de fechas, no una serie
+        filas_meta.extend(_extraer_metadatos_hoja(encabezado, hoja)[1:])
+
+    return (
+        pd.DataFrame(filas_meta, columns=COLUMNAS_METADATOS)
+          .dropna(subset=['tipo','categoria'])
+          .reset_index(drop=True)
+    )
 
 if __name__ == '__main__':
     ruta = 'Datos_Series_Leo.xlsx'
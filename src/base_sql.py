@@ -0,0 +1,247 @@
+"""
+Base SQL embebida con el modelo procesado
+
+Vuelca el modelo canónico (ver modelo.py) a una base SQLite local para
+consultas ad hoc sin volver a leer el Excel:
+
+- series: una fila por serie (clave_serie, id_serie, hoja, tipo, categoria,
+  unidad, fecha_inicio, fecha_fin), con índices por tipo y categoria.
+- observaciones: clave_serie, fecha y valor, con un índice por
+  (clave_serie, fecha, valor) que resuelve los rangos por serie sin leer la
+  tabla y otro por fecha.
+- resumen_series: cantidad, suma, suma de cuadrados, mínimo, máximo y rango
+  de fechas de cada serie, para agregar por tipo o categoría sin recorrer
+  las observaciones.
+- datos: vista con el formato largo del modelo (observaciones + series).
+
+Las fechas se guardan como texto ISO ('AAAA-MM-DD'), comparable con '<' y
+'>' y compatible con las funciones de fecha de SQLite. La base registra la
+huella de los libros de origen y se reconstruye solo cuando cambian.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import CACHE_CONFIG
+from .ingesta_multiple import resolver_libros
+from .modelo import _huella_modelo, cargar_modelo_canonico
+
+# Incrementar cuando cambie el esquema de la base
+VERSION_BASE_SQL = '1'
+
+# Columnas de la tabla series (archivo solo existe con varios libros)
+COLUMNAS_SERIES = ['clave_serie', 'id_serie', 'archivo', 'hoja', 'tipo', 'categoria',
+                   'unidad', 'fecha_inicio', 'fecha_fin']
+
+ESQUEMA = """
+CREATE TABLE info (clave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE series (
+    clave_serie INTEGER PRIMARY KEY,
+    id_serie TEXT NOT NULL UNIQUE,
+    archivo TEXT,
+    hoja TEXT,
+    tipo TEXT,
+    categoria TEXT,
+    unidad TEXT,
+    fecha_inicio TEXT,
+    fecha_fin TEXT
+);
+CREATE TABLE observaciones (
+    clave_serie INTEGER NOT NULL REFERENCES series (clave_serie),
+    fecha TEXT NOT NULL,
+    valor REAL
+);
+CREATE TABLE resumen_series (
+    clave_serie INTEGER PRIMARY KEY REFERENCES series (clave_serie),
+    cantidad INTEGER,
+    suma REAL,
+    suma_cuadrados REAL,
+    minimo REAL,
+    maximo REAL,
+    fecha_min TEXT,
+    fecha_max TEXT
+);
+CREATE VIEW datos AS
+    SELECT s.id_serie, o.clave_serie, o.fecha, o.valor, s.tipo, s.categoria
+    FROM observaciones o JOIN series s USING (clave_serie);
+"""
+
+# Los índices se crean después de cargar las filas, que es más rápido
+INDICES = """
+CREATE INDEX idx_series_tipo ON series (tipo);
+CREATE INDEX idx_series_categoria ON series (categoria);
+CREATE INDEX idx_observaciones_serie_fecha ON observaciones (clave_serie, fecha, valor);
+CREATE INDEX idx_observaciones_fecha ON observaciones (fecha);
+"""
+
+def _fechas_texto(fechas):
+    """Convierte fechas datetime64 a texto ISO (con hora solo si alguna la tiene)"""
+    fechas = np.asarray(fechas, dtype='datetime64[us]')
+    validas = fechas[~np.isnat(fechas)]
+    unidad = 'D' if (validas == validas.astype('datetime64[D]')).all() else 's'
+    texto = np.datetime_as_string(fechas, unit=unidad).astype(object)
+    texto[np.isnat(fechas)] = None
+    return texto
+
+def _como_texto(columna):
+    """Columna de metadatos como lista de str/None para SQLite"""
+    return [None if pd.isna(valor) else str(valor) for valor in columna]
+
+def _resumen_series(datos):
+    """Agregados por serie que permiten combinar sin leer las observaciones"""
+    valores = datos['valor'].astype(float)
+    resumen = pd.DataFrame({
+        'clave_serie': datos['clave_serie'].to_numpy(),
+        'valor': valores.to_numpy(),
+        'cuadrado': (valores ** 2).to_numpy(),
+        'fecha': datos['fecha'].to_numpy(),
+    }).groupby('clave_serie').agg(
+        cantidad=('valor', 'count'), suma=('valor', 'sum'), suma_cuadrados=('cuadrado', 'sum'),
+        minimo=('valor', 'min'), maximo=('valor', 'max'),
+        fecha_min=('fecha', 'min'), fecha_max=('fecha', 'max'),
+    ).reset_index()
+    resumen['fecha_min'] = _fechas_texto(resumen['fecha_min'])
+    resumen['fecha_max'] = _fechas_texto(resumen['fecha_max'])
+    return resumen
+
+def guardar_base_sql(metadatos, datos, ruta, huella=None):
+    """
+    Escribe el modelo en una base SQLite nueva.
+
+    La base se arma en un archivo temporal y reemplaza a la anterior al
+    terminar, así los lectores nunca ven una base a medio escribir.
+
+    Args:
+        metadatos: Metadatos del modelo canónico
+        datos: Datos del modelo canónico
+        ruta: Ruta del archivo .sqlite
+        huella: Huella de los libros de origen (ver abrir_base_sql)
+
+    Returns:
+        Path: Ruta de la base escrita
+    """
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}")
+    temporal.unlink(missing_ok=True)
+
+    series = metadatos.reindex(columns=COLUMNAS_SERIES)
+    for columna in ('fecha_inicio', 'fecha_fin'):
+        series[columna] = _fechas_texto(pd.to_datetime(series[columna]))
+    filas_series = zip(
+        series['clave_serie'].astype(int).tolist(),
+        *(_como_texto(series[columna]) for columna in COLUMNAS_SERIES[1:7]),
+        series['fecha_inicio'].tolist(), series['fecha_fin'].tolist()
+    )
+    observaciones = zip(
+        datos['clave_serie'].astype(int).tolist(),
+        _fechas_texto(datos['fecha']).tolist(),
+        datos['valor'].astype(float).tolist()
+    )
+    resumen = _resumen_series(datos)
+
+    conexion = sqlite3.connect(temporal)
+    try:
+        # La base temporal se descarta si algo falla: no hace falta diario
+        conexion.execute("PRAGMA journal_mode = OFF")
+        conexion.execute("PRAGMA synchronous = OFF")
+        conexion.executescript(ESQUEMA)
+        with conexion:
+            conexion.executemany(f"INSERT INTO series VALUES ({', '.join('?' * 9)})", filas_series)
+            conexion.executemany("INSERT INTO observaciones VALUES (?, ?, ?)", observaciones)
+            conexion.executemany(
+                "INSERT INTO resumen_series VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                resumen.itertuples(index=False, name=None)
+            )
+            conexion.executemany("INSERT INTO info VALUES (?, ?)", [
+                ('version', VERSION_BASE_SQL), ('huella', huella or ''),
+            ])
+        conexion.executescript(INDICES)
+        conexion.execute("ANALYZE")
+    except BaseException:
+        conexion.close()
+        temporal.unlink(missing_ok=True)
+        raise
+    conexion.close()
+
+    os.replace(temporal, ruta)
+    return ruta
+
+def _leer_info(ruta):
+    """Devuelve la tabla info de una base existente, o None si no se puede leer"""
+    try:
+        conexion = conectar(ruta)
+        try:
+            return dict(conexion.execute("SELECT clave, valor FROM info").fetchall())
+        finally:
+            conexion.close()
+    except sqlite3.Error:
+        return None
+
+def abrir_base_sql(origen, ruta=None, usar_cache=True, workers=None):
+    """
+    Devuelve la ruta de la base SQL de origen, escribiéndola si hace falta.
+
+    La base es vigente mientras coincidan VERSION_BASE_SQL y la huella de los
+    libros del origen; si no, se arma con el modelo canónico (que a su vez
+    sale de la caché columnar si está vigente).
+
+    Args:
+        origen: Libro, carpeta o patrón (ver ingesta_multiple.resolver_libros)
+        ruta: Archivo de la base. Por defecto CACHE_CONFIG['base_sql']
+        usar_cache: Si es False, reconstruye la base y el modelo sin cachés
+        workers: Procesos para leer el Excel si hay que reconstruir
+
+    Returns:
+        Path: Ruta de la base lista para consultar
+    """
+    ruta = Path(ruta or CACHE_CONFIG['base_sql'])
+    huella = _huella_modelo(resolver_libros(origen))
+
+    if usar_cache and ruta.exists():
+        info = _leer_info(ruta)
+        if info and info.get('version') == VERSION_BASE_SQL and info.get('huella') == huella:
+            return ruta
+
+    metadatos, datos = cargar_modelo_canonico(origen, usar_cache=usar_cache, workers=workers)
+    return guardar_base_sql(metadatos, datos, ruta, huella)
+
+def conectar(ruta=None):
+    """
+    Abre la base en solo lectura.
+
+    Args:
+        ruta: Archivo de la base. Por defecto CACHE_CONFIG['base_sql']
+
+    Returns:
+        sqlite3.Connection: Conexión de solo lectura
+
+    Raises:
+        FileNotFoundError: Si la base no existe
+    """
+    ruta = Path(ruta or CACHE_CONFIG['base_sql'])
+    if not ruta.exists():
+        raise FileNotFoundError(f"No existe la base SQL: {ruta}")
+    return sqlite3.connect(f"{ruta.resolve().as_uri()}?mode=ro", uri=True)
+
+def consultar_sql(consulta, ruta=None, parametros=()):
+    """
+    Ejecuta una consulta SQL sobre la base y devuelve el resultado.
+
+    Args:
+        consulta: Sentencia SQL (SELECT); la base se abre en solo lectura
+        ruta: Archivo de la base. Por defecto CACHE_CONFIG['base_sql']
+        parametros: Parámetros de la consulta (marcadores ?)
+
+    Returns:
+        pd.DataFrame: Filas devueltas por la consulta
+    """
+    conexion = conectar(ruta)
+    try:
+        return pd.read_sql_query(consulta, conexion, params=parametros)
+    finally:
+        conexion.close()
@@ -0,0 +1,469 @@
+"""
+Caché columnar persistente del modelo de series
+
+Guarda los DataFrames de metadatos y datos producidos por construir_modelo
+en data/processed/ (Parquet si pyarrow está disponible, pickle si no),
+identificados por la huella del libro Excel y la versión del parser. Mientras
+el libro no cambie, los siguientes arranques leen el formato columnar en lugar
+de volver a decodificar el Excel.
+
+Cuando el libro cambia, un segundo nivel de caché por hoja permite volver a
+leer solo las hojas modificadas y reutilizar el resultado del resto.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pandas as pd
+
+from .analizar_series import (
+    COLUMNAS_DATOS,
+    COLUMNAS_METADATOS,
+    _compactar_si_corresponde,
+    _consolidar_modelo,
+    _parsear_hoja,
+    _procesar_hoja,
+    _procesar_hojas_en_paralelo,
+    _registrar_celdas_omitidas,
+    construir_modelo,
+)
+from .config import CACHE_CONFIG, INGESTA_CONFIG
+from .intercambio_arrow import ARROW_DISPONIBLE, EXTENSION_IPC, guardar_ipc, leer_ipc
+from .lectores_excel import abrir_libro, seleccionar_motor
+
+# Incrementar cuando cambie la salida de construir_modelo para invalidar cachés viejas
+VERSION_PARSER = '4'
+
+# Opciones de INGESTA_CONFIG que cambian las filas del modelo guardado en caché
+# (compacto y valor_float32 se aplican al devolverlo y no hace falta incluirlas)
+OPCIONES_CON_EFECTO = ('recortar_por_metadatos',)
+
+try:
+    import pyarrow  # noqa: F401
+    FORMATO_COLUMNAR = 'parquet'
+except ImportError:
+    FORMATO_COLUMNAR = None
+
+def _firma_parser():
+    """VERSION_PARSER más los valores de OPCIONES_CON_EFECTO, para las huellas"""
+    opciones = ';'.join(f"{opcion}={INGESTA_CONFIG[opcion]!r}" for opcion in OPCIONES_CON_EFECTO)
+    return f"parser={VERSION_PARSER};{opciones};"
+
+def huella_libro(ruta_archivo, por_contenido=None):
+    """
+    Calcula la huella de un libro Excel.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        por_contenido: Si es True usa el SHA-256 del archivo; si es False,
+            tamaño y fecha de modificación. Por defecto CACHE_CONFIG['huella_por_contenido']
+
+    Returns:
+        str: Huella hexadecimal que incluye VERSION_PARSER y las opciones de
+            ingesta que cambian el modelo (OPCIONES_CON_EFECTO)
+    """
+    if por_contenido is None:
+        por_contenido = CACHE_CONFIG['huella_por_contenido']
+
+    h = hashlib.sha256(_firma_parser().encode())
+    if por_contenido:
+        with open(ruta_archivo, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloque)
+    else:
+        estado = os.stat(ruta_archivo)
+        h.update(f"{estado.st_size};{estado.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+def _guardar_frame(df, directorio, nombre, formato=None):
+    """
+    Guarda un DataFrame en Parquet, o en pickle si pyarrow no está instalado
+    o si alguna columna mezcla tipos que Parquet no admite.
+
+    Con formato='arrow' se escribe un archivo Arrow IPC sin comprimir, que
+    se lee mapeado en memoria (ver intercambio_arrow).
+
+    Returns:
+        str: Nombre del archivo escrito dentro de directorio
+    """
+    if formato == 'arrow' and ARROW_DISPONIBLE:
+        ruta = Path(directorio) / f"{nombre}{EXTENSION_IPC}"
+        try:
+            return guardar_ipc(df, ruta).name
+        except (TypeError, ValueError, pyarrow.ArrowException):
+            Path(f"{ruta}.tmp").unlink(missing_ok=True)
+
+    if FORMATO_COLUMNAR == 'parquet':
+        ruta = Path(directorio) / f"{nombre}.parquet"
+        temporal = Path(directorio) / f"{nombre}.parquet.tmp"
+        try:
+            df.to_parquet(temporal, index=False)
+            os.replace(temporal, ruta)
+            return ruta.name
+        except (TypeError, ValueError, pyarrow.ArrowException):
+            temporal.unlink(missing_ok=True)
+
+    ruta = Path(directorio) / f"{nombre}.pkl"
+    temporal = Path(directorio) / f"{nombre}.pkl.tmp"
+    df.to_pickle(temporal)
+    os.replace(temporal, ruta)
+    return ruta.name
+
+def _leer_frame(ruta, ids=None):
+    """
+    Lee un DataFrame guardado por _guardar_frame.
+
+    Si se indican ids, devuelve solo las filas de esos id_serie; en Parquet
+    el filtro se aplica al leer, sin cargar el resto del archivo. Los
+    archivos Arrow IPC se mapean en memoria en lugar de leerse.
+    """
+    ruta = Path(ruta)
+    if ruta.suffix == EXTENSION_IPC:
+        df = leer_ipc(ruta)
+        return df if ids is None else df[df['id_serie'].isin(ids)].reset_index(drop=True)
+    if ruta.suffix == '.parquet':
+        filtros = [('id_serie', 'in', list(ids))] if ids is not None else None
+        return pd.read_parquet(ruta, filters=filtros)
+    df = pd.read_pickle(ruta)
+    if ids is not None:
+        df = df[df['id_serie'].isin(ids)].reset_index(drop=True)
+    return df
+
+def _nombre_base(ruta_archivo):
+    """Nombre de caché del libro: su nombre más un hash corto de la ruta absoluta"""
+    ruta = Path(ruta_archivo).resolve()
+    return f"modelo_{ruta.stem}_{hashlib.sha1(str(ruta).encode()).hexdigest()[:8]}"
+
+def _ruta_manifiesto(ruta_archivo, directorio_cache):
+    return Path(directorio_cache) / f"{_nombre_base(ruta_archivo)}.json"
+
+def _leer_manifiesto(ruta_manifiesto):
+    try:
+        with open(ruta_manifiesto, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _escribir_manifiesto(ruta_manifiesto, manifiesto):
+    temporal = Path(f"{ruta_manifiesto}.tmp")
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False)
+    os.replace(temporal, ruta_manifiesto)
+
+_NS_HOJA = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_RELACION = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+def huellas_hojas(ruta_archivo):
+    """
+    Calcula una huella por hoja leyendo solo el índice del archivo XLSX.
+
+    La huella combina el CRC y el tamaño de la parte XML de la hoja con los de
+    las partes compartidas (cadenas y estilos), sin descomprimir las hojas.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+
+    Returns:
+        dict: {hoja: huella}, o None si el archivo no es un XLSX legible
+    """
+    try:
+        with zipfile.ZipFile(ruta_archivo) as zf:
+            libro = ET.fromstring(zf.read('xl/workbook.xml'))
+            relaciones = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+            destinos = {
+                rel.get('Id'): rel.get('Target') for rel in relaciones
+            }
+            partes = {info.filename: info for info in zf.infolist()}
+
+            def firma(nombre):
+                info = partes.get(nombre)
+                return f"{nombre}:{info.CRC}:{info.file_size}" if info else f"{nombre}:-"
+
+            comun = ';'.join(firma(nombre) for nombre in ('xl/sharedStrings.xml', 'xl/styles.xml'))
+            huellas = {}
+            for hoja in libro.iter(f'{_NS_HOJA}sheet'):
+                destino = destinos[hoja.get(f'{_NS_RELACION}id')]
+                parte = destino.lstrip('/') if destino.startswith('/') else posixpath.join('xl', destino)
+                contenido = f"{_firma_parser()}{firma(posixpath.normpath(parte))};{comun}"
+                huellas[hoja.get('name')] = hashlib.sha256(contenido.encode()).hexdigest()
+            return huellas
+    except (zipfile.BadZipFile, KeyError, ET.ParseError, OSError):
+        return None
+
+def _directorio_hojas(ruta_archivo, directorio_cache):
+    return Path(directorio_cache) / f"{_nombre_base(ruta_archivo)}_hojas"
+
+def _guardar_hoja(directorio_hojas, hoja, huella, resultado):
+    """
+    Guarda el resultado procesado de una hoja en la caché por hoja.
+
+    Returns:
+        dict: Entrada del manifiesto con la huella y los archivos escritos
+    """
+    directorio_hojas.mkdir(parents=True, exist_ok=True)
+    prefijo = f"{hashlib.sha1(hoja.encode()).hexdigest()[:12]}_{huella[:12]}"
+    meta_hoja, datos_hoja = resultado
+    return {
+        'huella': huella,
+        'metadatos': _guardar_frame(
+            pd.DataFrame(meta_hoja, columns=COLUMNAS_METADATOS), directorio_hojas, f"{prefijo}_metadatos"
+        ),
+        'datos': _guardar_frame(
+            datos_hoja, directorio_hojas, f"{prefijo}_datos"
+        ) if datos_hoja is not None else None,
+    }
+
+def _leer_hoja(ruta_archivo, hoja, ids, directorio_cache, motor, con_metadatos, usar_cache=True):
+    """
+    Resultado procesado de una hoja desde la caché por hoja, o decodificando
+    solo esa hoja del libro y agregándola a la caché. Sin usar_cache la hoja
+    siempre se decodifica y la caché no se lee ni se escribe.
+
+    Returns:
+        tuple: (metadatos de la hoja o None si no se piden, datos de la hoja)
+    """
+    directorio_cache = Path(directorio_cache or CACHE_CONFIG['directorio'])
+    directorio_hojas = _directorio_hojas(ruta_archivo, directorio_cache)
+    ruta_manifiesto = directorio_hojas / 'manifiesto.json'
+    huella = (huellas_hojas(ruta_archivo) or {}).get(hoja) if usar_cache else None
+
+    manifiesto = (_leer_manifiesto(ruta_manifiesto) or {}) if usar_cache else {}
+    entrada = manifiesto.get(hoja)
+    if huella and entrada and entrada['huella'] == huella:
+        try:
+            metadatos = _leer_frame(directorio_hojas / entrada['metadatos']) if con_metadatos else None
+            if entrada['datos'] is None:
+                return metadatos, pd.DataFrame(columns=COLUMNAS_DATOS)
+            return metadatos, _leer_frame(directorio_hojas / entrada['datos'], ids)
+        except (OSError, ValueError):
+            pass
+
+    libro = abrir_libro(ruta_archivo, motor)
+    resultado = _procesar_hoja(_parsear_hoja(libro, hoja), hoja)
+    _registrar_celdas_omitidas({hoja: resultado})
+    if huella:
+        manifiesto[hoja] = _guardar_hoja(directorio_hojas, hoja, huella, resultado)
+        _escribir_manifiesto(ruta_manifiesto, manifiesto)
+        # Los archivos de la versión anterior de la hoja ya no se usan
+        anterior = entrada or {}
+        for nombre in (anterior.get('metadatos'), anterior.get('datos')):
+            if nombre and nombre not in manifiesto[hoja].values():
+                (directorio_hojas / nombre).unlink(missing_ok=True)
+
+    meta_hoja, datos = resultado
+    metadatos = pd.DataFrame(meta_hoja, columns=COLUMNAS_METADATOS) if con_metadatos else None
+    if datos is None:
+        return metadatos, pd.DataFrame(columns=COLUMNAS_DATOS)
+    if ids is not None:
+        datos = datos[datos['id_serie'].isin(ids)]
+    return metadatos, datos.reset_index(drop=True)
+
+def leer_datos_hoja(ruta_archivo, hoja, ids=None, directorio_cache=None, motor=None):
+    """
+    Devuelve los datos en formato largo de una hoja, desde la caché si es posible.
+
+    Si la caché por hoja tiene una entrada vigente para la hoja se lee de ahí
+    (solo las filas de ids, si se indican). Si no, se decodifica únicamente
+    esa hoja del libro y el resultado se agrega a la caché por hoja, de modo
+    que la próxima lectura (o construir_modelo_incremental) lo reutilice.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        hoja: Nombre de la hoja
+        ids: id_serie a devolver; None para todas las series de la hoja
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+        motor: Motor de lectura de Excel (ver construir_modelo)
+
+    Returns:
+        pd.DataFrame: Columnas id_serie, fecha y valor
+    """
+    return _leer_hoja(ruta_archivo, hoja, ids, directorio_cache, motor, con_metadatos=False)[1]
+
+def leer_hoja(ruta_archivo, hoja, directorio_cache=None, motor=None, usar_cache=True):
+    """
+    Devuelve los metadatos y los datos de una hoja, desde la caché si es posible.
+
+    Igual que leer_datos_hoja, pero también devuelve las filas de metadatos de
+    la hoja tal como las arma construir_modelo antes de consolidar (incluida
+    la columna de fechas, que _consolidar_modelo descarta por no tener valores).
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        hoja: Nombre de la hoja
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+        motor: Motor de lectura de Excel (ver construir_modelo)
+        usar_cache: Si es False, decodifica la hoja sin leer ni escribir la caché
+
+    Returns:
+        tuple: (metadatos con COLUMNAS_METADATOS, datos con id_serie, fecha y valor)
+    """
+    return _leer_hoja(ruta_archivo, hoja, None, directorio_cache, motor, con_metadatos=True,
+                      usar_cache=usar_cache)
+
+def construir_modelo_incremental(ruta_archivo, directorio_cache=None, workers=None, motor=None):
+    """
+    Construye el modelo volviendo a leer solo las hojas que cambiaron.
+
+    Mantiene en el directorio de caché un manifiesto con la huella de cada hoja
+    y el resultado ya procesado (filas de metadatos y bloque de datos) de cada
+    una. Las hojas cuya huella coincide se reutilizan desde la caché.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+        workers: Procesos para releer las hojas modificadas (ver construir_modelo)
+        motor: Motor de lectura de Excel (ver construir_modelo)
+
+    Returns:
+        tuple: (metadatos, datos, reporte) donde reporte es un diccionario con
+            las listas de hojas 'reutilizadas' y 'reparseadas'
+    """
+    directorio_cache = Path(directorio_cache or CACHE_CONFIG['directorio'])
+    directorio_hojas = _directorio_hojas(ruta_archivo, directorio_cache)
+    ruta_manifiesto = directorio_hojas / 'manifiesto.json'
+
+    huellas = huellas_hojas(ruta_archivo) or {}
+    anterior = _leer_manifiesto(ruta_manifiesto) or {}
+    motor = seleccionar_motor(motor)
+    hojas = list(huellas) or list(abrir_libro(ruta_archivo, motor).sheet_names)
+
+    manifiesto = {}
+    resultados = {}
+    pendientes = []
+    for hoja in hojas:
+        entrada = anterior.get(hoja)
+        if entrada and entrada['huella'] == huellas.get(hoja):
+            try:
+                meta = _leer_frame(directorio_hojas / entrada['metadatos'])
+                datos = _leer_frame(directorio_hojas / entrada['datos']) if entrada['datos'] else None
+                resultados[hoja] = (meta.to_dict('records'), datos)
+                manifiesto[hoja] = entrada
+                continue
+            except (OSError, ValueError):
+                pass
+        pendientes.append(hoja)
+
+    workers = min(workers or INGESTA_CONFIG['workers'], len(pendientes))
+    if workers > 1:
+        resultados.update(_procesar_hojas_en_paralelo(ruta_archivo, pendientes, workers, motor))
+    elif pendientes:
+        libro = abrir_libro(ruta_archivo, motor)
+        for hoja in pendientes:
+            resultados[hoja] = _procesar_hoja(_parsear_hoja(libro, hoja), hoja)
+    _registrar_celdas_omitidas({hoja: resultados[hoja] for hoja in pendientes})
+
+    for hoja in pendientes:
+        if hoja in huellas:
+            manifiesto[hoja] = _guardar_hoja(directorio_hojas, hoja, huellas[hoja], resultados[hoja])
+
+    # Descartar archivos de hojas eliminadas o reemplazadas
+    if directorio_hojas.exists():
+        vigentes = {
+            nombre for entrada in manifiesto.values()
+            for nombre in (entrada['metadatos'], entrada['datos']) if nombre
+        }
+        for archivo in directorio_hojas.iterdir():
+            if archivo.name != 'manifiesto.json' and archivo.name not in vigentes:
+                archivo.unlink(missing_ok=True)
+        _escribir_manifiesto(ruta_manifiesto, manifiesto)
+
+    filas_meta = []
+    bloques = []
+    for hoja in hojas:
+        meta_hoja, datos_hoja = resultados[hoja]
+        filas_meta.extend(meta_hoja)
+        bloques.append(datos_hoja)
+
+    metadatos, datos = _consolidar_modelo(filas_meta, bloques)
+    reporte = {
+        'reutilizadas': [hoja for hoja in hojas if hoja not in pendientes],
+        'reparseadas': pendientes,
+    }
+    return metadatos, datos, reporte
+
+def limpiar_cache(ruta_archivo, directorio_cache=None, incluir_hojas=False):
+    """
+    Elimina los archivos de caché asociados a un libro Excel.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+        incluir_hojas: Si es True elimina también la caché por hoja
+    """
+    directorio_cache = Path(directorio_cache or CACHE_CONFIG['directorio'])
+    ruta_manifiesto = _ruta_manifiesto(ruta_archivo, directorio_cache)
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+    if manifiesto:
+        for nombre in manifiesto['archivos'].values():
+            (directorio_cache / nombre).unlink(missing_ok=True)
+    ruta_manifiesto.unlink(missing_ok=True)
+    if incluir_hojas:
+        shutil.rmtree(_directorio_hojas(ruta_archivo, directorio_cache), ignore_errors=True)
+
+def construir_modelo_cacheado(ruta_archivo, directorio_cache=None, usar_cache=True, **opciones):
+    """
+    Devuelve (metadatos, datos) desde la caché columnar o construyéndolos.
+
+    La caché es válida mientras coincidan la huella del libro, VERSION_PARSER
+    y las opciones de OPCIONES_CON_EFECTO; ante cualquier cambio se reconstruye
+    el modelo y se reemplazan los archivos.
+    La caché guarda siempre el modelo sin compactar; la opción compacto se
+    aplica al devolverlo.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+        usar_cache: Si es False, construye el modelo sin leer ni escribir la caché
+        **opciones: Argumentos adicionales para construir_modelo (streaming,
+            workers, motor, compacto)
+
+    Returns:
+        tuple: (metadatos, datos)
+    """
+    compacto = opciones.pop('compacto', None)
+    if not usar_cache:
+        return construir_modelo(ruta_archivo, compacto=compacto, **opciones)
+
+    directorio_cache = Path(directorio_cache or CACHE_CONFIG['directorio'])
+    ruta_manifiesto = _ruta_manifiesto(ruta_archivo, directorio_cache)
+    huella = huella_libro(ruta_archivo)
+
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+    if manifiesto and manifiesto.get('huella') == huella:
+        try:
+            return _compactar_si_corresponde((
+                _leer_frame(directorio_cache / manifiesto['archivos']['metadatos']),
+                _leer_frame(directorio_cache / manifiesto['archivos']['datos'])
+            ), compacto)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if CACHE_CONFIG['incremental'] and not opciones.get('streaming'):
+        metadatos, datos, reporte = construir_modelo_incremental(
+            ruta_archivo, directorio_cache,
+            workers=opciones.get('workers'), motor=opciones.get('motor')
+        )
+        total = len(reporte['reutilizadas']) + len(reporte['reparseadas'])
+        print(f"♻️ Hojas reutilizadas desde caché: {len(reporte['reutilizadas'])}/{total}"
+              f" (releídas: {', '.join(reporte['reparseadas']) or 'ninguna'})")
+    else:
+        metadatos, datos = construir_modelo(ruta_archivo, compacto=False, **opciones)
+
+    limpiar_cache(ruta_archivo, directorio_cache)
+    directorio_cache.mkdir(parents=True, exist_ok=True)
+    prefijo = f"{_nombre_base(ruta_archivo)}_{huella[:16]}"
+    archivos = {
+        'metadatos': _guardar_frame(metadatos, directorio_cache, f"{prefijo}_metadatos"),
+        'datos': _guardar_frame(datos, directorio_cache, f"{prefijo}_datos"),
+    }
+    _escribir_manifiesto(ruta_manifiesto, {
+        'huella': huella, 'version_parser': VERSION_PARSER, 'archivos': archivos
+    })
+
+    return _compactar_si_corresponde((metadatos, datos), compacto)
@@ -0,0 +1,170 @@
+"""
+Carga diferida de series para el dashboard
+
+Parte solo del catálogo de series (encabezados de las hojas) y trae las
+observaciones de cada serie la primera vez que se piden, desde la caché por
+hoja o desde el libro. Las series cargadas se mantienen en un LRU acotado,
+de modo que la memoria depende de lo que se consulta y no del tamaño del libro.
+
+La validación de calidad (ver validacion.py) necesita todas las observaciones
+de cada serie, así que no se ejecuta al escanear el catálogo: si
+DATA_CONFIG['validar_calidad'] está activa, se descartan del catálogo las
+series excluidas según la tabla de calidad del modelo canónico vigente en
+caché (ver modelo.calidad_en_cache). Sin esa caché, el catálogo incluye todas
+las series del libro.
+"""
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .analizar_series import COLUMNAS_DATOS, escanear_catalogo
+from .cache_modelo import leer_datos_hoja
+from .catalogo import asignar_claves, construir_catalogo, enriquecer_datos
+from .config import DASHBOARD_CONFIG, DATA_CONFIG
+from .modelo import calidad_en_cache
+
+def _catalogo_validado(ruta_archivo, motor=None, directorio_cache=None):
+    """Catálogo del libro sin las series que excluyó la última validación en caché"""
+    metadatos = escanear_catalogo(ruta_archivo, motor)
+    if not DATA_CONFIG['validar_calidad']:
+        return metadatos
+    calidad = calidad_en_cache(ruta_archivo, directorio_cache)
+    if calidad is None:
+        return metadatos
+    excluidas = calidad.loc[calidad['excluida'], 'id_serie']
+    return metadatos[~metadatos['id_serie'].isin(excluidas)].reset_index(drop=True)
+
+class SeriesDiferidas:
+    """Acceso a las series de un libro cargándolas bajo demanda con un LRU acotado"""
+
+    def __init__(self, ruta_archivo, max_series=None, directorio_cache=None, motor=None):
+        """
+        Args:
+            ruta_archivo: Ruta del libro Excel
+            max_series: Máximo de series en memoria. Por defecto
+                DASHBOARD_CONFIG['max_series_en_memoria']
+            directorio_cache: Directorio de la caché por hoja (ver cache_modelo)
+            motor: Motor de lectura de Excel (ver construir_modelo)
+        """
+        self.ruta_archivo = ruta_archivo
+        self.max_series = max_series or DASHBOARD_CONFIG['max_series_en_memoria']
+        self.directorio_cache = directorio_cache
+        self.motor = motor
+
+        vacio = pd.DataFrame(columns=COLUMNAS_DATOS)
+        self.metadatos, _ = asignar_claves(_catalogo_validado(ruta_archivo, motor, directorio_cache), vacio)
+        self.catalogo = construir_catalogo(self.metadatos)
+        self._hoja_por_id = dict(zip(self.metadatos['id_serie'], self.metadatos['hoja']))
+
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self.estadisticas = {'aciertos': 0, 'fallos': 0, 'desalojos': 0}
+
+    def __len__(self):
+        """Cantidad de series cargadas en memoria"""
+        return len(self._series)
+
+    def series_en_memoria(self):
+        """Devuelve los id_serie cargados, del menos al más usado recientemente"""
+        with self._lock:
+            return list(self._series)
+
+    def _guardar(self, id_serie, serie):
+        self._series[id_serie] = serie
+        self._series.move_to_end(id_serie)
+        while len(self._series) > self.max_series:
+            self._series.popitem(last=False)
+            self.estadisticas['desalojos'] += 1
+
+    def _cargar_faltantes(self, ids):
+        """Lee las series pedidas que no están en memoria, una lectura por hoja"""
+        faltantes = {}
+        for id_serie in ids:
+            if id_serie not in self._series:
+                faltantes.setdefault(self._hoja_por_id[id_serie], []).append(id_serie)
+
+        for hoja, ids_hoja in faltantes.items():
+            datos = leer_datos_hoja(
+                self.ruta_archivo, hoja, ids_hoja, self.directorio_cache, self.motor
+            )
+            por_id = dict(tuple(datos.groupby('id_serie', sort=False)))
+            for id_serie in ids_hoja:
+                serie = por_id.get(id_serie, datos.iloc[0:0])
+                self._guardar(id_serie, serie[['fecha', 'valor']].reset_index(drop=True))
+
+    def obtener_serie(self, id_serie):
+        """
+        Devuelve las observaciones de una serie, cargándola si hace falta.
+
+        Args:
+            id_serie: Identificador de la serie en el catálogo
+
+        Returns:
+            pd.DataFrame: Columnas fecha y valor
+
+        Raises:
+            KeyError: Si id_serie no está en el catálogo
+        """
+        return self.obtener_datos([id_serie])[['fecha', 'valor']].reset_index(drop=True)
+
+    def obtener_datos(self, ids):
+        """
+        Devuelve varias series en formato largo, enriquecidas con tipo y categoría.
+
+        Las series que no están en memoria se leen agrupadas por hoja. Si se
+        piden más series que max_series, las primeras pueden desalojarse antes
+        de terminar, pero el resultado siempre incluye todas las pedidas.
+
+        Args:
+            ids: id_serie a devolver
+
+        Returns:
+            pd.DataFrame: Columnas id_serie, clave_serie, fecha, valor, tipo y categoria
+
+        Raises:
+            KeyError: Si algún id_serie no está en el catálogo
+        """
+        ids = list(dict.fromkeys(ids))
+        desconocidos = [id_serie for id_serie in ids if id_serie not in self._hoja_por_id]
+        if desconocidos:
+            raise KeyError(f"Series fuera del catálogo: {', '.join(map(str, desconocidos[:5]))}")
+
+        partes = []
+        with self._lock:
+            for inicio in range(0, len(ids), self.max_series):
+                tanda = ids[inicio:inicio + self.max_series]
+                presentes = [id_serie for id_serie in tanda if id_serie in self._series]
+                # Marcar primero las presentes para que no se desalojen al cargar el resto
+                for id_serie in presentes:
+                    self._series.move_to_end(id_serie)
+                self.estadisticas['aciertos'] += len(presentes)
+                self.estadisticas['fallos'] += len(tanda) - len(presentes)
+                self._cargar_faltantes(tanda)
+                for id_serie in tanda:
+                    self._series.move_to_end(id_serie)
+                    partes.append(self._series[id_serie].assign(id_serie=id_serie))
+
+        if not partes:
+            datos = pd.DataFrame(columns=COLUMNAS_DATOS)
+        else:
+            datos = pd.concat(partes, ignore_index=True)[COLUMNAS_DATOS]
+        _, datos = asignar_claves(self.metadatos, datos)
+        return enriquecer_datos(datos, self.catalogo)
+
+    def cargar_todas(self):
+        """
+        Lee todas las series sin pasar por el LRU (por ejemplo, para exportar).
+
+        Returns:
+            pd.DataFrame: Igual que obtener_datos para todo el catálogo
+        """
+        partes = [
+            leer_datos_hoja(self.ruta_archivo, hoja, None, self.directorio_cache, self.motor)
+            for hoja in self.metadatos['hoja'].unique()
+        ]
+        datos = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUMNAS_DATOS)
+        datos = datos[datos['id_serie'].isin(list(self._hoja_por_id))].reset_index(drop=True)
+        _, datos = asignar_claves(self.metadatos, datos)
+        return enriquecer_datos(datos, self.catalogo)
@@ -0,0 +1,104 @@
+"""
+Claves enteras de series y catálogo de búsqueda
+
+Cada serie del modelo recibe una clave entera densa (clave_serie) que vale su
+posición en metadatos. Con ella, filtrar datos por series y agregar columnas
+de metadatos se resuelve indexando arreglos en lugar de unir por id_serie.
+El id_serie de texto se conserva para mostrar y exportar.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columnas del catálogo, indexado por clave_serie
+COLUMNAS_CATALOGO = ['id_serie', 'hoja', 'columna', 'tipo', 'categoria', 'unidad']
+
+# Clave de las filas de datos cuya serie no tiene metadatos válidos
+CLAVE_SIN_METADATOS = -1
+
+def asignar_claves(metadatos, datos):
+    """
+    Agrega la columna clave_serie (int32) a metadatos y datos.
+
+    La clave de cada serie es su posición en metadatos; las filas de datos de
+    series sin metadatos reciben CLAVE_SIN_METADATOS. Si las columnas ya
+    existen se recalculan.
+
+    Args:
+        metadatos: DataFrame de metadatos con id_serie únicos
+        datos: DataFrame de datos en formato largo
+
+    Returns:
+        tuple: (metadatos, datos) con clave_serie a continuación de id_serie
+    """
+    metadatos = metadatos.drop(columns='clave_serie', errors='ignore')
+    datos = datos.drop(columns='clave_serie', errors='ignore')
+
+    ids = pd.Index(metadatos['id_serie'].astype(object))
+    claves = pd.Categorical(datos['id_serie'].astype(object), categories=ids).codes
+
+    metadatos.insert(1, 'clave_serie', np.arange(len(metadatos), dtype=np.int32))
+    datos.insert(1, 'clave_serie', claves.astype(np.int32))
+    return metadatos, datos
+
+def construir_catalogo(metadatos):
+    """
+    Arma la tabla clave_serie → hoja/columna/tipo/categoria/unidad.
+
+    El catálogo tiene una fila por cada clave entre 0 y la máxima de
+    metadatos, de modo que la fila i corresponde a la clave i aunque
+    metadatos esté filtrado (las claves ausentes quedan con NaN).
+
+    Args:
+        metadatos: DataFrame de metadatos con clave_serie
+
+    Returns:
+        DataFrame: Catálogo indexado por clave_serie
+    """
+    tamaño = int(metadatos['clave_serie'].max()) + 1 if len(metadatos) else 0
+    catalogo = metadatos.set_index('clave_serie').reindex(pd.RangeIndex(tamaño, name='clave_serie'))
+    columna = catalogo['id_serie'].astype(object).str.rsplit('__col', n=1).str[1]
+    catalogo['columna'] = pd.to_numeric(columna, errors='coerce').astype('Int64')
+    return catalogo[COLUMNAS_CATALOGO]
+
+def filtrar_por_claves(datos, claves):
+    """
+    Devuelve las filas de datos cuyas claves están en claves.
+
+    Args:
+        datos: DataFrame con clave_serie
+        claves: Claves a conservar
+
+    Returns:
+        DataFrame: Filas seleccionadas, con el índice original
+    """
+    claves = np.asarray(claves, dtype=np.int64)
+    codigos = datos['clave_serie'].to_numpy()
+    tamaño = int(max(codigos.max(initial=-1), claves.max(initial=-1))) + 2
+    seleccion = np.zeros(tamaño, dtype=bool)
+    seleccion[claves] = True
+    # La última posición queda en False y atiende a CLAVE_SIN_METADATOS
+    seleccion[-1] = False
+    return datos[seleccion[codigos]]
+
+def enriquecer_datos(datos, catalogo, columnas=('tipo', 'categoria')):
+    """
+    Agrega columnas del catálogo a datos indexando por clave_serie.
+
+    Args:
+        datos: DataFrame con clave_serie
+        catalogo: Resultado de construir_catalogo
+        columnas: Columnas del catálogo a agregar
+
+    Returns:
+        DataFrame: Copia de datos con las columnas agregadas (se conserva el
+            tipo de cada columna, incluidas las categóricas)
+    """
+    claves = datos['clave_serie'].to_numpy()
+    if len(claves) and (claves.min() < 0 or claves.max() >= len(catalogo)):
+        raise ValueError("datos tiene claves fuera del catálogo; filtrar antes con filtrar_por_claves")
+
+    datos = datos.copy()
+    for columna in columnas:
+        datos[columna] = pd.Series(catalogo[columna].array.take(claves), index=datos.index)
+    return datos
@@ -26,7 +26,10 @@ DASHBOARD_CONFIG = {
     'host': '127.0.0.1',
     'port': 8050,
     'debug': False,
-    'title': 'Análisis de Series Temporales'
+    'title': 'Análisis de Series Temporales',
+    'carga_diferida': False,         # Arrancar solo con el catálogo y cargar series al pedirlas
+    'max_series_en_memoria': 200,    # Tamaño del LRU de series en modo diferido
+    'almacen_compartido': True       # Mapear los datos desde data/processed (compartidos entre workers)
 }
 
 # Configuración de visualización
@@ -41,7 +44,10 @@ PLOT_CONFIG = {
 DATA_CONFIG = {
     'date_format': '%Y-%m-%d',
     'decimal_places': 2,
-    'missing_value_threshold': 0.1  # 10% de valores faltantes máximo
+    'missing_value_threshold': 0.1,  # 10% de valores faltantes máximo
+    'validar_calidad': False,        # Validar las series al ingerir y excluir las que superan el umbral
+    'filas_por_bloque': 1_000_000,   # Filas por bloque en la agregación fuera de memoria (ver agregacion.py)
+    'workers_analisis': None         # Procesos para el análisis por fragmentos (None = núcleos disponibles)
 }
 
 # Configuración de exportación
@@ -52,6 +58,26 @@ EXPORT_CONFIG = {
     'image_dpi': 300
 }
 
+# Configuración de ingesta del libro Excel
+INGESTA_CONFIG = {
+    'celdas_por_bloque': 1_000_000,  # Máximo de celdas por bloque en modo streaming
+    'workers': 1,                    # Procesos para leer hojas en paralelo (1 = secuencial)
+    'motor_excel': 'auto',           # 'auto' (calamine si está instalado), 'calamine' u 'openpyxl'
+    'modelo_compacto': False,        # Columnas de texto como categóricas (ver utils.compactar_modelo)
+    'valor_float32': False,          # En el modelo compacto, guardar valor como float32
+    'recortar_por_metadatos': False  # Descartar valores fuera de fecha_inicio/fecha_fin
+}
+
+# Configuración de la caché del modelo procesado
+CACHE_CONFIG = {
+    'directorio': 'data/processed/cache',
+    'huella_por_contenido': False,  # False: tamaño + fecha de modificación; True: SHA-256
+    'incremental': True,            # Releer solo las hojas modificadas cuando cambia el libro
+    'directorio_almacen': 'data/processed/almacen',  # Almacenes .npy mapeados en memoria
+    'base_sql': 'data/processed/series.sqlite',      # Base SQLite para consultas ad hoc (--modo sql)
+    'formato_modelo': 'arrow'       # Caché del modelo canónico: 'arrow' (IPC mapeado en memoria) o 'parquet'
+}
+
 # Mensajes del sistema
 MESSAGES = {
     'loading': '🔄 Cargando datos...',
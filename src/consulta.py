@@ -0,0 +1,240 @@
+"""
+Consultas diferidas sobre el almacén de series
+
+Una Consulta acumula filtros (tipo, categoría, series y rango de fechas),
+columnas y agrupaciones sin ejecutar nada; recién a_dataframe, valores o
+agregar resuelven la consulta, en un solo paso:
+
+1. Los filtros por tipo, categoría y series se evalúan sobre los metadatos
+   (una fila por serie) y dan las claves de las series.
+2. El rango de fechas se resuelve con búsqueda binaria en el almacén
+   (AlmacenSeries.posiciones_en_rango) sobre esas claves.
+3. Solo se arman las columnas que la consulta usa, tomando de cada arreglo
+   las posiciones elegidas; tipo, categoría y demás columnas del catálogo
+   se obtienen indexando por clave_serie.
+
+Ejemplo:
+    consulta = Consulta(almacen).filtrar(tipo='Económico', desde='2020-01-01')
+    consulta.agrupar('categoria').agregar('count', 'mean')
+"""
+
+import numpy as np
+import pandas as pd
+
+from .almacen_series import AlmacenSeries
+
+# Columnas que se leen directamente de los arreglos del almacén
+ARREGLOS_COLUMNAS = {'clave_serie': 'claves_filas', 'fecha': 'fechas', 'valor': 'valores'}
+
+# Columnas del modelo que devuelve a_dataframe si no se eligen otras
+COLUMNAS_POR_DEFECTO = ('id_serie', 'clave_serie', 'fecha', 'valor')
+
+def _como_lista(valor):
+    """Normaliza un valor o una colección de valores a lista (None si no hay filtro)"""
+    if valor is None:
+        return None
+    if isinstance(valor, (str, bytes)) or np.ndim(valor) == 0:
+        return [valor]
+    return list(valor)
+
+def _intersecar(actual, nuevo):
+    """Combina dos filtros de pertenencia (None equivale a sin filtro)"""
+    if actual is None:
+        return nuevo
+    if nuevo is None:
+        return actual
+    nuevo = set(nuevo)
+    return [valor for valor in actual if valor in nuevo]
+
+class Consulta:
+    """Consulta diferida sobre un AlmacenSeries: filtrar, seleccionar, agrupar y agregar"""
+
+    def __init__(self, almacen):
+        """
+        Args:
+            almacen: AlmacenSeries sobre el que se ejecuta la consulta
+        """
+        self.almacen = almacen
+        self._tipos = None
+        self._categorias = None
+        self._ids = None
+        self._desde = None
+        self._hasta = None
+        self._columnas = COLUMNAS_POR_DEFECTO
+        self._grupos = ()
+        self._frecuencia = None
+
+    @classmethod
+    def desde_modelo(cls, metadatos, datos):
+        """Consulta sobre el almacén armado a partir de (metadatos, datos)"""
+        return cls(AlmacenSeries.desde_modelo(metadatos, datos))
+
+    def _copiar(self, **cambios):
+        """Devuelve una nueva consulta con los cambios indicados; la original no se modifica"""
+        nueva = object.__new__(Consulta)
+        nueva.__dict__.update(self.__dict__)
+        for atributo, valor in cambios.items():
+            setattr(nueva, f"_{atributo}", valor)
+        return nueva
+
+    def filtrar(self, tipo=None, categoria=None, series=None, desde=None, hasta=None):
+        """
+        Agrega filtros a la consulta; se combinan con los anteriores (y lógico).
+
+        Args:
+            tipo: Tipo o lista de tipos
+            categoria: Categoría o lista de categorías
+            series: id_serie o lista de id_serie
+            desde: Fecha mínima, incluida
+            hasta: Fecha máxima, incluida
+
+        Returns:
+            Consulta: Nueva consulta con los filtros agregados
+        """
+        desde = pd.Timestamp(desde) if desde is not None else None
+        hasta = pd.Timestamp(hasta) if hasta is not None else None
+        if self._desde is not None and desde is not None:
+            desde = max(desde, self._desde)
+        if self._hasta is not None and hasta is not None:
+            hasta = min(hasta, self._hasta)
+        return self._copiar(
+            tipos=_intersecar(self._tipos, _como_lista(tipo)),
+            categorias=_intersecar(self._categorias, _como_lista(categoria)),
+            ids=_intersecar(self._ids, _como_lista(series)),
+            desde=desde if desde is not None else self._desde,
+            hasta=hasta if hasta is not None else self._hasta,
+        )
+
+    def seleccionar(self, *columnas):
+        """
+        Elige las columnas que devuelve a_dataframe.
+
+        Args:
+            *columnas: id_serie, clave_serie, fecha, valor o columnas del
+                catálogo (tipo, categoria, hoja, columna, unidad)
+
+        Returns:
+            Consulta: Nueva consulta con esas columnas
+        """
+        desconocidas = [c for c in columnas if c not in ARREGLOS_COLUMNAS and c not in self.almacen.catalogo]
+        if desconocidas:
+            raise KeyError(f"Columnas desconocidas: {', '.join(desconocidas)}")
+        return self._copiar(columnas=tuple(columnas))
+
+    def agrupar(self, *columnas, frecuencia=None):
+        """
+        Define las columnas de agrupación para agregar.
+
+        Args:
+            *columnas: Columnas de agrupación (ver seleccionar)
+            frecuencia: Unidad de fecha de NumPy ('D', 'M', 'Y', ...) para
+                agrupar además por la fecha truncada a esa unidad
+
+        Returns:
+            Consulta: Nueva consulta agrupada
+        """
+        return self._copiar(grupos=tuple(columnas), frecuencia=frecuencia)
+
+    def claves(self):
+        """
+        Claves de las series que cumplen los filtros de tipo, categoría y series.
+
+        Returns:
+            np.ndarray | None: Claves en orden creciente, o None si no hay
+                filtros por serie (todas las series)
+        """
+        if self._tipos is None and self._categorias is None and self._ids is None:
+            return None
+        metadatos = self.almacen.metadatos
+        mascara = np.ones(len(metadatos), dtype=bool)
+        for columna, valores in (('tipo', self._tipos), ('categoria', self._categorias),
+                                 ('id_serie', self._ids)):
+            if valores is not None:
+                mascara &= metadatos[columna].isin(valores).to_numpy()
+        return np.sort(metadatos['clave_serie'].to_numpy()[mascara])
+
+    def _posiciones(self):
+        """Posiciones de las filas que cumplen todos los filtros (None para todas)"""
+        claves = self.claves()
+        if claves is None and self._desde is None and self._hasta is None:
+            return None
+        return self.almacen.posiciones_en_rango(self._desde, self._hasta, claves)
+
+    def _columnas_filas(self, columnas):
+        """Arma solo las columnas pedidas para las filas que cumplen los filtros"""
+        almacen = self.almacen
+        posiciones = self._posiciones()
+
+        def tomar(arreglo):
+            return arreglo if posiciones is None else arreglo[posiciones]
+
+        claves_filas = tomar(almacen.claves_filas)
+        resultado = {}
+        for columna in columnas:
+            if columna == 'clave_serie':
+                resultado[columna] = claves_filas
+            elif columna in ARREGLOS_COLUMNAS:
+                resultado[columna] = tomar(getattr(almacen, ARREGLOS_COLUMNAS[columna]))
+            else:
+                resultado[columna] = almacen.catalogo[columna].array.take(claves_filas)
+        return resultado
+
+    def a_dataframe(self):
+        """
+        Ejecuta la consulta y devuelve las filas en formato largo.
+
+        Returns:
+            pd.DataFrame: Columnas elegidas con seleccionar, en orden de serie y fecha
+        """
+        return pd.DataFrame(self._columnas_filas(self._columnas))
+
+    def valores(self):
+        """
+        Ejecuta la consulta y devuelve solo los valores.
+
+        Returns:
+            np.ndarray: valor de las filas que cumplen los filtros
+        """
+        return self._columnas_filas(('valor',))['valor']
+
+    def agregar(self, *funciones, **nombradas):
+        """
+        Ejecuta la consulta y agrega valor (o las columnas indicadas) por grupo.
+
+        Args:
+            *funciones: Agregaciones de pandas sobre valor ('count', 'mean', ...)
+            **nombradas: Agregaciones con nombre, como nombre=(columna, función)
+
+        Returns:
+            Con grupos, un DataFrame indexado por los grupos (una Series si se
+            pide una sola función posicional); sin grupos, una Series con un
+            valor por agregación (un escalar si se pide una sola función)
+        """
+        if not funciones and not nombradas:
+            funciones = ('count',)
+        necesarias = dict.fromkeys(self._grupos)
+        if self._frecuencia:
+            necesarias['fecha'] = None
+        if funciones:
+            necesarias['valor'] = None
+        for columna, _ in nombradas.values():
+            necesarias[columna] = None
+
+        filas = pd.DataFrame(self._columnas_filas(tuple(necesarias)))
+        por = list(self._grupos)
+        if self._frecuencia:
+            fechas = filas['fecha'].to_numpy()
+            filas['fecha'] = fechas.astype(f'datetime64[{self._frecuencia}]').astype(fechas.dtype)
+            if 'fecha' not in por:
+                por.append('fecha')
+
+        if not por:
+            if funciones:
+                return filas['valor'].agg(funciones[0] if len(funciones) == 1 else list(funciones))
+            return pd.Series({nombre: filas[columna].agg(funcion)
+                              for nombre, (columna, funcion) in nombradas.items()})
+
+        grupos = filas.groupby(por, observed=True, sort=True)
+        if funciones:
+            return grupos['valor'].agg(funciones[0] if len(funciones) == 1 else list(funciones))
+        return grupos.agg(**nombradas)
@@ -0,0 +1,165 @@
+"""
+Conversión vectorizada de fechas de las hojas Excel
+
+Las celdas de fecha llegan como timestamps ya tipados (lo habitual con
+openpyxl y calamine), como números de serie de Excel o como texto. Cada caso
+se convierte en bloque: los timestamps pasan sin reinterpretarse, los números
+de serie se resuelven con aritmética de arreglos y el formato de los textos se
+infiere una sola vez y se aplica a toda la columna o fila.
+"""
+
+import warnings
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Unidad de todas las fechas devueltas: la que usa pandas para timestamps
+# (microsegundos desde pandas 3, nanosegundos en las versiones anteriores)
+UNIDAD_FECHAS = 'us' if int(pd.__version__.split('.')[0]) >= 3 else 'ns'
+
+# Día 0 del sistema de fechas 1900 de Excel, válido desde el serial 61
+EPOCA_EXCEL = np.datetime64('1899-12-30', UNIDAD_FECHAS)
+
+# Serial del inexistente 29/02/1900 y del 31/12/9999, último día admitido
+SERIAL_29_FEB_1900 = 60
+SERIAL_EXCEL_MAXIMO = 2958465
+
+# Textos distintos que se prueban para inferir el formato
+MUESTRAS_FORMATO = 20
+
+_UNIDADES_POR_DIA = np.timedelta64(1, 'D') // np.timedelta64(1, UNIDAD_FECHAS)
+
+_TIPOS_TIMESTAMP = ('datetime', 'datetime64', 'date')
+_TIPOS_NUMERICOS = ('integer', 'floating', 'mixed-integer-float', 'decimal')
+
+def _sin_fechas(cantidad):
+    return np.full(cantidad, np.datetime64('NaT', UNIDAD_FECHAS))
+
+def convertir_serial_excel(seriales):
+    """
+    Convierte números de serie de Excel (sistema 1900) a fechas.
+
+    La parte fraccionaria es la hora del día. Excel cuenta un 29/02/1900 que
+    no existió, por lo que los seriales anteriores se corren un día y el
+    propio 60 queda en NaT, igual que los valores fuera de rango.
+
+    Args:
+        seriales: Números de serie (arreglo numérico, NaN admitido)
+
+    Returns:
+        np.ndarray: datetime64[UNIDAD_FECHAS] alineado con seriales
+    """
+    dias = np.asarray(seriales, dtype=float)
+    validos = (dias >= 1) & (dias < SERIAL_EXCEL_MAXIMO + 1)
+    validos &= np.floor(np.where(validos, dias, 0)) != SERIAL_29_FEB_1900
+
+    dias = np.where(validos, dias, 0)
+    dias = np.where(dias < SERIAL_29_FEB_1900, dias + 1, dias)
+    desplazamiento = np.round(dias * _UNIDADES_POR_DIA).astype(np.int64)
+    fechas = EPOCA_EXCEL + desplazamiento.astype(f'timedelta64[{UNIDAD_FECHAS}]')
+    fechas[~validos] = np.datetime64('NaT')
+    return fechas
+
+def inferir_formato(valores, preferido=None):
+    """
+    Infiere el formato strftime de las fechas escritas como texto.
+
+    Se prueban los formatos sugeridos por pandas (mes primero y día primero)
+    sobre hasta MUESTRAS_FORMATO textos distintos y se elige el que reconoce
+    más de ellos; así '13/02/2020' resuelve la ambigüedad de '01/02/2020'.
+
+    Args:
+        valores: Celdas de una columna o fila
+        preferido: Formato que gana los empates (por ejemplo, el de otra
+            parte de la misma hoja), si reconoce los mismos textos que el mejor
+
+    Returns:
+        str | None: Formato, o None si no hay textos con forma de fecha
+    """
+    textos = (valor.strip() for valor in valores if isinstance(valor, str))
+    muestras = list(islice(dict.fromkeys(texto for texto in textos if texto), MUESTRAS_FORMATO))
+
+    candidatos = []
+    with warnings.catch_warnings():
+        # pandas avisa cuando el formato sugerido contradice dayfirst: acá se prueban ambos
+        warnings.simplefilter('ignore', UserWarning)
+        for texto in muestras:
+            for dia_primero in (False, True):
+                formato = guess_datetime_format(texto, dayfirst=dia_primero)
+                if formato and formato not in candidatos:
+                    candidatos.append(formato)
+    if muestras and preferido and preferido not in candidatos:
+        candidatos.append(preferido)
+
+    mejor, reconocidos_mejor = None, 0
+    for formato in candidatos:
+        reconocidos = pd.to_datetime(pd.Series(muestras), format=formato, errors='coerce').notna().sum()
+        empate = reconocidos and reconocidos == reconocidos_mejor and formato == preferido
+        if reconocidos > reconocidos_mejor or empate:
+            mejor, reconocidos_mejor = formato, reconocidos
+    return mejor
+
+def _convertir_textos(textos, formato):
+    textos = pd.Series(textos, dtype=object).str.strip()
+    if formato is None:
+        formato = inferir_formato(textos)
+    if formato is None:
+        return _sin_fechas(len(textos))
+    fechas = pd.to_datetime(textos, format=formato, errors='coerce')
+    return fechas.dt.as_unit(UNIDAD_FECHAS).to_numpy()
+
+def _convertir_timestamps(valores):
+    fechas = pd.to_datetime(pd.Series(valores, dtype=object), errors='coerce')
+    return fechas.dt.as_unit(UNIDAD_FECHAS).to_numpy()
+
+def convertir_fechas(valores, formato=None):
+    """
+    Convierte una columna o fila de celdas a fechas.
+
+    Las celdas vacías y las que no representan una fecha quedan en NaT.
+    Cuando todas las celdas son del mismo tipo la conversión es una única
+    operación sobre el arreglo; solo las columnas mezcladas se separan por
+    tipo antes de convertir cada parte.
+
+    Args:
+        valores: Celdas (Series, arreglo o lista)
+        formato: Formato de las fechas escritas como texto. Si es None se
+            infiere una vez con inferir_formato
+
+    Returns:
+        np.ndarray: datetime64[UNIDAD_FECHAS] alineado con valores
+    """
+    arreglo = valores.to_numpy() if isinstance(valores, (pd.Series, pd.Index)) else np.asarray(valores)
+    if arreglo.dtype.kind == 'M':
+        return arreglo.astype(f'datetime64[{UNIDAD_FECHAS}]')
+    if arreglo.dtype.kind in 'iuf':
+        return convertir_serial_excel(arreglo)
+
+    arreglo = arreglo.astype(object)
+    tipo = pd.api.types.infer_dtype(arreglo, skipna=True)
+    if tipo == 'empty':
+        return _sin_fechas(len(arreglo))
+    if tipo in _TIPOS_TIMESTAMP:
+        return _convertir_timestamps(arreglo)
+    if tipo in _TIPOS_NUMERICOS:
+        return convertir_serial_excel(pd.to_numeric(pd.Series(arreglo), errors='coerce'))
+    if tipo == 'string':
+        return _convertir_textos(arreglo, formato)
+
+    # Columna mezclada: cada tipo de celda se convierte por separado
+    fechas = _sin_fechas(len(arreglo))
+    es_texto = np.fromiter((isinstance(v, str) for v in arreglo), dtype=bool, count=len(arreglo))
+    es_numero = np.fromiter(
+        (isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)) for v in arreglo),
+        dtype=bool, count=len(arreglo)
+    )
+    resto = ~es_texto & ~es_numero
+    if es_texto.any():
+        fechas[es_texto] = _convertir_textos(arreglo[es_texto], formato)
+    if es_numero.any():
+        fechas[es_numero] = convertir_serial_excel(arreglo[es_numero].astype(float))
+    if resto.any():
+        fechas[resto] = _convertir_timestamps(arreglo[resto])
+    return fechas
@@ -0,0 +1,154 @@
+"""
+Ingesta de varios libros Excel en un único modelo
+
+Recibe un directorio, un patrón glob o un libro suelto, procesa los libros en
+paralelo (cada uno con su propia caché) y une los resultados en un solo par
+(metadatos, datos). Los id_serie se prefijan con el nombre del libro de origen
+para que no choquen entre archivos.
+"""
+
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from .analizar_series import _compactar_si_corresponde
+from .cache_modelo import construir_modelo_cacheado
+from .catalogo import asignar_claves
+from .config import INGESTA_CONFIG
+
+# Extensiones de libro que se toman al recorrer un directorio
+EXTENSIONES_LIBRO = ('.xlsx', '.xlsm')
+
+# Separador entre el nombre del libro y el id_serie original
+SEPARADOR_ORIGEN = '::'
+
+def resolver_libros(origen):
+    """
+    Lista los libros Excel a ingerir.
+
+    Args:
+        origen: Ruta a un libro, a un directorio o patrón glob
+
+    Returns:
+        list: Rutas de los libros, ordenadas (sin archivos temporales ~$)
+    """
+    ruta = Path(origen)
+    if ruta.is_file():
+        return [ruta]
+    if ruta.is_dir():
+        candidatos = [p for p in ruta.iterdir() if p.suffix.lower() in EXTENSIONES_LIBRO]
+    else:
+        candidatos = [Path(p) for p in glob.glob(str(origen), recursive=True)]
+    return sorted(p for p in candidatos if p.is_file() and not p.name.startswith('~$'))
+
+def es_origen_multiple(origen):
+    """Indica si origen apunta a varios libros (directorio o patrón) y no a uno solo"""
+    return not Path(origen).is_file()
+
+def _ingestar_libro(ruta_archivo, usar_cache, motor):
+    """
+    Construye el modelo de un libro dentro de un proceso worker.
+
+    Returns:
+        tuple: (metadatos, datos, segundos)
+    """
+    inicio = time.perf_counter()
+    metadatos, datos = construir_modelo_cacheado(
+        ruta_archivo, usar_cache=usar_cache, workers=1, motor=motor, compacto=False
+    )
+    return metadatos, datos, time.perf_counter() - inicio
+
+def _prefijar_origen(metadatos, datos, nombre):
+    """Prefija id_serie con el nombre del libro y agrega la columna archivo"""
+    metadatos = metadatos.copy()
+    datos = datos.copy()
+    metadatos['id_serie'] = nombre + SEPARADOR_ORIGEN + metadatos['id_serie'].astype(str)
+    datos['id_serie'] = nombre + SEPARADOR_ORIGEN + datos['id_serie'].astype(str)
+    metadatos.insert(metadatos.columns.get_loc('hoja'), 'archivo', nombre)
+    return metadatos, datos
+
+def construir_modelo_multiple(origen, workers=None, usar_cache=True, motor=None, compacto=None):
+    """
+    Construye un único modelo a partir de varios libros Excel.
+
+    Args:
+        origen: Directorio, patrón glob o libro (ver resolver_libros)
+        workers: Procesos para leer libros en paralelo. Por defecto
+            INGESTA_CONFIG['workers']
+        usar_cache: Si es False, no lee ni escribe la caché de cada libro
+        motor: Motor de lectura de Excel (ver construir_modelo)
+        compacto: Tipos compactos para el modelo unido (ver construir_modelo)
+
+    Returns:
+        tuple: (metadatos, datos, reporte) donde reporte es un DataFrame con
+            series, filas y segundos por libro
+
+    Raises:
+        FileNotFoundError: Si origen no contiene libros Excel
+    """
+    libros = resolver_libros(origen)
+    if not libros:
+        raise FileNotFoundError(f"No se encontraron libros Excel en: {origen}")
+
+    nombres = [libro.stem for libro in libros]
+    repetidos = sorted({nombre for nombre in nombres if nombres.count(nombre) > 1})
+    if repetidos:
+        raise ValueError(f"Hay libros con el mismo nombre en distintas carpetas: {', '.join(repetidos)}")
+
+    workers = min(workers or INGESTA_CONFIG['workers'], len(libros))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = list(pool.map(
+                _ingestar_libro, libros, [usar_cache] * len(libros), [motor] * len(libros)
+            ))
+    else:
+        resultados = [_ingestar_libro(libro, usar_cache, motor) for libro in libros]
+
+    partes_meta = []
+    partes_datos = []
+    filas_reporte = []
+    for libro, nombre, (metadatos, datos, segundos) in zip(libros, nombres, resultados):
+        metadatos, datos = _prefijar_origen(metadatos, datos, nombre)
+        partes_meta.append(metadatos)
+        partes_datos.append(datos)
+        filas_reporte.append({
+            'archivo': libro.name, 'series': len(metadatos), 'filas': len(datos), 'segundos': segundos
+        })
+
+    metadatos, datos = asignar_claves(
+        pd.concat(partes_meta, ignore_index=True), pd.concat(partes_datos, ignore_index=True)
+    )
+    metadatos, datos = _compactar_si_corresponde((metadatos, datos), compacto)
+    return metadatos, datos, pd.DataFrame(filas_reporte)
+
+def imprimir_reporte_ingesta(reporte):
+    """Muestra el tiempo y la cantidad de filas de cada libro ingerido"""
+    print(f"📚 Libros ingeridos: {len(reporte)}")
+    print(reporte.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print(f"   Total: {reporte['series'].sum()} series, {reporte['filas'].sum()} filas, "
+          f"{reporte['segundos'].sum():.2f} s")
+
+def cargar_modelo(origen, usar_cache=True, **opciones):
+    """
+    Punto de entrada común para uno o varios libros.
+
+    Con un único libro delega en construir_modelo_cacheado; con un directorio
+    o patrón usa construir_modelo_multiple e imprime el reporte por libro.
+
+    Args:
+        origen: Libro, directorio o patrón glob
+        usar_cache: Ver construir_modelo_cacheado
+        **opciones: workers, motor, compacto
+
+    Returns:
+        tuple: (metadatos, datos)
+    """
+    if not es_origen_multiple(origen):
+        return construir_modelo_cacheado(origen, usar_cache=usar_cache, **opciones)
+
+    metadatos, datos, reporte = construir_modelo_multiple(origen, usar_cache=usar_cache, **opciones)
+    imprimir_reporte_ingesta(reporte)
+    return metadatos, datos
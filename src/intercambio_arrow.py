@@ -0,0 +1,123 @@
+"""
+Intercambio del modelo en formato Arrow
+
+Representa metadatos y datos como tablas Arrow y los guarda en archivos
+Arrow IPC sin comprimir. Un archivo IPC se abre mapeado en memoria: la tabla
+apunta directamente a las páginas del archivo, sin decodificar ni copiar, y
+varios procesos que abren el mismo archivo comparten esas páginas. Por eso
+es el formato para pasar el modelo entre la ingesta, los reportes, el
+dashboard y los procesos worker.
+
+Al convertir a pandas, las columnas numéricas y de fechas sin nulos quedan
+como vistas de los buffers Arrow (split_blocks evita consolidarlas en un
+bloque nuevo) y las de texto quedan respaldadas por Arrow; las categóricas se
+guardan como columnas diccionario y solo se copian sus códigos.
+
+pyarrow es opcional: sin él, ARROW_DISPONIBLE es False y quienes usan este
+módulo vuelven a los formatos anteriores.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    ARROW_DISPONIBLE = True
+except ImportError:  # pragma: no cover - depende del entorno
+    pa = ipc = None
+    ARROW_DISPONIBLE = False
+
+# Extensión de los archivos Arrow IPC
+EXTENSION_IPC = '.arrow'
+
+def a_tabla(df):
+    """
+    Convierte un DataFrame a tabla Arrow (sin el índice).
+
+    Args:
+        df: DataFrame del modelo
+
+    Returns:
+        pa.Table: Tabla con las mismas columnas; las categóricas como diccionario
+    """
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def a_pandas(tabla, columnas=None):
+    """
+    Convierte una tabla Arrow a DataFrame copiando lo menos posible.
+
+    Args:
+        tabla: pa.Table (por ejemplo, la de abrir_ipc)
+        columnas: Columnas a convertir; None para todas
+
+    Returns:
+        pd.DataFrame: Columnas numéricas y de fechas sin nulos como vistas de
+            la tabla (de solo lectura)
+    """
+    if columnas is not None:
+        tabla = tabla.select(list(columnas))
+    return tabla.to_pandas(split_blocks=True, zero_copy_only=False)
+
+def columna_numpy(tabla, nombre):
+    """
+    Devuelve una columna de la tabla como arreglo NumPy.
+
+    Si la columna está en un solo bloque y no tiene nulos, el arreglo es una
+    vista del buffer Arrow (de solo lectura); si no, se arma una copia.
+    """
+    columna = tabla.column(nombre)
+    if columna.num_chunks == 1 and columna.null_count == 0:
+        return columna.chunk(0).to_numpy(zero_copy_only=False)
+    return np.asarray(columna.to_numpy())
+
+def guardar_ipc(df, ruta):
+    """
+    Escribe un DataFrame en un archivo Arrow IPC sin comprimir.
+
+    La tabla se escribe en un solo lote (las columnas de texto de pandas
+    pueden venir en varios bloques y partirían todas las demás), así cada
+    columna se lee como un único buffer contiguo. El archivo se escribe con
+    otro nombre y se renombra al final, de modo que un lector nunca encuentra
+    un archivo a medio escribir.
+
+    Args:
+        df: DataFrame (o pa.Table) a escribir
+        ruta: Ruta del archivo
+
+    Returns:
+        Path: Ruta del archivo escrito
+    """
+    ruta = Path(ruta)
+    tabla = (df if isinstance(df, pa.Table) else a_tabla(df)).combine_chunks()
+    temporal = ruta.with_name(f"{ruta.name}.tmp")
+    with pa.OSFile(str(temporal), 'wb') as salida, ipc.new_file(salida, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    temporal.replace(ruta)
+    return ruta
+
+def abrir_ipc(ruta):
+    """
+    Abre un archivo Arrow IPC mapeado en memoria, sin leerlo.
+
+    Args:
+        ruta: Archivo escrito por guardar_ipc
+
+    Returns:
+        pa.Table: Tabla cuyos buffers apuntan al archivo mapeado
+    """
+    return ipc.open_file(pa.memory_map(str(ruta), 'r')).read_all()
+
+def leer_ipc(ruta, columnas=None):
+    """
+    Lee un archivo Arrow IPC como DataFrame (ver abrir_ipc y a_pandas).
+
+    Args:
+        ruta: Archivo escrito por guardar_ipc
+        columnas: Columnas a leer; None para todas
+
+    Returns:
+        pd.DataFrame: Columnas sin nulos respaldadas por el archivo mapeado
+    """
+    return a_pandas(abrir_ipc(ruta), columnas)
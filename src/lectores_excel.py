@@ -0,0 +1,85 @@
+"""
+Motores de lectura de Excel para la ingesta
+
+Permite usar un motor de decodificación más rápido que openpyxl cuando está
+instalado (calamine, vía python-calamine) y vuelve a openpyxl en caso
+contrario. El motor efectivamente usado queda registrado en REGISTRO_MOTOR.
+"""
+
+import importlib.util
+from collections import Counter
+
+import pandas as pd
+
+from .config import INGESTA_CONFIG
+
+# Motores en orden de preferencia para el modo 'auto'
+MOTORES_PREFERIDOS = ['calamine', 'openpyxl']
+
+# Paquete que debe estar instalado para cada motor
+_PAQUETES_MOTOR = {
+    'calamine': 'python_calamine',
+    'openpyxl': 'openpyxl',
+}
+
+# Último motor usado y cantidad de libros abiertos con cada uno
+REGISTRO_MOTOR = {'ultimo': None, 'usos': Counter()}
+
+def motor_disponible(motor):
+    """
+    Indica si un motor puede usarse con las librerías instaladas.
+
+    Args:
+        motor: Nombre del motor ('calamine', 'openpyxl')
+
+    Returns:
+        bool: True si el paquete está instalado y pandas lo soporta
+    """
+    paquete = _PAQUETES_MOTOR.get(motor)
+    if paquete is None or importlib.util.find_spec(paquete) is None:
+        return False
+    if motor == 'calamine':
+        # pandas >= 2.2 incluye el lector de calamine
+        return importlib.util.find_spec('pandas.io.excel._calamine') is not None
+    return True
+
+def motores_disponibles():
+    """Devuelve los motores utilizables, en orden de preferencia"""
+    return [motor for motor in MOTORES_PREFERIDOS if motor_disponible(motor)]
+
+def seleccionar_motor(motor=None):
+    """
+    Resuelve el motor a usar para leer un libro.
+
+    Args:
+        motor: 'auto', el nombre de un motor o None para usar
+            INGESTA_CONFIG['motor_excel']
+
+    Returns:
+        str: Motor disponible; si el pedido no está instalado se usa openpyxl
+    """
+    motor = motor or INGESTA_CONFIG['motor_excel']
+    if motor == 'auto':
+        disponibles = motores_disponibles()
+        return disponibles[0] if disponibles else 'openpyxl'
+    if motor_disponible(motor):
+        return motor
+    print(f"⚠️ Motor de Excel '{motor}' no disponible, se usa openpyxl")
+    return 'openpyxl'
+
+def abrir_libro(ruta_archivo, motor=None):
+    """
+    Abre un libro Excel con el motor seleccionado y registra cuál se usó.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        motor: Ver seleccionar_motor
+
+    Returns:
+        pd.ExcelFile: Libro abierto
+    """
+    motor = seleccionar_motor(motor)
+    libro = pd.ExcelFile(ruta_archivo, engine=motor)
+    REGISTRO_MOTOR['ultimo'] = motor
+    REGISTRO_MOTOR['usos'][motor] += 1
+    return libro
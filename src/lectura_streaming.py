@@ -0,0 +1,151 @@
+"""
+Ingesta en streaming de libros Excel de gran tamaño
+
+Recorre cada hoja con el iterador de filas de solo lectura de openpyxl y
+genera bloques de metadatos/datos en formato largo, sin materializar nunca
+la hoja completa como DataFrame. La memoria usada depende del tamaño de
+bloque (INGESTA_CONFIG['celdas_por_bloque']) y no del tamaño del libro.
+"""
+
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from .analizar_series import (
+    CELDAS_OMITIDAS,
+    CONTADOR_PARSEOS,
+    FILA_INICIO_DATOS,
+    _consolidar_modelo,
+    _extraer_metadatos_hoja,
+    _formato_fechas_hoja,
+    _limites_fechas,
+    _reestructurar_bloque,
+)
+from .config import INGESTA_CONFIG
+
+def _filas_a_dataframe(filas, ancho):
+    """Arma un DataFrame de celdas crudas con columnas numeradas por posición"""
+    return pd.DataFrame.from_records(
+        [tuple(fila) + (None,) * (ancho - len(fila)) for fila in filas],
+        columns=range(ancho)
+    )
+
+def _encabezado_a_dataframe(encabezado, ancho):
+    """Arma las filas de encabezado como las lee pandas (vacíos como NaN)"""
+    encabezado = list(encabezado) + [()] * (FILA_INICIO_DATOS - len(encabezado))
+    df_encabezado = _filas_a_dataframe(encabezado, ancho).astype(object)
+    return df_encabezado.where(df_encabezado.notna(), np.nan)
+
+def iterar_hoja(hoja_excel, hoja, celdas_por_bloque=None):
+    """
+    Genera los bloques de una hoja abierta en modo de solo lectura.
+
+    Primero se emiten los bloques de datos, cada uno con a lo sumo
+    ``celdas_por_bloque`` celdas de valores, y al final un único bloque con
+    los metadatos de todas las columnas vistas.
+
+    Args:
+        hoja_excel: Worksheet de openpyxl abierta con read_only=True
+        hoja: Nombre de la hoja
+        celdas_por_bloque: Límite de celdas por bloque de datos
+
+    Yields:
+        tuple: (hoja, filas_meta, datos) con filas_meta vacía en los bloques de
+            datos y datos en None en el bloque final de metadatos
+    """
+    celdas_por_bloque = celdas_por_bloque or INGESTA_CONFIG['celdas_por_bloque']
+    CONTADOR_PARSEOS[hoja] += 1
+
+    filas = hoja_excel.iter_rows(values_only=True)
+    encabezado = list(islice(filas, FILA_INICIO_DATOS))
+    ancho = max((len(fila) for fila in encabezado), default=0)
+    filas_por_bloque = max(1, celdas_por_bloque // max(ancho, 1))
+
+    # El formato de las fechas y los límites del encabezado se calculan una
+    # vez por hoja (los límites, de nuevo solo si la hoja se ensancha)
+    formatos = None
+    limites, ancho_limites = None, None
+    while True:
+        bloque = list(islice(filas, filas_por_bloque))
+        if not bloque:
+            break
+        # Las filas llegan sin las celdas vacías finales: se completan hasta el
+        # ancho visto hasta el momento, como hace pandas con la hoja completa
+        ancho = max(ancho, max(len(fila) for fila in bloque))
+        if ancho > 1:
+            if formatos is None:
+                formatos = _formato_fechas_hoja(
+                    _encabezado_a_dataframe(encabezado, ancho), [fila[0] for fila in bloque if fila]
+                )
+            if INGESTA_CONFIG['recortar_por_metadatos'] and ancho != ancho_limites:
+                limites = _limites_fechas(_encabezado_a_dataframe(encabezado, ancho), formatos[1])
+                ancho_limites = ancho
+            yield hoja, [], _reestructurar_bloque(
+                _filas_a_dataframe(bloque, ancho), hoja, limites, formatos[0]
+            )
+
+    if ancho:
+        df_encabezado = _encabezado_a_dataframe(encabezado, ancho)
+        if formatos is None:
+            formatos = _formato_fechas_hoja(df_encabezado, [])
+        limites = _limites_fechas(df_encabezado, formatos[1])
+        yield hoja, _extraer_metadatos_hoja(df_encabezado, hoja, limites), None
+
+def iterar_modelo(ruta_archivo, celdas_por_bloque=None):
+    """
+    Recorre el libro completo en streaming, hoja por hoja.
+
+    Pensado para alimentar pipelines basados en generadores: cada bloque de
+    datos puede procesarse y descartarse antes de leer el siguiente.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        celdas_por_bloque: Límite de celdas por bloque de datos
+
+    Yields:
+        tuple: (hoja, filas_meta, datos), ver iterar_hoja
+    """
+    libro = load_workbook(ruta_archivo, read_only=True, data_only=True, keep_links=False)
+    try:
+        for hoja in libro.sheetnames:
+            yield from iterar_hoja(libro[hoja], hoja, celdas_por_bloque)
+    finally:
+        libro.close()
+
+def construir_modelo_streaming(ruta_archivo, celdas_por_bloque=None):
+    """
+    Construye (metadatos, datos) consumiendo iterar_modelo.
+
+    Los bloques de cada hoja se reordenan por columna al cerrar la hoja, de
+    modo que el resultado coincide con el de construir_modelo.
+
+    Args:
+        ruta_archivo: Ruta del libro Excel
+        celdas_por_bloque: Límite de celdas por bloque de datos
+
+    Returns:
+        tuple: (metadatos, datos)
+    """
+    filas_meta = []
+    bloques = []
+    bloques_hoja = []
+    for hoja, meta_bloque, datos_bloque in iterar_modelo(ruta_archivo, celdas_por_bloque):
+        if datos_bloque is not None:
+            bloques_hoja.append(datos_bloque)
+            continue
+
+        filas_meta.extend(meta_bloque)
+        CELDAS_OMITIDAS[hoja] = sum(bloque.attrs.get('celdas_omitidas', 0) for bloque in bloques_hoja)
+        if bloques_hoja:
+            # Los bloques sin celdas válidas llegan con id_serie object y, al
+            # concatenarlos, cambiarían el tipo que da la lectura completa
+            con_filas = [bloque for bloque in bloques_hoja if len(bloque)] or bloques_hoja[:1]
+            datos_hoja = pd.concat(con_filas, ignore_index=True)
+            orden_ids = [fila['id_serie'] for fila in meta_bloque]
+            posicion = pd.Categorical(datos_hoja['id_serie'], categories=orden_ids).codes
+            bloques.append(datos_hoja.iloc[np.argsort(posicion, kind='stable')])
+        bloques_hoja = []
+
+    return _consolidar_modelo(filas_meta, bloques)
@@ -0,0 +1,214 @@
+"""
+Matriz alineada fecha × serie
+
+Reordena las observaciones de un AlmacenSeries en un arreglo 2-D con un eje
+de fechas común (las fechas distintas del almacén, ordenadas) y una columna
+por clave_serie, con NaN donde la serie no tiene dato. Las operaciones entre
+series (promedios por tipo o categoría, correlaciones, recortes por fecha)
+pasan a ser operaciones sobre columnas y slices de filas del arreglo, en
+lugar de volver a pivotar el DataFrame largo en cada consulta.
+
+Si una serie tiene varias observaciones en la misma fecha, la celda guarda su
+promedio y la matriz lleva además la cantidad de observaciones por celda, de
+modo que los promedios por grupo pesan cada observación como pivot_table.
+
+La matriz se arma una vez por almacén (ver AlmacenSeries.matriz); al recargar
+el modelo se arma un almacén nuevo y con él una matriz nueva. La de un almacén
+guardado en disco se guarda junto a él y se abre mapeada en memoria, así los
+procesos que comparten el almacén comparten también la matriz.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Arreglos que se guardan como .npy; cantidades solo si hay fechas repetidas
+ARREGLOS_MATRIZ = ('fechas', 'valores', 'cantidades')
+
+
+class MatrizAlineada:
+    """Valores de las series en un arreglo fechas × claves, con NaN donde faltan"""
+
+    def __init__(self, fechas, valores, catalogo, cantidades=None):
+        """
+        Args:
+            fechas: Eje de fechas, ordenado y sin repetidos
+            valores: Arreglo 2-D (len(fechas), len(catalogo)); la columna k es
+                la serie de clave k
+            catalogo: Catálogo indexado por clave_serie (ver catalogo.construir_catalogo)
+            cantidades: Observaciones promediadas en cada celda de valores, con
+                la misma forma; None si ninguna serie repite fechas
+        """
+        self.fechas = fechas
+        self.valores = valores
+        self.catalogo = catalogo
+        self.cantidades = cantidades
+
+    @classmethod
+    def desde_almacen(cls, almacen):
+        """
+        Arma la matriz con todas las observaciones del almacén.
+
+        Las fechas repetidas de una serie quedan contiguas en el almacén
+        (ordenado por clave y fecha); si las hay, sus valores se promedian.
+
+        Args:
+            almacen: AlmacenSeries
+
+        Returns:
+            MatrizAlineada: Matriz con una columna por clave del almacén
+        """
+        fechas, filas = np.unique(almacen.fechas, return_inverse=True)
+        claves = almacen.claves_filas
+        forma = (len(fechas), len(almacen))
+        repetidas = (claves[1:] == claves[:-1]) & (filas[1:] == filas[:-1])
+        if not repetidas.any():
+            valores = np.full(forma, np.nan)
+            valores[filas, claves] = almacen.valores
+            return cls(fechas, valores, almacen.catalogo)
+
+        sumas = np.zeros(forma)
+        cantidades = np.zeros(forma, dtype=np.int32)
+        np.add.at(sumas, (filas, claves), almacen.valores)
+        np.add.at(cantidades, (filas, claves), 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valores = sumas / cantidades
+        return cls(fechas, valores, almacen.catalogo, cantidades)
+
+    def guardar(self, directorio):
+        """
+        Escribe la matriz en directorio, un .npy por arreglo.
+
+        Args:
+            directorio: Directorio destino (se crea si no existe)
+        """
+        directorio = Path(directorio)
+        directorio.mkdir(parents=True, exist_ok=True)
+        for nombre in ARREGLOS_MATRIZ:
+            arreglo = getattr(self, nombre)
+            if arreglo is not None:
+                np.save(directorio / f"{nombre}.npy", arreglo)
+
+    @classmethod
+    def abrir(cls, directorio, catalogo):
+        """
+        Abre una matriz guardada con guardar, mapeando los arreglos en memoria.
+
+        Args:
+            directorio: Directorio escrito por guardar
+            catalogo: Catálogo del almacén del que se armó la matriz
+
+        Returns:
+            MatrizAlineada: Matriz de solo lectura respaldada por los archivos
+        """
+        directorio = Path(directorio)
+        arreglos = {
+            nombre: np.load(directorio / f"{nombre}.npy", mmap_mode='r').view(np.ndarray)
+            for nombre in ARREGLOS_MATRIZ
+            if nombre != 'cantidades' or (directorio / f"{nombre}.npy").exists()
+        }
+        return cls(catalogo=catalogo, **arreglos)
+
+    @property
+    def forma(self):
+        """(cantidad de fechas, cantidad de series)"""
+        return self.valores.shape
+
+    def recortar(self, inicio=None, fin=None):
+        """
+        Filas con fecha entre inicio y fin (ambos incluidos), sin copiar valores.
+
+        Args:
+            inicio: Fecha mínima; None para no acotar
+            fin: Fecha máxima; None para no acotar
+
+        Returns:
+            MatrizAlineada: Matriz cuyos valores son una vista de los de esta
+        """
+        desde = 0 if inicio is None else np.searchsorted(self.fechas, self._limite(inicio), side='left')
+        hasta = len(self.fechas) if fin is None else np.searchsorted(self.fechas, self._limite(fin), side='right')
+        cantidades = None if self.cantidades is None else self.cantidades[desde:hasta]
+        return MatrizAlineada(self.fechas[desde:hasta], self.valores[desde:hasta], self.catalogo, cantidades)
+
+    def _limite(self, fecha):
+        """Convierte un límite del rango a la unidad del eje de fechas"""
+        return np.datetime64(pd.Timestamp(fecha).to_datetime64()).astype(self.fechas.dtype)
+
+    def grupos(self, columna):
+        """
+        Claves de las series de cada valor de una columna del catálogo.
+
+        Args:
+            columna: Columna del catálogo (tipo, categoria, hoja, unidad)
+
+        Returns:
+            dict: valor → np.ndarray de claves, con los valores ordenados;
+                las series sin valor en la columna no se incluyen
+        """
+        etiquetas = self.catalogo[columna]
+        codigos, unicos = pd.factorize(etiquetas, sort=True)
+        orden = np.argsort(codigos, kind='stable')
+        cortes = np.searchsorted(codigos[orden], np.arange(len(unicos) + 1))
+        return {valor: orden[cortes[i]:cortes[i + 1]] for i, valor in enumerate(unicos)}
+
+    def medias_por(self, columna='tipo'):
+        """
+        Promedio en cada fecha de las series de cada grupo.
+
+        Equivale a pivot_table(index='fecha', columns=columna, values='valor',
+        aggfunc='mean') sobre el DataFrame largo: con fechas repetidas, cada
+        celda pesa según su cantidad de observaciones.
+
+        Args:
+            columna: Columna del catálogo que define los grupos
+
+        Returns:
+            pd.DataFrame: Indexado por fecha, con una columna por grupo
+        """
+        medias = {}
+        for valor, claves in self.grupos(columna).items():
+            bloque = self.valores[:, claves]
+            if self.cantidades is None:
+                cantidad = np.count_nonzero(~np.isnan(bloque), axis=1)
+                suma = np.nansum(bloque, axis=1)
+            else:
+                pesos = self.cantidades[:, claves]
+                cantidad = pesos.sum(axis=1)
+                suma = np.nansum(bloque * pesos, axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                medias[valor] = suma / cantidad
+        resultado = pd.DataFrame(medias, index=pd.DatetimeIndex(self.fechas, name='fecha'))
+        resultado.columns.name = columna
+        return resultado
+
+    def correlacion(self, columna='tipo'):
+        """
+        Correlación entre los promedios por grupo (ver medias_por).
+
+        Args:
+            columna: Columna del catálogo que define los grupos
+
+        Returns:
+            pd.DataFrame: Matriz de correlación grupo × grupo
+        """
+        return self.medias_por(columna).corr()
+
+    def a_dataframe(self, claves=None):
+        """
+        Matriz como DataFrame ancho, con una columna por id_serie.
+
+        Las celdas con fechas repetidas tienen el promedio de sus observaciones.
+
+        Args:
+            claves: Claves de las series a incluir; None para todas
+
+        Returns:
+            pd.DataFrame: Indexado por fecha, con columnas id_serie
+        """
+        claves = np.arange(self.forma[1]) if claves is None else np.asarray(claves)
+        return pd.DataFrame(
+            self.valores[:, claves],
+            index=pd.DatetimeIndex(self.fechas, name='fecha'),
+            columns=pd.Index(self.catalogo['id_serie'].to_numpy()[claves], name='id_serie'),
+        )
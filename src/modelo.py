@@ -0,0 +1,240 @@
+"""
+Modelo canónico: limpio, filtrado y enriquecido
+
+Los análisis, los reportes, los dashboards y los scripts parten del mismo
+modelo: datos sin filas incompletas, solo las series con tipo y categoría que
+pasan la validación de calidad (ver validacion.py), y las columnas tipo y
+categoria agregadas por clave_serie como categóricas.
+preparar_modelo arma ese modelo con una única máscara y una única copia de
+datos, y cargar_modelo_canonico lo guarda en la caché columnar para que los
+siguientes arranques lo lean ya preparado. iterar_modelo_por_hojas da el
+mismo modelo de a una hoja, para recorrerlo sin tenerlo nunca completo en memoria.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .analizar_series import _compactar_si_corresponde, _consolidar_modelo
+from .cache_modelo import (
+    _escribir_manifiesto,
+    _guardar_frame,
+    _leer_frame,
+    _leer_manifiesto,
+    huella_libro,
+    huellas_hojas,
+    leer_hoja,
+)
+from .catalogo import construir_catalogo
+from .config import CACHE_CONFIG, DATA_CONFIG
+from .ingesta_multiple import cargar_modelo, resolver_libros
+from .lectores_excel import abrir_libro
+from .validacion import ULTIMA_CALIDAD, aplicar_validacion, imprimir_reporte_calidad, validar_modelo
+
+# Incrementar cuando cambie la salida de preparar_modelo para invalidar cachés viejas
+VERSION_MODELO = '2'
+
+# Columnas de metadatos que se agregan a datos
+COLUMNAS_ENRIQUECIDAS = ('tipo', 'categoria')
+
+def preparar_modelo(metadatos, datos, columnas=COLUMNAS_ENRIQUECIDAS):
+    """
+    Limpia, filtra y enriquece el modelo en una sola pasada.
+
+    Equivale a limpiar_dataframe, descartar las series sin tipo o categoría,
+    filtrar_por_claves y enriquecer_datos, pero calcula una sola máscara sobre
+    datos y la aplica una vez.
+
+    Args:
+        metadatos: DataFrame de metadatos con clave_serie
+        datos: DataFrame de datos con clave_serie
+        columnas: Columnas del catálogo a agregar a datos (como categóricas)
+
+    Returns:
+        tuple: (metadatos, datos) del modelo canónico, con datos reindexado
+    """
+    metadatos = metadatos.dropna(subset=['tipo', 'categoria'])
+    catalogo = construir_catalogo(metadatos)
+
+    # La última posición queda en False y atiende a CLAVE_SIN_METADATOS
+    series_validas = np.zeros(len(catalogo) + 1, dtype=bool)
+    series_validas[metadatos['clave_serie'].to_numpy()] = True
+    claves = datos['clave_serie'].to_numpy()
+    claves = np.where((claves >= 0) & (claves < len(catalogo)), claves, -1)
+
+    mascara = series_validas[claves]
+    for columna in ('id_serie', 'fecha', 'valor'):
+        mascara &= datos[columna].notna().to_numpy()
+
+    # Sin filas para descartar no se filtra: el filtro booleano siempre copia
+    datos = (datos if mascara.all() else datos[mascara]).reset_index(drop=True)
+    claves = datos['clave_serie'].to_numpy()
+    for columna in columnas:
+        valores = catalogo[columna]
+        if not isinstance(valores.dtype, pd.CategoricalDtype):
+            valores = valores.astype('category')
+        datos[columna] = valores.array.take(claves)
+    return metadatos, datos
+
+def _nombre_modelo(origen):
+    """Nombre de caché del modelo canónico: nombre del origen más un hash de su ruta"""
+    ruta = Path(origen).resolve()
+    return f"canonico_{ruta.stem}_{hashlib.sha1(str(ruta).encode()).hexdigest()[:8]}"
+
+def _validar_y_preparar(metadatos, datos):
+    """Aplica la validación de calidad (si DATA_CONFIG la activa) y preparar_modelo"""
+    calidad = None
+    if DATA_CONFIG['validar_calidad']:
+        metadatos, datos, calidad = aplicar_validacion(metadatos, datos)
+        imprimir_reporte_calidad(calidad)
+    return preparar_modelo(metadatos, datos), calidad
+
+def _huella_modelo(libros):
+    """
+    Huella conjunta de los libros del origen, de VERSION_MODELO y de la
+    configuración de la validación de calidad, que cambia las series del modelo
+    """
+    h = hashlib.sha256(f"modelo={VERSION_MODELO};".encode())
+    h.update(f"validar={DATA_CONFIG['validar_calidad']};"
+             f"umbral={DATA_CONFIG['missing_value_threshold']!r};".encode())
+    for libro in libros:
+        h.update(f"{Path(libro).resolve()}={huella_libro(libro)};".encode())
+    return h.hexdigest()
+
+def cargar_modelo_canonico(origen, usar_cache=True, directorio_cache=None, **opciones):
+    """
+    Devuelve el modelo canónico de origen, desde la caché o construyéndolo.
+
+    Antes de preparar el modelo se valida la calidad de cada serie y se
+    descartan las que superan DATA_CONFIG['missing_value_threshold'] (ver
+    validacion.py); la tabla de calidad queda en validacion.reporte_calidad.
+    La caché guarda el resultado de preparar_modelo y la tabla de calidad
+    junto a la caché del modelo crudo, en el formato de
+    CACHE_CONFIG['formato_modelo'], y es válida mientras no cambien los
+    libros del origen ni DATA_CONFIG['validar_calidad'] y
+    DATA_CONFIG['missing_value_threshold']. En formato Arrow la caché se abre
+    mapeada en memoria y las columnas numéricas y de fechas no se copian (ver
+    intercambio_arrow). La opción compacto se aplica al devolverlo, como en
+    construir_modelo_cacheado.
+
+    Args:
+        origen: Libro, carpeta o patrón (ver ingesta_multiple.resolver_libros)
+        usar_cache: Si es False, no lee ni escribe ninguna caché
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+        **opciones: workers, motor, compacto (ver ingesta_multiple.cargar_modelo)
+
+    Returns:
+        tuple: (metadatos, datos) con datos enriquecido con tipo y categoria
+    """
+    compacto = opciones.pop('compacto', None)
+    if not usar_cache:
+        modelo, _ = _validar_y_preparar(*cargar_modelo(origen, usar_cache=False, compacto=False, **opciones))
+        return _compactar_si_corresponde(modelo, compacto)
+
+    directorio_cache = Path(directorio_cache or CACHE_CONFIG['directorio'])
+    formato = CACHE_CONFIG['formato_modelo']
+    nombre = _nombre_modelo(origen)
+    ruta_manifiesto = directorio_cache / f"{nombre}.json"
+    huella = _huella_modelo(resolver_libros(origen))
+
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+    if manifiesto and manifiesto.get('huella') == huella and manifiesto.get('formato') == formato:
+        try:
+            archivos = manifiesto['archivos']
+            modelo = (
+                _leer_frame(directorio_cache / archivos['metadatos']),
+                _leer_frame(directorio_cache / archivos['datos'])
+            )
+            if 'calidad' in archivos:
+                ULTIMA_CALIDAD['tabla'] = _leer_frame(directorio_cache / archivos['calidad'])
+            else:
+                # Modelo armado sin validar: no dejar la tabla de una carga anterior
+                ULTIMA_CALIDAD.pop('tabla', None)
+            return _compactar_si_corresponde(modelo, compacto)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    ULTIMA_CALIDAD.pop('tabla', None)
+    (metadatos, datos), calidad = _validar_y_preparar(
+        *cargar_modelo(origen, usar_cache=True, compacto=False, **opciones)
+    )
+
+    directorio_cache.mkdir(parents=True, exist_ok=True)
+    prefijo = f"{nombre}_{huella[:16]}"
+    archivos = {
+        'metadatos': _guardar_frame(metadatos, directorio_cache, f"{prefijo}_metadatos", formato),
+        'datos': _guardar_frame(datos, directorio_cache, f"{prefijo}_datos", formato),
+    }
+    if calidad is not None:
+        archivos['calidad'] = _guardar_frame(calidad, directorio_cache, f"{prefijo}_calidad")
+    # Los archivos de versiones anteriores del modelo ya no se usan
+    for anterior in directorio_cache.glob(f"{nombre}_*"):
+        if anterior.name not in archivos.values():
+            anterior.unlink(missing_ok=True)
+    _escribir_manifiesto(ruta_manifiesto, {
+        'huella': huella, 'version_modelo': VERSION_MODELO, 'formato': formato, 'archivos': archivos
+    })
+
+    return _compactar_si_corresponde((metadatos, datos), compacto)
+
+def calidad_en_cache(origen, directorio_cache=None):
+    """
+    Tabla de calidad del modelo canónico de origen, si está vigente en caché.
+
+    Permite conocer las series excluidas sin leer los datos (por ejemplo,
+    en la carga diferida).
+
+    Args:
+        origen: Libro, carpeta o patrón (ver ingesta_multiple.resolver_libros)
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+
+    Returns:
+        pd.DataFrame: Columnas de validacion.COLUMNAS_CALIDAD, o None si no
+            hay un modelo canónico vigente validado en caché
+    """
+    directorio_cache = Path(directorio_cache or CACHE_CONFIG['directorio'])
+    manifiesto = _leer_manifiesto(directorio_cache / f"{_nombre_modelo(origen)}.json")
+    if not manifiesto or manifiesto.get('huella') != _huella_modelo(resolver_libros(origen)):
+        return None
+    archivo = manifiesto.get('archivos', {}).get('calidad')
+    if archivo is None:
+        return None
+    try:
+        return _leer_frame(directorio_cache / archivo)
+    except (OSError, ValueError):
+        return None
+
+def iterar_modelo_por_hojas(origen, directorio_cache=None, motor=None, usar_cache=True):
+    """
+    Recorre el modelo canónico de origen de a una hoja, sin armarlo completo.
+
+    Cada hoja se lee de la caché por hoja (o del libro, y queda en esa caché;
+    ver cache_modelo.leer_hoja) y pasa por los mismos pasos que en
+    cargar_modelo_canonico: consolidación, validación de calidad si
+    DATA_CONFIG['validar_calidad'] la activa y preparar_modelo. La validación
+    agrupa las series por hoja, así que validar hoja por hoja da las mismas
+    exclusiones; no se imprime el reporte ni se actualiza
+    validacion.reporte_calidad. En memoria queda una sola hoja por vez.
+
+    Args:
+        origen: Libro, carpeta o patrón (ver ingesta_multiple.resolver_libros)
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+        motor: Motor de lectura de Excel (ver construir_modelo)
+        usar_cache: Si es False, cada hoja se lee del libro sin leer ni
+            escribir la caché por hoja
+
+    Yields:
+        tuple: (metadatos, datos) del modelo canónico de cada hoja, con
+            clave_serie local a la hoja
+    """
+    for libro in resolver_libros(origen):
+        hojas = list(huellas_hojas(libro) or {}) or list(abrir_libro(libro, motor).sheet_names)
+        for hoja in hojas:
+            meta_hoja, datos_hoja = leer_hoja(libro, hoja, directorio_cache, motor, usar_cache)
+            metadatos, datos = _consolidar_modelo(meta_hoja.to_dict('records'), [datos_hoja])
+            if DATA_CONFIG['validar_calidad']:
+                calidad = validar_modelo(metadatos, datos)
+                metadatos = metadatos[~calidad['excluida'].to_numpy()]
+            yield preparar_modelo(metadatos, datos)
@@ -0,0 +1,327 @@
+"""
+Procesamiento del modelo repartido en procesos worker locales
+
+Divide el modelo en fragmentos por clave de serie (cada serie queda entera
+en un único fragmento), ejecuta una función sobre cada fragmento en un pool
+de procesos y junta los resultados parciales en el proceso principal
+(scatter-gather), sin ningún planificador externo.
+
+Los datos no se envían a los workers: el proceso principal escribe datos en
+un archivo Arrow IPC (o reutiliza el del modelo canónico en caché) y cada
+worker lo mapea en memoria y toma el rango de filas de su fragmento, sin
+copiarlo (ver intercambio_arrow). Solo viajan entre procesos las filas de
+metadatos del fragmento y el resultado parcial.
+
+Las funciones que se reparten reciben (metadatos, datos) del fragmento y
+deben estar definidas a nivel de módulo para poder enviarse al worker. Las
+estadísticas de reportes se juntan con AgregadoEstadisticas.combinar (ver
+agregacion.py) y los resúmenes por serie se concatenan, porque ninguna serie
+queda partida entre fragmentos.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .agregacion import PRECISION_CUANTILES, AgregadoEstadisticas, iterar_dataframe
+from .cache_modelo import _leer_frame, _leer_manifiesto
+from .config import CACHE_CONFIG, DATA_CONFIG
+from .ingesta_multiple import resolver_libros
+from .intercambio_arrow import EXTENSION_IPC, a_pandas, abrir_ipc, guardar_ipc
+from .modelo import _huella_modelo, _nombre_modelo
+
+# Columnas de resumir_series, en orden
+COLUMNAS_RESUMEN_SERIE = ['cantidad', 'promedio', 'desviacion', 'minimo', 'maximo', 'fecha_min', 'fecha_max']
+
+def resolver_workers(workers=None):
+    """Cantidad de procesos: workers, DATA_CONFIG['workers_analisis'] o los núcleos disponibles"""
+    return max(1, int(workers or DATA_CONFIG['workers_analisis'] or os.cpu_count() or 1))
+
+def fragmentar(claves, n_fragmentos):
+    """
+    Divide filas ordenadas por clave de serie en rangos de tamaño parecido.
+
+    Los cortes caen siempre entre series distintas, así que un fragmento
+    puede quedar más grande que el promedio si una serie es muy larga.
+
+    Args:
+        claves: Arreglo de clave_serie por fila, ordenado en forma ascendente
+        n_fragmentos: Cantidad máxima de fragmentos
+
+    Returns:
+        list: Rangos (inicio, fin) de filas, sin vacíos
+    """
+    claves = np.asarray(claves)
+    filas = len(claves)
+    if filas == 0:
+        return []
+    # Cortes ideales por cantidad de filas, corridos al comienzo de la serie siguiente
+    ideales = np.linspace(0, filas, max(1, n_fragmentos) + 1)[1:-1].astype(np.int64)
+    cortes = np.searchsorted(claves, claves[ideales], side='left') if len(ideales) else ideales
+    limites = np.unique(np.concatenate([[0], cortes, [filas]]))
+    return [(int(inicio), int(fin)) for inicio, fin in zip(limites[:-1], limites[1:])]
+
+def _con_clave(columnas):
+    """Columnas pedidas más clave_serie, que hace falta para fragmentar"""
+    return None if columnas is None else list(dict.fromkeys(['clave_serie', *columnas]))
+
+def _filtrar_por_metadatos(metadatos, datos):
+    """
+    Descarta las filas de datos cuyas series no están en metadatos (por
+    ejemplo, las excluidas por validacion.aplicar_validacion, que solo filtra
+    metadatos). Sin filas para descartar, devuelve datos sin copiar.
+    """
+    claves_meta = metadatos['clave_serie'].to_numpy(dtype=np.int64)
+    claves = datos['clave_serie'].to_numpy(dtype=np.int64)
+    if len(claves) == 0:
+        return datos
+    limite = int(max(claves.max(), claves_meta.max(initial=-1))) + 1
+    presentes = np.zeros(limite + 1, dtype=bool)
+    presentes[claves_meta[claves_meta >= 0]] = True
+    # Las claves negativas (sin metadatos) caen en la última posición, que queda en False
+    mascara = presentes[np.where(claves >= 0, claves, limite)]
+    return datos if mascara.all() else datos[mascara].reset_index(drop=True)
+
+def _ordenar_por_clave(datos):
+    """Devuelve datos ordenado por clave_serie (sin copiar si ya lo está)"""
+    claves = datos['clave_serie'].to_numpy()
+    if len(claves) < 2 or (claves[1:] >= claves[:-1]).all():
+        return datos
+    return datos.iloc[np.argsort(claves, kind='stable')].reset_index(drop=True)
+
+def _metadatos_por_fragmento(metadatos, claves, rangos):
+    """
+    Reparte las filas de metadatos entre los fragmentos por rango de clave.
+
+    Cada fragmento se queda con las series desde su primera clave hasta la
+    primera del siguiente, de modo que las series sin filas de datos también
+    quedan en exactamente un fragmento.
+    """
+    claves_meta = metadatos['clave_serie'].to_numpy()
+    inicios = [claves[inicio] for inicio, _ in rangos[1:]]
+    fragmento = np.searchsorted(np.asarray(inicios, dtype=claves_meta.dtype), claves_meta, side='right')
+    return [metadatos[fragmento == i] for i in range(len(rangos))]
+
+def _ejecutar_fragmento(funcion, ruta, inicio, fin, metadatos, columnas):
+    """
+    Mapea el archivo de datos dentro del worker y ejecuta funcion sobre un fragmento.
+
+    Returns:
+        Lo que devuelva funcion(metadatos, datos) para ese rango de filas
+    """
+    tabla = abrir_ipc(ruta)
+    if columnas is not None:
+        tabla = tabla.select(list(columnas))
+    return funcion(metadatos, a_pandas(tabla.slice(inicio, fin - inicio)))
+
+def _repartir(funcion, ruta, claves, metadatos, workers, columnas):
+    """Ejecuta funcion sobre cada fragmento de ruta en un pool y devuelve los parciales en orden"""
+    rangos = fragmentar(claves, workers)
+    if not rangos:
+        return []
+    metas = _metadatos_por_fragmento(metadatos, claves, rangos)
+    n = len(rangos)
+    with ProcessPoolExecutor(max_workers=min(workers, n)) as pool:
+        return list(pool.map(
+            _ejecutar_fragmento, [funcion] * n, [str(ruta)] * n,
+            [inicio for inicio, _ in rangos], [fin for _, fin in rangos], metas, [columnas] * n
+        ))
+
+def ejecutar_por_fragmentos(funcion, metadatos, datos, combinar=None, workers=None, columnas=None):
+    """
+    Ejecuta funcion sobre fragmentos del modelo en procesos worker y junta los resultados.
+
+    Con un solo worker la función se ejecuta sobre el modelo completo en el
+    proceso actual, sin escribir archivos.
+
+    Las filas de datos de series que no están en metadatos se descartan antes
+    de repartir, así ningún fragmento recibe series que no estén en sus
+    metadatos.
+
+    Args:
+        funcion: Función a nivel de módulo que recibe (metadatos, datos) de un fragmento
+        metadatos: Metadatos del modelo
+        datos: Datos del modelo (si no están ordenados por clave_serie, se ordenan)
+        combinar: Función que recibe la lista de resultados parciales (en orden
+            de clave) y devuelve el resultado final; None para devolver la lista
+        workers: Cantidad de procesos. Por defecto DATA_CONFIG['workers_analisis']
+            o la cantidad de núcleos
+        columnas: Columnas de datos que necesita funcion; None para todas
+
+    Returns:
+        Resultado de combinar, o la lista de resultados parciales
+    """
+    workers = resolver_workers(workers)
+    datos = _ordenar_por_clave(_filtrar_por_metadatos(metadatos, datos))
+    if columnas is not None:
+        datos = datos[_con_clave(columnas)]
+
+    if workers == 1 or len(datos) == 0:
+        parciales = [funcion(metadatos, datos)]
+    else:
+        with tempfile.TemporaryDirectory(prefix='fragmentos_') as directorio:
+            ruta = guardar_ipc(datos, Path(directorio) / f"datos{EXTENSION_IPC}")
+            parciales = _repartir(funcion, ruta, datos['clave_serie'].to_numpy(), metadatos, workers, None)
+    return combinar(parciales) if combinar is not None else parciales
+
+def ejecutar_sobre_cache(funcion, origen, combinar=None, workers=None, columnas=None, directorio_cache=None):
+    """
+    Igual que ejecutar_por_fragmentos, sobre el modelo canónico de origen en caché.
+
+    Si la caché está en formato Arrow, los workers mapean directamente el
+    archivo de datos de la caché; si no, se carga y se reparte como un
+    modelo en memoria.
+
+    Args:
+        funcion: Función a nivel de módulo que recibe (metadatos, datos) de un fragmento
+        origen: Libro, carpeta o patrón (ver ingesta_multiple.resolver_libros)
+        combinar: Ver ejecutar_por_fragmentos
+        workers: Ver ejecutar_por_fragmentos
+        columnas: Columnas de datos que necesita funcion; None para todas
+        directorio_cache: Directorio de la caché. Por defecto CACHE_CONFIG['directorio']
+
+    Returns:
+        Resultado de combinar, o la lista de resultados parciales
+
+    Raises:
+        FileNotFoundError: Si el modelo canónico de origen no está en caché o
+            no está vigente (ver modelo.cargar_modelo_canonico)
+    """
+    directorio_cache = Path(directorio_cache or CACHE_CONFIG['directorio'])
+    manifiesto = _leer_manifiesto(directorio_cache / f"{_nombre_modelo(origen)}.json")
+    if not manifiesto or manifiesto.get('huella') != _huella_modelo(resolver_libros(origen)):
+        raise FileNotFoundError(f"No hay un modelo canónico vigente en caché para {origen}")
+
+    archivos = manifiesto['archivos']
+    metadatos = _leer_frame(directorio_cache / archivos['metadatos'])
+    ruta_datos = directorio_cache / archivos['datos']
+    workers = resolver_workers(workers)
+    if ruta_datos.suffix != EXTENSION_IPC or workers == 1:
+        return ejecutar_por_fragmentos(
+            funcion, metadatos, _leer_frame(ruta_datos), combinar, workers, columnas
+        )
+
+    claves = a_pandas(abrir_ipc(ruta_datos), ['clave_serie'])['clave_serie'].to_numpy()
+    if len(claves) > 1 and not (claves[1:] >= claves[:-1]).all():
+        return ejecutar_por_fragmentos(
+            funcion, metadatos, _leer_frame(ruta_datos), combinar, workers, columnas
+        )
+    parciales = _repartir(funcion, ruta_datos, claves, metadatos, workers, _con_clave(columnas))
+    return combinar(parciales) if combinar is not None else parciales
+
+def agregar_fragmento(metadatos, datos, filas_por_bloque=None, precision=PRECISION_CUANTILES):
+    """
+    Agregado parcial de las estadísticas de reportes de un fragmento.
+
+    Returns:
+        AgregadoEstadisticas: Combinable con los de los demás fragmentos
+    """
+    agregado = AgregadoEstadisticas(precision)
+    for bloque in iterar_dataframe(datos, filas_por_bloque):
+        agregado.agregar(bloque)
+    return agregado
+
+def combinar_agregados(parciales):
+    """Junta los AgregadoEstadisticas de todos los fragmentos en uno"""
+    return reduce(lambda total, parcial: total.combinar(parcial), parciales, AgregadoEstadisticas())
+
+def estadisticas_en_paralelo(metadatos, datos, workers=None):
+    """
+    Estadísticas de reportes calculadas por fragmentos en procesos worker.
+
+    Args:
+        metadatos: Metadatos del modelo
+        datos: Datos del modelo (con fecha, valor, tipo y categoria)
+        workers: Cantidad de procesos (ver ejecutar_por_fragmentos)
+
+    Returns:
+        dict: Ver agregacion.AgregadoEstadisticas.estadisticas; la mediana
+            exacta se calcula en este proceso, que tiene todos los valores
+    """
+    agregado = ejecutar_por_fragmentos(
+        agregar_fragmento, metadatos, datos, combinar_agregados, workers,
+        columnas=['fecha', 'valor', 'tipo', 'categoria']
+    )
+    mediana = _filtrar_por_metadatos(metadatos, datos)['valor'].median()
+    return agregado.estadisticas(metadatos, mediana=mediana)
+
+def resumir_fragmento(metadatos, datos):
+    """
+    Resumen por serie de un fragmento: cantidad, promedio, desviación estándar
+    muestral, mínimo y máximo de los valores no nulos, y primera y última fecha.
+
+    Returns:
+        pd.DataFrame: Columnas de COLUMNAS_RESUMEN_SERIE, indexado por id_serie
+    """
+    claves_meta = metadatos['clave_serie'].to_numpy(dtype=np.int64)
+    if len(claves_meta) == 0:
+        return pd.DataFrame(columns=COLUMNAS_RESUMEN_SERIE, index=pd.Index([], name='id_serie'))
+    base = claves_meta.min()
+    n = int(claves_meta.max() - base + 1)
+    codigos = datos['clave_serie'].to_numpy(dtype=np.int64) - base
+    valores = datos['valor'].to_numpy(dtype=float)
+    fechas = datos['fecha'].to_numpy()
+    # Filas de series que no están en metadatos: no se cuentan
+    en_metadatos = np.zeros(n, dtype=bool)
+    en_metadatos[claves_meta - base] = True
+    conocidas = (codigos >= 0) & (codigos < n)
+    conocidas[conocidas] = en_metadatos[codigos[conocidas]]
+    if not conocidas.all():
+        codigos, valores, fechas = codigos[conocidas], valores[conocidas], fechas[conocidas]
+
+    fecha_min = np.full(n, np.iinfo(np.int64).max)
+    fecha_max = np.full(n, np.iinfo(np.int64).min)
+    np.minimum.at(fecha_min, codigos, fechas.view(np.int64))
+    np.maximum.at(fecha_max, codigos, fechas.view(np.int64))
+    filas = np.bincount(codigos, minlength=n)
+
+    validos = ~np.isnan(valores)
+    codigos, valores = codigos[validos], valores[validos]
+    cantidad = np.bincount(codigos, minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio = np.bincount(codigos, valores, minlength=n) / cantidad
+        m2 = np.bincount(codigos, (valores - promedio[codigos]) ** 2, minlength=n)
+        desviacion = np.where(cantidad > 1, np.sqrt(m2 / (cantidad - 1)), np.nan)
+    minimo = np.full(n, np.inf)
+    maximo = np.full(n, -np.inf)
+    np.minimum.at(minimo, codigos, valores)
+    np.maximum.at(maximo, codigos, valores)
+
+    posiciones = claves_meta - base
+    hay_valores = cantidad[posiciones] > 0
+    hay_filas = filas[posiciones] > 0
+    unidad = fechas.dtype if len(fechas) else np.dtype('datetime64[ns]')
+    nulo = np.datetime64('NaT').view(np.int64)
+    return pd.DataFrame({
+        'cantidad': cantidad[posiciones],
+        'promedio': promedio[posiciones],
+        'desviacion': desviacion[posiciones],
+        'minimo': np.where(hay_valores, minimo[posiciones], np.nan),
+        'maximo': np.where(hay_valores, maximo[posiciones], np.nan),
+        'fecha_min': np.where(hay_filas, fecha_min[posiciones], nulo).view(unidad),
+        'fecha_max': np.where(hay_filas, fecha_max[posiciones], nulo).view(unidad),
+    }, index=pd.Index(metadatos['id_serie'].to_numpy(), name='id_serie'))
+
+def resumir_series(metadatos, datos, workers=None):
+    """
+    Resumen por serie (ver resumir_fragmento) calculado en procesos worker.
+
+    Cada serie cae entera en un fragmento, así que los parciales solo se
+    concatenan.
+
+    Returns:
+        pd.DataFrame: Una fila por serie de metadatos, en orden de clave_serie
+    """
+    return ejecutar_por_fragmentos(
+        resumir_fragmento, metadatos, datos, _concatenar, workers,
+        columnas=['fecha', 'valor']
+    ).reindex(metadatos.sort_values('clave_serie')['id_serie'].to_numpy())
+
+def _concatenar(parciales):
+    """Concatena los DataFrames parciales en orden de fragmento"""
+    return pd.concat(parciales) if parciales else pd.DataFrame(columns=COLUMNAS_RESUMEN_SERIE)
@@ -18,6 +18,7 @@ from .utils_reportes import (
     exportar_grafico_plotly, 
     generar_estadisticas, 
     crear_grafico_resumen,
+    formatear_mediana,
     formatear_numero
 )
 
@@ -26,20 +27,31 @@ class GeneradorReportes:
     Clase principal para generar reportes automáticos
     """
     
-    def __init__(self, datos: pd.DataFrame, metadatos: pd.DataFrame):
+    def __init__(self, datos: Optional[pd.DataFrame], metadatos: pd.DataFrame, almacen=None,
+                 agregado=None):
         """
         Inicializa el generador de reportes
         
         Args:
-            datos: DataFrame con los datos de las series temporales
+            datos: DataFrame con los datos de las series temporales (None si
+                se indica agregado)
             metadatos: DataFrame con metadatos de las series
+            almacen: AlmacenSeries con los mismos datos, para acceder por serie
+                sin filtrar el DataFrame largo (opcional)
+            agregado: AgregadoEstadisticas con con_graficos (ver
+                agregacion.agregar_fuera_de_memoria), para generar los reportes
+                sin tener los datos en memoria (opcional)
         """
         self.datos = datos
         self.metadatos = metadatos
+        self.almacen = almacen
+        self.agregado = agregado
         
         # Solo generar estadísticas si hay datos válidos
-        if not datos.empty and not metadatos.empty:
-            self.estadisticas = generar_estadisticas(datos, metadatos)
+        if agregado is not None and agregado.filas and not metadatos.empty:
+            self.estadisticas = agregado.estadisticas(metadatos)
+        elif datos is not None and not datos.empty and not metadatos.empty:
+            self.estadisticas = generar_estadisticas(datos, metadatos, almacen)
         else:
             self.estadisticas = {
                 'fecha_generacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -65,6 +77,7 @@ class GeneradorReportes:
         
         # Registrar filtros personalizados
         self.jinja_env.filters['formatear_numero'] = formatear_numero
+        self.jinja_env.filters['formatear_mediana'] = formatear_mediana
         self.jinja_env.globals['pd'] = pd
         
         # Crear estructura de directorios para mejor trazabilidad
@@ -115,7 +128,7 @@ class GeneradorReportes:
             ruta_pdf = self.pdf_dir / nombre_archivo
             
             # Crear gráfico de resumen
-            grafico_resumen = crear_grafico_resumen(self.datos, self.metadatos)
+            grafico_resumen = crear_grafico_resumen(self.datos, self.metadatos, self.almacen, self.agregado)
             grafico_resumen_b64 = exportar_grafico_plotly(grafico_resumen)
             
             # Preparar datos para el template
@@ -220,6 +233,7 @@ class GeneradorReportes:
                 ('Tipos Únicos', str(self.estadisticas['tipos_unicos'])),
                 ('Categorías Únicas', str(self.estadisticas['categorias_unicas'])),
                 ('Valor Promedio', formatear_numero(self.estadisticas['estadisticas_numericas']['valor_promedio'])),
+                ('Mediana', formatear_mediana(self.estadisticas['estadisticas_numericas'])),
                 ('Desviación Estándar', formatear_numero(self.estadisticas['estadisticas_numericas']['desviacion_estandar'])),
                 ('Valor Mínimo', formatear_numero(self.estadisticas['estadisticas_numericas']['valor_min'])),
                 ('Valor Máximo', formatear_numero(self.estadisticas['estadisticas_numericas']['valor_max']))
@@ -312,7 +326,7 @@ class GeneradorReportes:
             ruta_html = self.html_dir / nombre_archivo
             
             # Crear gráfico de resumen
-            grafico_resumen = crear_grafico_resumen(self.datos, self.metadatos)
+            grafico_resumen = crear_grafico_resumen(self.datos, self.metadatos, self.almacen, self.agregado)
             grafico_resumen_b64 = exportar_grafico_plotly(grafico_resumen)
             
             # Preparar datos para el template
@@ -15,6 +15,8 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 
+from ..consulta import Consulta
+
 def exportar_grafico_plotly(fig, formato='png', width=800, height=600):
     """
     Exporta un gráfico de Plotly a formato base64 para incluir en reportes
@@ -40,17 +42,22 @@ def exportar_grafico_plotly(fig, formato='png', width=800, height=600):
         print(f"Error al exportar gráfico: {e}")
         return None
 
-def generar_estadisticas(datos, metadatos):
+def generar_estadisticas(datos, metadatos, almacen=None):
     """
     Genera estadísticas descriptivas para incluir en reportes
     
     Args:
         datos: DataFrame con los datos de las series
         metadatos: DataFrame con metadatos de las series
+        almacen: AlmacenSeries con los mismos datos (opcional); si se indica,
+            las estadísticas se calculan con consultas sobre el almacén
     
     Returns:
         dict: Diccionario con estadísticas calculadas
     """
+    if almacen is not None:
+        return _estadisticas_desde_consulta(Consulta(almacen), metadatos)
+    
     estadisticas = {
         'fecha_generacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'total_series': len(metadatos),
@@ -71,14 +78,14 @@ def generar_estadisticas(datos, metadatos):
     }
     
     # Estadísticas por tipo
-    stats_por_tipo = datos.groupby('tipo')['valor'].agg([
+    stats_por_tipo = datos.groupby('tipo', observed=True)['valor'].agg([
         'count', 'mean', 'std', 'min', 'max'
     ]).round(2).to_dict('index')
     
     estadisticas['estadisticas_por_tipo'] = stats_por_tipo
     
     # Estadísticas por categoría
-    stats_por_categoria = datos.groupby('categoria')['valor'].agg([
+    stats_por_categoria = datos.groupby('categoria', observed=True)['valor'].agg([
         'count', 'mean', 'std', 'min', 'max'
     ]).round(2).to_dict('index')
     
@@ -86,13 +93,49 @@ def generar_estadisticas(datos, metadatos):
     
     return estadisticas
 
-def crear_grafico_resumen(datos, metadatos):
+def _estadisticas_desde_consulta(consulta, metadatos):
+    """Igual que generar_estadisticas, leyendo solo fecha y valor del almacén"""
+    globales = consulta.agregar(
+        total=('valor', 'size'), inicio=('fecha', 'min'), fin=('fecha', 'max'),
+        minimo=('valor', 'min'), maximo=('valor', 'max'), promedio=('valor', 'mean'),
+        mediana=('valor', 'median'), desviacion=('valor', 'std')
+    )
+    agregaciones = ('count', 'mean', 'std', 'min', 'max')
+    
+    return {
+        'fecha_generacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total_series': len(metadatos),
+        'total_datos': int(globales['total']),
+        'rango_fechas': {
+            'inicio': globales['inicio'].strftime('%Y-%m-%d'),
+            'fin': globales['fin'].strftime('%Y-%m-%d')
+        },
+        'tipos_unicos': metadatos['tipo'].nunique(),
+        'categorias_unicas': metadatos['categoria'].nunique(),
+        'estadisticas_numericas': {
+            'valor_min': globales['minimo'],
+            'valor_max': globales['maximo'],
+            'valor_promedio': globales['promedio'],
+            'valor_mediana': globales['mediana'],
+            'desviacion_estandar': globales['desviacion']
+        },
+        'estadisticas_por_tipo': consulta.agrupar('tipo').agregar(*agregaciones).round(2).to_dict('index'),
+        'estadisticas_por_categoria': consulta.agrupar('categoria').agregar(*agregaciones).round(2).to_dict('index')
+    }
+
+def crear_grafico_resumen(datos, metadatos, almacen=None, agregado=None):
     """
     Crea un gráfico de resumen para incluir en reportes
     
     Args:
-        datos: DataFrame con los datos
+        datos: DataFrame con los datos (None si se indica agregado)
         metadatos: DataFrame con metadatos
+        almacen: AlmacenSeries con los mismos datos (opcional); si se indica,
+            la evolución mensual y los valores de cada tipo se obtienen con
+            consultas sobre el almacén sin recorrer datos
+        agregado: AgregadoEstadisticas armado con con_graficos (opcional); si
+            se indica, la evolución mensual y las cajas por tipo salen de sus
+            agregados, con cuartiles estimados, sin usar datos
     
     Returns:
         plotly.graph_objects.Figure: Gráfico de resumen
@@ -121,8 +164,14 @@ def crear_grafico_resumen(datos, metadatos):
     )
     
     # Gráfico 3: Evolución temporal (promedio por mes)
-    datos_mensual = datos.groupby(datos['fecha'].dt.to_period('M'))['valor'].mean().reset_index()
-    datos_mensual['fecha'] = datos_mensual['fecha'].dt.to_timestamp()
+    if agregado is not None:
+        datos_mensual = agregado.medias_mensuales()
+    elif almacen is not None:
+        consulta = Consulta(almacen)
+        datos_mensual = consulta.agrupar(frecuencia='M').agregar('mean').rename('valor').reset_index()
+    else:
+        datos_mensual = datos.groupby(datos['fecha'].dt.to_period('M'))['valor'].mean().reset_index()
+        datos_mensual['fecha'] = datos_mensual['fecha'].dt.to_timestamp()
     
     fig.add_trace(
         go.Scatter(x=datos_mensual['fecha'], y=datos_mensual['valor'], 
@@ -131,12 +180,24 @@ def crear_grafico_resumen(datos, metadatos):
     )
     
     # Gráfico 4: Box plot por tipo
-    for tipo in datos['tipo'].unique():
-        datos_tipo = datos[datos['tipo'] == tipo]['valor']
-        fig.add_trace(
-            go.Box(y=datos_tipo, name=tipo, showlegend=False),
-            row=2, col=2
-        )
+    if agregado is not None:
+        for tipo, caja in agregado.cajas_por_tipo().iterrows():
+            fig.add_trace(
+                go.Box(q1=[caja['q1']], median=[caja['mediana']], q3=[caja['q3']],
+                       lowerfence=[caja['minimo']], upperfence=[caja['maximo']],
+                       name=tipo, showlegend=False),
+                row=2, col=2
+            )
+    else:
+        for tipo in datos['tipo'].unique():
+            if almacen is not None:
+                datos_tipo = consulta.filtrar(tipo=tipo).valores()
+            else:
+                datos_tipo = datos[datos['tipo'] == tipo]['valor']
+            fig.add_trace(
+                go.Box(y=datos_tipo, name=tipo, showlegend=False),
+                row=2, col=2
+            )
     
     fig.update_layout(
         height=800,
@@ -163,4 +224,25 @@ def formatear_numero(numero, decimales=2):
     if isinstance(numero, (int, float)):
         return f"{numero:,.{decimales}f}"
     
-    return str(numero) 
\ No newline at end of file
+    return str(numero)
+
+def formatear_mediana(estadisticas_numericas):
+    """
+    Formatea la mediana de las estadísticas numéricas para mostrar en reportes
+    
+    Si solo se conoce la mediana estimada (reportes fuera de memoria) se
+    muestra esa, marcada como aproximada y con su error relativo máximo.
+    
+    Args:
+        estadisticas_numericas: Diccionario estadisticas_numericas de
+            generar_estadisticas o de AgregadoEstadisticas.estadisticas
+    
+    Returns:
+        str: Mediana formateada
+    """
+    mediana = estadisticas_numericas.get('valor_mediana')
+    estimada = estadisticas_numericas.get('valor_mediana_estimada')
+    if mediana is None and estimada is not None:
+        error = estadisticas_numericas.get('error_relativo_mediana') or 0
+        return f"≈ {formatear_numero(estimada)} (± {error:.1%})"
+    return formatear_numero(mediana)
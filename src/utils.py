@@ -1,4 +1,8 @@
 import pandas as pd
+
+# Columnas que pasan a categóricas en el modelo compacto
+COLUMNAS_CATEGORICAS = ['id_serie', 'archivo', 'hoja', 'tipo', 'categoria', 'unidad']
+
 def limpiar_dataframe(df):
     """
     Limpia el DataFrame eliminando filas con valores faltantes en columnas clave.
@@ -6,3 +10,60 @@ def limpiar_dataframe(df):
     columnas_a_filtrar = ['id_serie', 'fecha', 'valor']  # todas claves
     columnas_presentes = [col for col in columnas_a_filtrar if col in df.columns]
     return df.dropna(subset=columnas_presentes).reset_index(drop=True)
+
+def compactar_modelo(metadatos, datos, valor_float32=False):
+    """
+    Convierte metadatos y datos a tipos compactos.
+
+    Las columnas de texto repetidas (COLUMNAS_CATEGORICAS) pasan a categóricas;
+    id_serie usa las mismas categorías en ambos DataFrames, primero las de
+    metadatos en su orden (sus códigos coinciden con clave_serie). Las fechas
+    quedan como datetime64 y, opcionalmente, valor como float32.
+
+    Args:
+        metadatos: DataFrame de metadatos de construir_modelo
+        datos: DataFrame de datos de construir_modelo
+        valor_float32: Si es True, guarda valor en precisión simple
+
+    Returns:
+        tuple: (metadatos, datos) compactos
+    """
+    metadatos = metadatos.copy()
+    datos = datos.copy()
+
+    ids = pd.CategoricalDtype(pd.unique(pd.concat(
+        [metadatos['id_serie'].astype(object), datos['id_serie'].astype(object)]
+    ).dropna()))
+    metadatos['id_serie'] = metadatos['id_serie'].astype(ids)
+    datos['id_serie'] = datos['id_serie'].astype(ids)
+    for columna in COLUMNAS_CATEGORICAS[1:]:
+        if columna in metadatos.columns:
+            metadatos[columna] = metadatos[columna].astype('category')
+
+    for columna in ['fecha_inicio', 'fecha_fin']:
+        metadatos[columna] = pd.to_datetime(metadatos[columna])
+    datos['fecha'] = pd.to_datetime(datos['fecha'])
+    if valor_float32:
+        datos['valor'] = datos['valor'].astype('float32')
+
+    return metadatos, datos
+
+def reporte_memoria(antes, despues):
+    """
+    Compara el uso de memoria por columna de dos versiones de un DataFrame.
+
+    Args:
+        antes: DataFrame original
+        despues: DataFrame transformado (por ejemplo, con compactar_modelo)
+
+    Returns:
+        DataFrame: bytes por columna antes y después, con la reducción en
+            porcentaje y una fila 'total'
+    """
+    reporte = pd.DataFrame({
+        'bytes_antes': antes.memory_usage(deep=True, index=False),
+        'bytes_despues': despues.memory_usage(deep=True, index=False),
+    })
+    reporte.loc['total'] = reporte.sum()
+    reporte['reduccion_pct'] = (1 - reporte['bytes_despues'] / reporte['bytes_antes']) * 100
+    return reporte
@@ -0,0 +1,183 @@
+"""
+Validación de calidad de las series ingeridas
+
+Revisa el modelo crudo (salida de construir_modelo) contra EXCEL_STRUCTURE y
+DATA_CONFIG y arma una tabla con una fila por serie:
+
+- Encabezado: fecha_inicio y fecha_fin legibles y en orden, unidad presente
+  (filas de EXCEL_STRUCTURE['metadata_rows']), y cuántas observaciones caen
+  fuera de ese rango.
+- Faltantes: proporción de fechas sin valor dentro del período propio de la
+  serie (fecha_inicio a fecha_fin del encabezado, o su primera y última
+  observación si el encabezado no es válido), contadas sobre el eje de
+  fechas de su hoja. Las series que superan
+  DATA_CONFIG['missing_value_threshold'] se marcan como excluidas.
+- Fechas: cuántas veces la fecha retrocede respecto de la fila anterior
+  (orden de la hoja) y cuántas fechas se repiten.
+
+Todos los controles son operaciones sobre arreglos completos (diferencias,
+búsqueda binaria y bincount por clave_serie); el único recorrido en Python
+es por hoja, para armar su eje de fechas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import DATA_CONFIG, EXCEL_STRUCTURE
+
+COLUMNAS_CALIDAD = ['id_serie', 'clave_serie', 'hoja', 'observaciones', 'esperadas',
+                    'proporcion_faltantes', 'fuera_de_rango', 'fechas_desordenadas',
+                    'fechas_duplicadas', 'encabezado_valido', 'excluida']
+
+# Tabla de calidad de la última validación (ver reporte_calidad)
+ULTIMA_CALIDAD = {}
+
+def _contar_por_clave(claves, mascara, cantidad):
+    """Cuenta, para cada clave entre 0 y cantidad - 1, las filas donde mascara es True"""
+    return np.bincount(claves[mascara], minlength=cantidad)[:cantidad]
+
+def _esperadas_por_hoja(grupos, fechas, claves, inicios, fines):
+    """
+    Cantidad de fechas del eje de su hoja que caen en [inicio, fin] de cada serie.
+
+    El eje de una hoja son las fechas distintas observadas en cualquiera de
+    sus series (la columna de fechas compartida, sin las filas vacías).
+    """
+    esperadas = np.zeros(len(inicios), dtype=np.int64)
+    grupo_fila = grupos[claves]
+    for grupo in np.unique(grupos):
+        # pd.unique usa hash: solo se ordenan las fechas distintas
+        eje = np.sort(pd.unique(fechas[grupo_fila == grupo]))
+        series = np.flatnonzero(grupos == grupo)
+        desde = np.searchsorted(eje, inicios[series], side='left')
+        hasta = np.searchsorted(eje, fines[series], side='right')
+        esperadas[series] = np.maximum(hasta - desde, 0)
+    return esperadas
+
+def validar_modelo(metadatos, datos, umbral=None):
+    """
+    Arma la tabla de calidad del modelo crudo.
+
+    Args:
+        metadatos: Metadatos con clave_serie (ver construir_modelo)
+        datos: Datos en formato largo con clave_serie, en el orden de la hoja
+        umbral: Proporción máxima de faltantes. Por defecto
+            DATA_CONFIG['missing_value_threshold']
+
+    Returns:
+        pd.DataFrame: Una fila por serie con las columnas de COLUMNAS_CALIDAD
+
+    Raises:
+        ValueError: Si datos no tiene las columnas de EXCEL_STRUCTURE['required_columns']
+    """
+    faltantes = [c for c in EXCEL_STRUCTURE['required_columns'] if c not in datos.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en los datos: {', '.join(faltantes)}")
+    umbral = DATA_CONFIG['missing_value_threshold'] if umbral is None else umbral
+
+    cantidad = len(metadatos)
+    claves = datos['clave_serie'].to_numpy()
+    fechas = np.asarray(datos['fecha'].to_numpy(), dtype='datetime64')
+    validas = (claves >= 0) & (claves < cantidad) & ~np.isnat(fechas) & datos['valor'].notna().to_numpy()
+    claves, fechas = claves[validas], fechas[validas]
+
+    # Orden de la hoja agrupado por serie; construir_modelo ya lo deja así
+    if len(claves) and (np.diff(claves) < 0).any():
+        orden = np.argsort(claves, kind='stable')
+        claves, fechas = claves[orden], fechas[orden]
+    misma_serie = claves[1:] == claves[:-1]
+    pasos = fechas[1:] - fechas[:-1]
+    desordenadas = _contar_por_clave(claves[1:], misma_serie & (pasos < np.timedelta64(0)), cantidad)
+
+    # Si ninguna serie retrocede, el orden de la hoja ya es el de (clave, fecha)
+    if desordenadas.any():
+        orden = np.lexsort((fechas, claves))
+        claves_orden, fechas_orden = claves[orden], fechas[orden]
+    else:
+        orden, claves_orden, fechas_orden = slice(None), claves, fechas
+    repetidas = (claves_orden[1:] == claves_orden[:-1]) & (fechas_orden[1:] == fechas_orden[:-1])
+    duplicadas = _contar_por_clave(claves_orden[1:], repetidas, cantidad)
+
+    observaciones = np.bincount(claves, minlength=cantidad)[:cantidad]
+    primera = np.full(cantidad, np.datetime64('NaT'), dtype=fechas.dtype)
+    ultima = primera.copy()
+    con_datos = observaciones > 0
+    if len(claves):
+        # El orden por (clave, fecha) mantiene juntas las filas de cada serie
+        comienzos = np.flatnonzero(np.r_[True, ~misma_serie])
+        finales = np.r_[comienzos[1:], len(claves)] - 1
+        primera[claves[comienzos]] = fechas_orden[comienzos]
+        ultima[claves[comienzos]] = fechas_orden[finales]
+
+    inicio = pd.to_datetime(metadatos['fecha_inicio']).to_numpy().astype(fechas.dtype)
+    fin = pd.to_datetime(metadatos['fecha_fin']).to_numpy().astype(fechas.dtype)
+    encabezado_valido = (~np.isnat(inicio) & ~np.isnat(fin) & (inicio <= fin)
+                         & metadatos['unidad'].notna().to_numpy())
+    inicio = np.where(encabezado_valido, inicio, primera)
+    fin = np.where(encabezado_valido, fin, ultima)
+
+    dentro = (fechas >= inicio[claves]) & (fechas <= fin[claves])
+    fuera_de_rango = _contar_por_clave(claves, ~dentro, cantidad)
+    en_periodo = _contar_por_clave(claves, dentro, cantidad) - _contar_por_clave(
+        claves_orden[1:], repetidas & dentro[orden][1:], cantidad
+    )
+
+    columnas_grupo = [c for c in ('archivo', 'hoja') if c in metadatos.columns]
+    grupos = pd.MultiIndex.from_frame(metadatos[columnas_grupo].astype(str)).factorize()[0] \
+        if len(metadatos) else np.zeros(0, dtype=np.int64)
+    esperadas = _esperadas_por_hoja(grupos, fechas, claves, inicio, fin)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        proporcion = np.where(esperadas > 0, 1 - en_periodo / esperadas, 1.0)
+
+    return pd.DataFrame({
+        'id_serie':             metadatos['id_serie'].to_numpy(),
+        'clave_serie':          metadatos['clave_serie'].to_numpy(),
+        'hoja':                 metadatos['hoja'].to_numpy(),
+        'observaciones':        observaciones,
+        'esperadas':            esperadas,
+        'proporcion_faltantes': np.clip(proporcion, 0, 1),
+        'fuera_de_rango':       fuera_de_rango,
+        'fechas_desordenadas':  desordenadas,
+        'fechas_duplicadas':    duplicadas,
+        'encabezado_valido':    encabezado_valido,
+        'excluida':             (proporcion > umbral) | ~con_datos,
+    }, columns=COLUMNAS_CALIDAD)
+
+def aplicar_validacion(metadatos, datos, umbral=None):
+    """
+    Valida el modelo crudo y descarta de metadatos las series excluidas.
+
+    Las filas de datos de esas series se descartan después con el resto del
+    filtrado (ver modelo.preparar_modelo, que solo conserva las claves de
+    metadatos). La tabla queda disponible en reporte_calidad.
+
+    Returns:
+        tuple: (metadatos sin las series excluidas, datos, tabla de calidad)
+    """
+    calidad = validar_modelo(metadatos, datos, umbral)
+    ULTIMA_CALIDAD['tabla'] = calidad
+    excluidas = calidad['excluida'].to_numpy()
+    return metadatos[~excluidas], datos, calidad
+
+def reporte_calidad():
+    """
+    Devuelve la tabla de calidad de la última validación.
+
+    Returns:
+        pd.DataFrame: Columnas de COLUMNAS_CALIDAD (vacía si no se validó nada)
+    """
+    return ULTIMA_CALIDAD.get('tabla', pd.DataFrame(columns=COLUMNAS_CALIDAD))
+
+def imprimir_reporte_calidad(calidad):
+    """Imprime un resumen de la tabla de calidad"""
+    excluidas = calidad[calidad['excluida']]
+    print(f"🔎 Calidad: {len(calidad)} series validadas, {len(excluidas)} excluidas "
+          f"(faltantes > {DATA_CONFIG['missing_value_threshold']:.0%})")
+    for etiqueta, problema in (
+        ('encabezado inválido', ~calidad['encabezado_valido']),
+        ('fechas desordenadas', calidad['fechas_desordenadas'] > 0),
+        ('fechas duplicadas', calidad['fechas_duplicadas'] > 0),
+        ('valores fuera del rango del encabezado', calidad['fuera_de_rango'] > 0),
+    ):
+        if problema.any():
+            print(f"   ⚠️ {int(problema.sum())} series con {etiqueta}")
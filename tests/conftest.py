@@ -13,6 +13,8 @@ import os
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
+from scripts.crear_datos_ejemplo import crear_libro_sintetico
+
 @pytest.fixture
 def sample_dataframe():
     """Fixture que proporciona un DataFrame de ejemplo para testing"""
@@ -79,6 +81,25 @@ def temp_excel_file():
             # En Windows, a veces el archivo está en uso
             pass
 
+@pytest.fixture
+def libro_sintetico(tmp_path):
+    """Fixture con un libro Excel sintético de varias hojas y series cortas"""
+    return crear_libro_sintetico(
+        tmp_path / 'libro_sintetico.xlsx', n_hojas=3, n_columnas=12, n_filas=60
+    )
+
+@pytest.fixture
+def libro_irregular(tmp_path):
+    """
+    Fixture con un libro sintético con huecos interiores, fechas como texto,
+    una fecha repetida y una fecha inválida: los casos en que el armado
+    vectorizado del formato largo podría diferir del original
+    """
+    return crear_libro_sintetico(
+        tmp_path / 'libro_irregular.xlsx', n_hojas=3, n_columnas=12, n_filas=60,
+        fraccion_huecos=0.15, fechas_irregulares=True, semilla=3
+    )
+
 @pytest.fixture
 def mock_config():
     """Fixture con configuración mock para testing"""
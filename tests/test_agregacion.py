@@ -0,0 +1,220 @@
+"""
+Tests para el módulo agregacion.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src.agregacion import (
+    AgregadoEstadisticas,
+    BosquejoCuantiles,
+    agregar_fuera_de_memoria,
+    estadisticas_fuera_de_memoria,
+    estadisticas_por_bloques,
+    iterar_almacen,
+    iterar_archivo,
+    iterar_dataframe,
+)
+from src.almacen_series import AlmacenSeries
+from src.analizar_series import construir_modelo
+from src.config import CACHE_CONFIG, DATA_CONFIG
+from src.modelo import cargar_modelo_canonico, preparar_modelo
+from src.reportes.utils_reportes import (
+    crear_grafico_resumen,
+    formatear_mediana,
+    formatear_numero,
+    generar_estadisticas,
+)
+
+
+@pytest.fixture
+def modelo(libro_sintetico):
+    """Modelo canónico del libro sintético"""
+    return preparar_modelo(*construir_modelo(libro_sintetico))
+
+
+def comparar_estadisticas(resultado, esperado):
+    """
+    Compara las estadísticas agregadas con las de generar_estadisticas: la
+    mediana estimada dentro de su error relativo y la exacta, si la hay, igual
+    """
+    resultado, esperado = dict(resultado), dict(esperado)
+    numericas, esperadas = dict(resultado.pop('estadisticas_numericas')), dict(esperado.pop('estadisticas_numericas'))
+    mediana_esperada = esperadas.pop('valor_mediana')
+    estimada, error = numericas.pop('valor_mediana_estimada'), numericas.pop('error_relativo_mediana')
+    assert estimada == pytest.approx(mediana_esperada, rel=error)
+    mediana = numericas.pop('valor_mediana')
+    assert mediana is None or mediana == pytest.approx(mediana_esperada)
+    assert numericas == pytest.approx(esperadas)
+    resultado.pop('fecha_generacion')
+    esperado.pop('fecha_generacion')
+    assert resultado == esperado
+
+
+class TestBosquejoCuantiles:
+    """Tests para el bosquejo de cuantiles"""
+
+    def test_error_relativo_acotado(self):
+        """Los cuantiles estimados quedan dentro de la precisión pedida"""
+        # Arrange
+        valores = np.random.default_rng(0).lognormal(3, 2, 50_000) * np.where(np.arange(50_000) % 5, 1, -1)
+
+        # Act
+        bosquejo = BosquejoCuantiles(precision=0.01).agregar(valores)
+
+        # Assert
+        for q in (0.05, 0.25, 0.5, 0.9, 0.99):
+            assert bosquejo.cuantil(q) == pytest.approx(np.quantile(valores, q), rel=0.02)
+
+    def test_combinar_igual_que_agregar_todo(self):
+        """Combinar bosquejos de dos partes da el mismo bosquejo que el de la unión"""
+        # Arrange
+        valores = np.random.default_rng(1).normal(0, 10, 10_000)
+        valores[:100] = 0
+
+        # Act
+        combinado = BosquejoCuantiles().agregar(valores[:3000]).combinar(BosquejoCuantiles().agregar(valores[3000:]))
+        completo = BosquejoCuantiles().agregar(valores)
+
+        # Assert
+        assert combinado.cantidad == completo.cantidad == len(valores)
+        assert combinado.cuantil(0.5) == completo.cuantil(0.5)
+
+
+class TestEstadisticasPorBloques:
+    """Tests para las estadísticas por bloques"""
+
+    def test_igual_a_generar_estadisticas(self, modelo):
+        """Con bloques chicos se obtiene el mismo diccionario que en memoria"""
+        # Arrange
+        metadatos, datos = modelo
+
+        # Act
+        resultado = estadisticas_por_bloques(iterar_dataframe(datos, 997), metadatos)
+
+        # Assert
+        comparar_estadisticas(resultado, generar_estadisticas(datos, metadatos))
+
+    def test_bloques_del_almacen(self, modelo):
+        """Los bloques del almacén dan lo mismo que los del DataFrame"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Act
+        resultado = estadisticas_por_bloques(iterar_almacen(almacen, 1500), metadatos)
+
+        # Assert
+        comparar_estadisticas(resultado, generar_estadisticas(datos, metadatos))
+
+    def test_combinar_agregados(self, modelo):
+        """Dos agregados parciales combinados equivalen a uno solo"""
+        # Arrange
+        metadatos, datos = modelo
+        mitad = len(datos) // 2
+
+        # Act
+        primero = AgregadoEstadisticas().agregar(datos.iloc[:mitad])
+        primero.combinar(AgregadoEstadisticas().agregar(datos.iloc[mitad:]))
+
+        # Assert
+        comparar_estadisticas(primero.estadisticas(metadatos), generar_estadisticas(datos, metadatos))
+
+
+class TestEstadisticasFueraDeMemoria:
+    """Tests para la agregación del modelo canónico sin cargarlo completo"""
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path):
+        with patch.dict(CACHE_CONFIG, {'directorio': str(tmp_path / 'cache')}):
+            yield tmp_path / 'cache'
+
+    def test_desde_la_cache(self, libro_sintetico, cache_temporal):
+        """Con el modelo canónico en caché, lee su archivo de datos en bloques del tamaño pedido"""
+        # Arrange
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico)
+        archivo = next(cache_temporal.glob('canonico_*_datos.*'))
+
+        # Act
+        with patch('src.agregacion.iterar_modelo_por_hojas') as por_hojas:
+            resultado = estadisticas_fuera_de_memoria(libro_sintetico, filas_por_bloque=1000)
+
+        # Assert
+        por_hojas.assert_not_called()
+        comparar_estadisticas(resultado, generar_estadisticas(datos, metadatos))
+        assert max(len(bloque) for bloque in iterar_archivo(archivo, 1000)) <= 1000
+
+    @patch.dict(DATA_CONFIG, {'validar_calidad': True})
+    def test_por_hojas_sin_cargar_el_modelo(self, libro_irregular, cache_temporal, tmp_path):
+        """Sin caché del modelo canónico, se agrega de a una hoja y se obtiene lo mismo, con validación"""
+        # Arrange
+        with patch.dict(CACHE_CONFIG, {'directorio': str(tmp_path / 'referencia')}):
+            metadatos, datos = cargar_modelo_canonico(libro_irregular)
+        bloques = []
+        agregar = AgregadoEstadisticas.agregar
+
+        def registrar(agregado, bloque):
+            bloques.append(len(bloque))
+            return agregar(agregado, bloque)
+
+        # Act
+        with patch('src.modelo.cargar_modelo') as cargar, \
+             patch.object(AgregadoEstadisticas, 'agregar', registrar):
+            resultado = estadisticas_fuera_de_memoria(libro_irregular)
+
+        # Assert
+        cargar.assert_not_called()
+        assert not list(cache_temporal.glob('canonico_*'))
+        # Un bloque por hoja con series válidas, nunca el modelo entero
+        assert len(bloques) > 1 and sum(bloques) == len(datos)
+        assert resultado['total_series'] == len(metadatos)
+        assert resultado['estadisticas_numericas']['valor_mediana'] is None
+        comparar_estadisticas(resultado, generar_estadisticas(datos, metadatos))
+
+    def test_sin_cache(self, libro_sintetico, cache_temporal):
+        """Con usar_cache en False se agrega desde el libro sin leer ni escribir la caché"""
+        # Arrange
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico)
+        archivos = sorted(cache_temporal.rglob('*'))
+
+        # Act
+        with patch('src.agregacion.iterar_archivo') as desde_cache:
+            metadatos_agregados, agregado = agregar_fuera_de_memoria(libro_sintetico, usar_cache=False)
+
+        # Assert
+        desde_cache.assert_not_called()
+        assert sorted(cache_temporal.rglob('*')) == archivos
+        comparar_estadisticas(agregado.estadisticas(metadatos_agregados), generar_estadisticas(datos, metadatos))
+
+    def test_mediana_en_reportes(self, libro_sintetico):
+        """Los reportes muestran la mediana exacta o, fuera de memoria, la estimada con su error"""
+        # Arrange
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico)
+
+        # Act
+        estimada = formatear_mediana(estadisticas_fuera_de_memoria(libro_sintetico)['estadisticas_numericas'])
+        exacta = formatear_mediana(generar_estadisticas(datos, metadatos)['estadisticas_numericas'])
+
+        # Assert
+        assert estimada.startswith('≈') and '±' in estimada
+        assert exacta == formatear_numero(datos['valor'].median())
+
+    def test_grafico_de_resumen_desde_agregados(self, libro_sintetico):
+        """Los agregados con con_graficos alcanzan para el gráfico de resumen de los reportes"""
+        # Arrange
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico)
+
+        # Act
+        _, agregado = agregar_fuera_de_memoria(libro_sintetico, filas_por_bloque=1000, con_graficos=True)
+        figura = crear_grafico_resumen(None, metadatos, agregado=agregado)
+
+        # Assert
+        mensual = datos.groupby(datos['fecha'].dt.to_period('M'))['valor'].mean()
+        np.testing.assert_allclose(agregado.medias_mensuales()['valor'], mensual.to_numpy())
+        cajas = [traza for traza in figura.data if traza.type == 'box']
+        assert sorted(caja.name for caja in cajas) == sorted(datos['tipo'].unique())
+        for caja in cajas:
+            valores = datos.loc[datos['tipo'] == caja.name, 'valor']
+            assert caja.median[0] == pytest.approx(valores.median(), rel=agregado.bosquejo.precision)
+            assert caja.lowerfence[0] == valores.min()
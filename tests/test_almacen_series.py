@@ -0,0 +1,329 @@
+"""
+Tests para el módulo almacen_series.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock, patch
+from src.almacen_series import AlmacenSeries, abrir_almacen_compartido
+from src.analizar_series import construir_modelo
+from src.catalogo import construir_catalogo, enriquecer_datos
+from src.config import DATA_CONFIG
+
+
+@pytest.fixture
+def modelo(libro_sintetico):
+    """Modelo construido a partir del libro sintético"""
+    return construir_modelo(libro_sintetico)
+
+
+class TestDesdeModelo:
+    """Tests para la construcción del almacén"""
+
+    def test_ida_y_vuelta(self, modelo):
+        """a_dataframe reproduce exactamente datos"""
+        # Arrange
+        metadatos, datos = modelo
+
+        # Act
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Assert
+        assert len(almacen) == len(metadatos)
+        assert almacen.filas == len(datos)
+        pd.testing.assert_frame_equal(almacen.a_dataframe(), datos)
+
+    def test_ida_y_vuelta_compacto(self, libro_sintetico):
+        """El modo compacto conserva los tipos categóricos al volver al DataFrame"""
+        # Arrange
+        metadatos, datos = construir_modelo(libro_sintetico, compacto=True)
+
+        # Act
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Assert
+        pd.testing.assert_frame_equal(almacen.a_dataframe(), datos)
+
+    def test_ordena_por_serie_y_fecha(self, modelo):
+        """Un datos desordenado queda agrupado por serie y ordenado por fecha"""
+        # Arrange
+        metadatos, datos = modelo
+        mezclado = datos.sample(frac=1, random_state=0)
+
+        # Act
+        almacen = AlmacenSeries.desde_modelo(metadatos, mezclado)
+
+        # Assert
+        pd.testing.assert_frame_equal(almacen.a_dataframe(), datos)
+
+    def test_descarta_series_sin_metadatos(self, modelo):
+        """Las filas con clave -1 no entran al almacén"""
+        # Arrange
+        metadatos, datos = modelo
+        datos = datos.copy()
+        datos.loc[:9, 'clave_serie'] = -1
+
+        # Act
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Assert
+        assert almacen.filas == len(datos) - 10
+
+    def test_desplazamientos(self, modelo):
+        """Los desplazamientos delimitan las filas de cada serie"""
+        # Arrange
+        metadatos, datos = modelo
+
+        # Act
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Assert
+        assert almacen.desplazamientos[0] == 0
+        assert almacen.desplazamientos[-1] == len(datos)
+        np.testing.assert_array_equal(
+            almacen.largos(), datos.groupby('clave_serie').size().reindex(range(len(metadatos)), fill_value=0)
+        )
+
+
+class TestConsultas:
+    """Tests para el acceso por serie"""
+
+    def test_serie_es_una_vista(self, modelo):
+        """serie devuelve slices de los arreglos, sin copiar"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+        clave = 5
+
+        # Act
+        fechas, valores = almacen.serie(clave)
+
+        # Assert
+        assert np.shares_memory(valores, almacen.valores)
+        esperado = datos[datos['clave_serie'] == clave]
+        np.testing.assert_array_equal(fechas, esperado['fecha'].to_numpy())
+        np.testing.assert_array_equal(valores, esperado['valor'].to_numpy())
+
+    def test_a_dataframe_de_varias_series(self, modelo):
+        """Varias claves se concatenan en el orden pedido y se enriquecen"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+        claves = [7, 2, 20]
+
+        # Act
+        resultado = almacen.a_dataframe(claves, columnas=('tipo', 'categoria'))
+
+        # Assert
+        esperado = pd.concat([datos[datos['clave_serie'] == clave] for clave in claves], ignore_index=True)
+        esperado = enriquecer_datos(esperado, construir_catalogo(metadatos))
+        pd.testing.assert_frame_equal(resultado, esperado)
+
+    def test_claves_por_tipo_y_categoria(self, modelo):
+        """claves_por filtra sobre los metadatos"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+        tipo = metadatos['tipo'].iloc[0]
+        categoria = metadatos['categoria'].iloc[0]
+
+        # Act
+        por_tipo = almacen.claves_por(tipo=tipo)
+        por_ambos = almacen.claves_por(tipo=tipo, categoria=categoria)
+
+        # Assert
+        np.testing.assert_array_equal(por_tipo, metadatos.loc[metadatos['tipo'] == tipo, 'clave_serie'])
+        assert set(por_ambos) <= set(por_tipo)
+        assert 0 in por_ambos
+
+    def test_claves_desde_ids(self, modelo):
+        """claves traduce id_serie y rechaza los desconocidos"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Act
+        claves = almacen.claves(metadatos['id_serie'].iloc[[3, 1]])
+
+        # Assert
+        np.testing.assert_array_equal(claves, [3, 1])
+        with pytest.raises(KeyError):
+            almacen.claves(['no_existe'])
+
+    def test_claves_con_huecos_en_el_catalogo(self, modelo):
+        """claves funciona cuando faltan varias claves en los metadatos"""
+        # Arrange
+        metadatos, datos = modelo
+        sin_huecos = metadatos[~metadatos['clave_serie'].isin([1, 2])]
+        almacen = AlmacenSeries.desde_modelo(sin_huecos, datos)
+
+        # Act
+        claves = almacen.claves(metadatos['id_serie'].iloc[[3, 0]])
+
+        # Assert
+        np.testing.assert_array_equal(claves, [3, 0])
+        with pytest.raises(KeyError):
+            almacen.claves(metadatos['id_serie'].iloc[[1]])
+
+
+class TestConsultarRango:
+    """Tests para las consultas por rango de fechas"""
+
+    def test_todas_las_series_igual_que_la_mascara(self, modelo):
+        """Sin claves, el resultado coincide con filtrar datos por fecha"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+        inicio, fin = datos['fecha'].quantile([0.25, 0.75])
+
+        # Act
+        resultado = almacen.consultar_rango(inicio, fin)
+
+        # Assert
+        esperado = datos[(datos['fecha'] >= inicio) & (datos['fecha'] <= fin)].reset_index(drop=True)
+        assert 0 < len(resultado) < len(datos)
+        pd.testing.assert_frame_equal(resultado, esperado)
+
+    def test_series_elegidas_con_columnas(self, modelo):
+        """Con claves, se devuelven solo esas series en el rango, enriquecidas"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+        claves = [7, 2, 20]
+        inicio, fin = '1991-03-01', '1993-06-30'
+
+        # Act
+        resultado = almacen.consultar_rango(inicio, fin, claves, columnas=('tipo', 'categoria'))
+
+        # Assert
+        esperado = almacen.a_dataframe(claves, columnas=('tipo', 'categoria'))
+        esperado = esperado[(esperado['fecha'] >= inicio) & (esperado['fecha'] <= fin)]
+        pd.testing.assert_frame_equal(resultado, esperado.reset_index(drop=True))
+
+    def test_limites_incluidos_y_abiertos(self, modelo):
+        """Los límites se incluyen y None deja el rango abierto de ese lado"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+        fecha = datos['fecha'].iloc[10]
+
+        # Act
+        exacto = almacen.consultar_rango(fecha, fecha)
+        hasta = almacen.consultar_rango(fin=fecha)
+        completo = almacen.consultar_rango()
+
+        # Assert
+        assert len(exacto) == (datos['fecha'] == fecha).sum()
+        assert len(hasta) == (datos['fecha'] <= fecha).sum()
+        pd.testing.assert_frame_equal(completo, datos)
+
+    def test_rango_vacio(self, modelo):
+        """Un rango sin observaciones devuelve un DataFrame vacío con las columnas del modelo"""
+        # Arrange
+        metadatos, datos = modelo
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Act
+        sin_claves = almacen.consultar_rango('1800-01-01', '1800-12-31')
+        con_claves = almacen.consultar_rango('1800-01-01', '1800-12-31', [0, 1])
+
+        # Assert
+        assert sin_claves.empty and con_claves.empty
+        assert list(sin_claves.columns) == list(datos.columns)
+
+
+class TestAlmacenEnDisco:
+    """Tests para el almacén guardado en disco y mapeado en memoria"""
+
+    def test_guardar_y_abrir(self, modelo, tmp_path):
+        """Abrir un almacén guardado devuelve los mismos datos, mapeados y de solo lectura"""
+        # Arrange
+        metadatos, datos = modelo
+        AlmacenSeries.desde_modelo(metadatos, datos).guardar(tmp_path / 'almacen')
+
+        # Act
+        almacen = AlmacenSeries.abrir(tmp_path / 'almacen')
+
+        # Assert
+        assert isinstance(almacen.valores.base, np.memmap)
+        assert not almacen.valores.flags.writeable
+        pd.testing.assert_frame_equal(almacen.metadatos, metadatos)
+        pd.testing.assert_frame_equal(almacen.a_dataframe(), datos)
+
+    def test_otra_version_del_formato(self, modelo, tmp_path):
+        """Un almacén de otra versión no se abre"""
+        # Arrange
+        metadatos, datos = modelo
+        AlmacenSeries.desde_modelo(metadatos, datos).guardar(tmp_path / 'almacen')
+        descripcion = tmp_path / 'almacen' / 'almacen.json'
+        descripcion.write_text(json.dumps({**json.loads(descripcion.read_text()), 'version': '0'}))
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            AlmacenSeries.abrir(tmp_path / 'almacen')
+
+    def test_dataframe_compartido_sin_copias(self, modelo, tmp_path):
+        """a_dataframe_compartido usa los arreglos mapeados y coincide con el modelo enriquecido"""
+        # Arrange
+        metadatos, datos = modelo
+        AlmacenSeries.desde_modelo(metadatos, datos).guardar(tmp_path / 'almacen')
+        almacen = AlmacenSeries.abrir(tmp_path / 'almacen')
+
+        # Act
+        compartido = almacen.a_dataframe_compartido(columnas=('tipo', 'categoria'))
+
+        # Assert
+        assert np.shares_memory(compartido['valor'].to_numpy(), almacen.valores)
+        assert np.shares_memory(compartido['fecha'].to_numpy(), almacen.fechas)
+        assert isinstance(compartido['id_serie'].dtype, pd.CategoricalDtype)
+        esperado = enriquecer_datos(datos, construir_catalogo(metadatos))
+        pd.testing.assert_frame_equal(compartido, esperado, check_dtype=False, check_categorical=False)
+
+    def test_construye_una_sola_vez(self, libro_sintetico, modelo, tmp_path):
+        """El segundo proceso (o llamada) abre el almacén sin construir el modelo"""
+        # Arrange
+        construir = Mock(return_value=modelo)
+
+        # Act
+        primero = abrir_almacen_compartido(libro_sintetico, construir, tmp_path)
+        segundo = abrir_almacen_compartido(libro_sintetico, construir, tmp_path)
+
+        # Assert
+        construir.assert_called_once()
+        assert segundo.filas == primero.filas == len(modelo[1])
+
+    def test_reconstruye_si_cambia_el_libro(self, libro_sintetico, modelo, tmp_path):
+        """Un libro modificado invalida el almacén y se descarta el anterior"""
+        # Arrange
+        construir = Mock(return_value=modelo)
+        abrir_almacen_compartido(libro_sintetico, construir, tmp_path)
+        estado = os.stat(libro_sintetico)
+        os.utime(libro_sintetico, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10**9))
+
+        # Act
+        abrir_almacen_compartido(libro_sintetico, construir, tmp_path)
+
+        # Assert
+        assert construir.call_count == 2
+        assert len([d for d in tmp_path.iterdir() if d.is_dir()]) == 1
+
+    def test_reconstruye_si_cambia_el_modelo_canonico(self, libro_sintetico, modelo, tmp_path):
+        """Cambiar la validación, la versión del modelo o compacto invalida el almacén"""
+        # Arrange
+        construir = Mock(return_value=modelo)
+        abrir_almacen_compartido(libro_sintetico, construir, tmp_path)
+
+        # Act
+        with patch.dict(DATA_CONFIG, {'missing_value_threshold': 0.5}):
+            abrir_almacen_compartido(libro_sintetico, construir, tmp_path)
+        with patch('src.modelo.VERSION_MODELO', 'otra'):
+            abrir_almacen_compartido(libro_sintetico, construir, tmp_path)
+        abrir_almacen_compartido(libro_sintetico, construir, tmp_path, compacto=True)
+        abrir_almacen_compartido(libro_sintetico, construir, tmp_path, compacto=True)
+
+        # Assert
+        assert construir.call_count == 4
@@ -10,6 +10,7 @@ from pathlib import Path
 import tempfile
 import os
 from src.analizar_series import construir_modelo
+from src.catalogo import asignar_claves
 
 
 class TestConstruirModelo:
@@ -267,4 +268,328 @@ class TestConstruirModeloIntegration:
                 serie_datos = datos[datos['id_serie'] == row['id_serie']]
                 if len(serie_datos) > 0:
                     assert serie_datos['fecha'].min() >= row['fecha_inicio']
-                    assert serie_datos['fecha'].max() <= row['fecha_fin'] 
\ No newline at end of file
+                    assert serie_datos['fecha'].max() <= row['fecha_fin'] 
+
+def _construir_modelo_referencia(ruta_archivo):
+    """Implementación original celda a celda, usada como referencia de equivalencia"""
+    libro = pd.ExcelFile(ruta_archivo)
+
+    filas_meta = []
+    for hoja in libro.sheet_names:
+        df = libro.parse(hoja, header=None)
+        for col in df.columns:
+            tipo_raw = df.iloc[2, col]
+            categoria_raw = df.iloc[3, col]
+            filas_meta.append({
+                'id_serie': f"{hoja}__col{col}",
+                'hoja': hoja,
+                'tipo': None if isinstance(tipo_raw, pd.Timestamp) else str(tipo_raw).strip(),
+                'categoria': None if isinstance(categoria_raw, pd.Timestamp) else str(categoria_raw).strip(),
+                'unidad': df.iloc[4, col],
+                'fecha_inicio': pd.to_datetime(df.iloc[1, col], errors='coerce'),
+                'fecha_fin': pd.to_datetime(df.iloc[5, col], errors='coerce')
+            })
+
+    metadatos = (
+        pd.DataFrame(filas_meta)
+          .dropna(subset=['tipo', 'categoria'])
+          [['id_serie', 'hoja', 'tipo', 'categoria', 'unidad', 'fecha_inicio', 'fecha_fin']]
+          .reset_index(drop=True)
+    )
+
+    filas_datos = []
+    for hoja in libro.sheet_names:
+        df = libro.parse(hoja, header=None)
+        idx_fecha = df.columns[0]
+        fechas = pd.to_datetime(df.iloc[6:, idx_fecha], errors='coerce')
+        for col in df.columns.drop(idx_fecha):
+            id_serie = f"{hoja}__col{col}"
+            valores = pd.to_numeric(df.iloc[6:, col], errors='coerce')
+            for fecha, valor in zip(fechas, valores):
+                filas_datos.append({'id_serie': id_serie, 'fecha': fecha, 'valor': valor})
+
+    datos = pd.DataFrame(filas_datos).dropna(subset=['fecha']).reset_index(drop=True)
+
+    ids_con_valor = datos.dropna(subset=['valor'])['id_serie'].unique()
+    metadatos = metadatos[metadatos['id_serie'].isin(ids_con_valor)].reset_index(drop=True)
+    datos = datos[datos['id_serie'].isin(ids_con_valor)].reset_index(drop=True)
+
+    return metadatos, datos
+
+
+def _como_modelo_actual(metadatos, datos):
+    """
+    Aplica a la referencia los cambios posteriores de construir_modelo, que
+    no alteran el contenido: no se generan filas para celdas vacías y se
+    agregan las claves enteras
+    """
+    datos = datos.dropna(subset=['valor']).reset_index(drop=True)
+    return asignar_claves(metadatos, datos)
+
+
+def _libro_en_memoria(ruta_archivo):
+    """Lee todas las hojas una vez y devuelve un ExcelFile simulado que las sirve"""
+    libro = pd.ExcelFile(ruta_archivo)
+    hojas = {hoja: libro.parse(hoja, header=None) for hoja in libro.sheet_names}
+
+    mock_excel = MagicMock()
+    mock_excel.sheet_names = list(hojas)
+    mock_excel.parse.side_effect = lambda hoja, **kwargs: hojas[hoja]
+    return mock_excel
+
+
+class TestMotorVectorizado:
+    """Tests del reestructurado vectorizado de datos a formato largo"""
+
+    @pytest.mark.parametrize('libro', ['libro_sintetico', 'libro_irregular'])
+    def test_equivalencia_con_implementacion_original(self, libro, request):
+        """El modelo vectorizado es idéntico al construido celda a celda"""
+        # Arrange
+        ruta = request.getfixturevalue(libro)
+
+        # Act
+        metadatos_ref, datos_ref = _como_modelo_actual(*_construir_modelo_referencia(ruta))
+        metadatos, datos = construir_modelo(ruta)
+
+        # Assert
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+
+    def test_orden_por_hoja_columna_fila(self, libro_sintetico):
+        """Las filas quedan agrupadas por serie en el orden de hojas y columnas"""
+        # Act
+        metadatos, datos = construir_modelo(libro_sintetico)
+
+        # Assert
+        orden_series = datos['id_serie'].drop_duplicates().tolist()
+        assert orden_series == metadatos['id_serie'].tolist()
+        for _, serie in datos.groupby('id_serie', sort=False):
+            assert serie['fecha'].is_monotonic_increasing
+
+    @pytest.mark.slow
+    def test_tiempo_frente_a_implementacion_original(self, tmp_path):
+        """En un libro grande el motor vectorizado es más rápido que el original"""
+        # Arrange
+        import time
+        from scripts.crear_datos_ejemplo import crear_libro_sintetico
+        ruta = crear_libro_sintetico(
+            tmp_path / 'libro_grande.xlsx', n_hojas=2, n_columnas=150, n_filas=300
+        )
+        libro = _libro_en_memoria(ruta)
+
+        # Act
+        with patch('pandas.ExcelFile', return_value=libro):
+            inicio = time.perf_counter()
+            _, datos_ref = _como_modelo_actual(*_construir_modelo_referencia(ruta))
+            tiempo_referencia = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            _, datos = construir_modelo(ruta)
+            tiempo_vectorizado = time.perf_counter() - inicio
+
+        # Assert
+        pd.testing.assert_frame_equal(datos, datos_ref)
+        assert tiempo_vectorizado < tiempo_referencia
+
+
+class TestLecturaUnica:
+    """Tests de la lectura única por hoja en construir_modelo"""
+
+    def test_cada_hoja_se_decodifica_una_vez(self, libro_sintetico):
+        """Cada hoja se parsea exactamente una vez"""
+        # Arrange
+        from src.analizar_series import CONTADOR_PARSEOS, reiniciar_contador_parseos
+        reiniciar_contador_parseos()
+
+        # Act
+        metadatos, _ = construir_modelo(libro_sintetico)
+
+        # Assert
+        hojas = pd.ExcelFile(libro_sintetico).sheet_names
+        assert dict(CONTADOR_PARSEOS) == {hoja: 1 for hoja in hojas}
+        assert set(metadatos['hoja']) == set(hojas)
+
+    def test_reiniciar_contador(self, libro_sintetico):
+        """El contador vuelve a cero al reiniciarlo"""
+        # Arrange
+        from src.analizar_series import CONTADOR_PARSEOS, reiniciar_contador_parseos
+        construir_modelo(libro_sintetico)
+
+        # Act
+        reiniciar_contador_parseos()
+
+        # Assert
+        assert sum(CONTADOR_PARSEOS.values()) == 0
+
+
+class TestIngestaParalela:
+    """Tests de la lectura de hojas en paralelo con un pool de procesos"""
+
+    @pytest.mark.parametrize('workers', [2, 3, 8])
+    def test_paralelo_identico_a_secuencial(self, libro_irregular, workers):
+        """El resultado en paralelo es idéntico al secuencial"""
+        # Act
+        metadatos_ref, datos_ref = construir_modelo(libro_irregular, workers=1)
+        metadatos, datos = construir_modelo(libro_irregular, workers=workers)
+
+        # Assert
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+
+    def test_paralelo_registra_una_lectura_por_hoja(self, libro_sintetico):
+        """El contador refleja una lectura por hoja también en paralelo"""
+        # Arrange
+        from src.analizar_series import CONTADOR_PARSEOS, reiniciar_contador_parseos
+        reiniciar_contador_parseos()
+
+        # Act
+        construir_modelo(libro_sintetico, workers=2)
+
+        # Assert
+        hojas = pd.ExcelFile(libro_sintetico).sheet_names
+        assert dict(CONTADOR_PARSEOS) == {hoja: 1 for hoja in hojas}
+
+    def test_workers_por_defecto_desde_config(self, libro_sintetico):
+        """Sin workers explícitos se usa INGESTA_CONFIG['workers']"""
+        # Arrange
+        from src import analizar_series
+
+        # Act
+        with patch.dict(analizar_series.INGESTA_CONFIG, {'workers': 1}), \
+             patch.object(analizar_series, '_procesar_hojas_en_paralelo') as paralelo:
+            construir_modelo(libro_sintetico)
+
+        # Assert
+        paralelo.assert_not_called()
+
+
+class TestOmisionDeVacios:
+    """Tests del descarte de celdas vacías durante la ingesta"""
+
+    def test_datos_sin_filas_vacias(self, libro_sintetico):
+        """No se generan filas para celdas sin valor"""
+        # Act
+        _, datos = construir_modelo(libro_sintetico)
+
+        # Assert
+        assert not datos['valor'].isna().any()
+        assert not datos['fecha'].isna().any()
+
+    def test_reporte_de_celdas_omitidas(self, libro_sintetico):
+        """Por hoja, las celdas omitidas más las filas generadas cubren el bloque de datos"""
+        # Arrange
+        from src.analizar_series import reporte_celdas_omitidas
+
+        # Act
+        _, datos = construir_modelo(libro_sintetico)
+        reporte = reporte_celdas_omitidas().set_index('hoja')['celdas_omitidas']
+
+        # Assert
+        libro = pd.ExcelFile(libro_sintetico)
+        for hoja in libro.sheet_names:
+            df = libro.parse(hoja, header=None)
+            celdas = (len(df) - 6) * (len(df.columns) - 1)
+            filas = datos['id_serie'].str.startswith(f"{hoja}__").sum()
+            assert reporte[hoja] + filas == celdas
+        assert reporte.sum() > 0
+
+    def test_reporte_en_paralelo_y_streaming(self, libro_sintetico):
+        """El reporte de celdas omitidas es el mismo en todos los modos de lectura"""
+        # Arrange
+        from src.analizar_series import reporte_celdas_omitidas
+        construir_modelo(libro_sintetico)
+        esperado = reporte_celdas_omitidas()
+
+        # Act & Assert
+        construir_modelo(libro_sintetico, workers=2)
+        pd.testing.assert_frame_equal(reporte_celdas_omitidas(), esperado)
+        construir_modelo(libro_sintetico, streaming=True)
+        pd.testing.assert_frame_equal(reporte_celdas_omitidas(), esperado)
+
+    @patch('pandas.ExcelFile')
+    def test_recorte_por_fechas_de_metadatos(self, mock_excel_file):
+        """Con recortar_por_metadatos se descartan valores fuera de fecha_inicio/fecha_fin"""
+        # Arrange
+        df = pd.DataFrame({
+            0: ['Fecha', None, None, None, None, None] +
+               list(pd.date_range('2023-01-01', periods=4, freq='MS')),
+            1: ['Serie', pd.Timestamp('2023-02-01'), 'PIB', 'Economía', 'USD',
+                pd.Timestamp('2023-03-01'), 1.0, 2.0, 3.0, 4.0],
+            2: ['Serie', None, 'Empleo', 'Social', '%', None, 5.0, 6.0, 7.0, 8.0],
+        })
+        mock_excel = MagicMock()
+        mock_excel.sheet_names = ['Hoja1']
+        mock_excel.parse.return_value = df
+        mock_excel_file.return_value = mock_excel
+
+        # Act
+        with patch.dict('src.analizar_series.INGESTA_CONFIG', {'recortar_por_metadatos': True}):
+            _, datos = construir_modelo('fake_file.xlsx')
+        _, datos_completos = construir_modelo('fake_file.xlsx')
+
+        # Assert
+        assert datos.loc[datos['id_serie'] == 'Hoja1__col1', 'valor'].tolist() == [2.0, 3.0]
+        assert datos.loc[datos['id_serie'] == 'Hoja1__col2', 'valor'].tolist() == [5.0, 6.0, 7.0, 8.0]
+        assert len(datos_completos) == 8
+
+
+class TestEscanearCatalogo:
+    """Tests del escaneo de metadatos sin leer los datos"""
+
+    def test_igual_a_metadatos_del_modelo(self, libro_sintetico):
+        """Con todas las series con valores coincide con los metadatos del modelo"""
+        # Arrange
+        from src.analizar_series import escanear_catalogo
+        metadatos_ref, _ = construir_modelo(libro_sintetico)
+
+        # Act
+        catalogo = escanear_catalogo(libro_sintetico)
+
+        # Assert
+        pd.testing.assert_frame_equal(catalogo, metadatos_ref.drop(columns='clave_serie'))
+
+    @patch('pandas.ExcelFile')
+    def test_lee_solo_el_encabezado(self, mock_excel_file):
+        """Cada hoja se lee con nrows igual a las filas de encabezado"""
+        # Arrange
+        from src.analizar_series import escanear_catalogo, CONTADOR_PARSEOS, reiniciar_contador_parseos
+        encabezado = pd.DataFrame({
+            0: ['Fecha', None, None, None, None, None],
+            1: ['Serie', pd.Timestamp('2020-01-01'), 'PIB', 'Economía', 'USD', pd.Timestamp('2020-12-01')],
+            2: ['Serie', None, 'Empleo', 'Social', '%', None],
+        })
+        mock_excel = MagicMock()
+        mock_excel.sheet_names = ['Hoja1', 'Hoja2']
+        mock_excel.parse.return_value = encabezado
+        mock_excel_file.return_value = mock_excel
+        reiniciar_contador_parseos()
+
+        # Act
+        catalogo = escanear_catalogo('fake_file.xlsx')
+
+        # Assert
+        for llamada in mock_excel.parse.call_args_list:
+            assert llamada.kwargs['nrows'] == 6
+        assert len(CONTADOR_PARSEOS) == 0
+        assert catalogo['id_serie'].tolist() == ['Hoja1__col1', 'Hoja1__col2', 'Hoja2__col1', 'Hoja2__col2']
+        assert catalogo.loc[0, 'fecha_fin'] == pd.Timestamp('2020-12-01')
+
+    @patch('pandas.ExcelFile')
+    def test_hoja_vacia_o_encabezado_incompleto(self, mock_excel_file):
+        """Hojas vacías o con menos filas que el encabezado no fallan"""
+        # Arrange
+        from src.analizar_series import escanear_catalogo
+        incompleto = pd.DataFrame({0: ['Fecha', None, None], 1: ['Serie', None, 'PIB']})
+        mock_excel = MagicMock()
+        mock_excel.sheet_names = ['Vacia', 'Corta']
+        mock_excel.parse.side_effect = lambda hoja, **kwargs: (
+            pd.DataFrame() if hoja == 'Vacia' else incompleto
+        )
+        mock_excel_file.return_value = mock_excel
+
+        # Act
+        catalogo = escanear_catalogo('fake_file.xlsx')
+
+        # Assert
+        assert catalogo['id_serie'].tolist() == ['Corta__col1']
+        assert catalogo.loc[0, 'tipo'] == 'PIB'
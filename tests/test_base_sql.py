@@ -0,0 +1,132 @@
+"""
+Tests para el módulo base_sql.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src import base_sql
+from src.analizar_series import construir_modelo
+from src.base_sql import abrir_base_sql, consultar_sql, guardar_base_sql
+from src.config import CACHE_CONFIG
+from src.modelo import preparar_modelo
+
+
+@pytest.fixture
+def modelo(libro_sintetico):
+    """Modelo canónico del libro sintético"""
+    return preparar_modelo(*construir_modelo(libro_sintetico))
+
+
+@pytest.fixture
+def base(modelo, tmp_path):
+    """Base SQL escrita a partir del modelo"""
+    return guardar_base_sql(*modelo, tmp_path / 'series.sqlite')
+
+
+class TestGuardarBaseSql:
+    """Tests para el contenido de la base"""
+
+    def test_tablas_y_filas(self, modelo, base):
+        """series y observaciones tienen una fila por serie y por observación"""
+        # Arrange
+        metadatos, datos = modelo
+
+        # Act
+        series = consultar_sql("SELECT COUNT(*) AS n FROM series", base)
+        observaciones = consultar_sql("SELECT COUNT(*) AS n FROM observaciones", base)
+
+        # Assert
+        assert series['n'].iloc[0] == len(metadatos)
+        assert observaciones['n'].iloc[0] == len(datos)
+
+    def test_vista_datos_igual_al_modelo(self, modelo, base):
+        """La vista datos reproduce el modelo en formato largo"""
+        # Arrange
+        _, datos = modelo
+
+        # Act
+        resultado = consultar_sql("SELECT * FROM datos ORDER BY clave_serie, fecha", base)
+
+        # Assert
+        np.testing.assert_array_equal(resultado['id_serie'], datos['id_serie'])
+        np.testing.assert_array_equal(pd.to_datetime(resultado['fecha']), datos['fecha'])
+        np.testing.assert_allclose(resultado['valor'], datos['valor'])
+        np.testing.assert_array_equal(resultado['tipo'], datos['tipo'].astype(str))
+
+    def test_agregados_por_tipo(self, modelo, base):
+        """Agregar el resumen por serie da lo mismo que agregar las observaciones"""
+        # Arrange
+        _, datos = modelo
+
+        # Act
+        resultado = consultar_sql(
+            "SELECT s.tipo, SUM(r.cantidad) AS cantidad, SUM(r.suma) / SUM(r.cantidad) AS promedio, "
+            "MIN(r.minimo) AS minimo, MAX(r.maximo) AS maximo "
+            "FROM resumen_series r JOIN series s USING (clave_serie) GROUP BY s.tipo ORDER BY s.tipo",
+            base
+        ).set_index('tipo')
+
+        # Assert
+        esperado = datos.groupby('tipo', observed=True)['valor'].agg(['count', 'mean', 'min', 'max'])
+        np.testing.assert_array_equal(resultado['cantidad'], esperado['count'])
+        np.testing.assert_allclose(resultado['promedio'], esperado['mean'])
+        np.testing.assert_allclose(resultado[['minimo', 'maximo']], esperado[['min', 'max']])
+
+    def test_indices_usados(self, base):
+        """Las consultas por serie y fecha se resuelven con índices"""
+        # Act
+        plan = consultar_sql(
+            "EXPLAIN QUERY PLAN SELECT valor FROM observaciones "
+            "WHERE clave_serie = ? AND fecha BETWEEN ? AND ?",
+            base, (3, '1991-01-01', '1992-01-01')
+        )
+
+        # Assert
+        assert plan['detail'].str.contains('idx_observaciones_serie_fecha').any()
+        indices = consultar_sql("SELECT name FROM sqlite_master WHERE type = 'index'", base)['name']
+        assert {'idx_series_tipo', 'idx_series_categoria', 'idx_observaciones_fecha'} <= set(indices)
+
+    def test_solo_lectura(self, base):
+        """consultar_sql abre la base en solo lectura"""
+        with pytest.raises(Exception, match='readonly'):
+            consultar_sql("DELETE FROM series", base)
+
+
+class TestAbrirBaseSql:
+    """Tests para la reutilización de la base"""
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path):
+        with patch.dict(CACHE_CONFIG, {'directorio': str(tmp_path / 'cache')}):
+            yield
+
+    def test_reutiliza_base_vigente(self, libro_sintetico, tmp_path):
+        """La segunda apertura no vuelve a escribir la base"""
+        # Arrange
+        ruta = abrir_base_sql(libro_sintetico, tmp_path / 'series.sqlite')
+
+        # Act
+        with patch.object(base_sql, 'guardar_base_sql') as guardar:
+            abrir_base_sql(libro_sintetico, ruta)
+
+        # Assert
+        guardar.assert_not_called()
+
+    def test_reconstruye_si_cambia_el_libro(self, libro_sintetico, tmp_path):
+        """Un libro modificado invalida la base"""
+        # Arrange
+        ruta = abrir_base_sql(libro_sintetico, tmp_path / 'series.sqlite')
+        estado = os.stat(libro_sintetico)
+        os.utime(libro_sintetico, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10**9))
+
+        # Act
+        with patch.object(base_sql, 'guardar_base_sql', wraps=guardar_base_sql) as guardar:
+            abrir_base_sql(libro_sintetico, ruta)
+
+        # Assert
+        guardar.assert_called_once()
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == '.sqlite'] == ['series.sqlite']
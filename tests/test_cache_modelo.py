@@ -0,0 +1,271 @@
+"""
+Tests para el módulo cache_modelo.py
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from src import cache_modelo
+from src.analizar_series import construir_modelo
+from openpyxl import load_workbook
+from src.analizar_series import CONTADOR_PARSEOS, reiniciar_contador_parseos
+from src.cache_modelo import (
+    construir_modelo_cacheado,
+    construir_modelo_incremental,
+    huella_libro,
+    huellas_hojas,
+    limpiar_cache,
+)
+from scripts.crear_datos_ejemplo import crear_libro_sintetico
+
+
+@pytest.fixture
+def libro_editable(tmp_path):
+    """Libro sintético guardado por openpyxl en modo normal, listo para editar una hoja"""
+    ruta = tmp_path / 'libro_editable.xlsx'
+    crear_libro_sintetico(ruta, n_hojas=3, n_columnas=8, n_filas=40)
+    libro = load_workbook(ruta)
+    libro.save(ruta)
+    return ruta
+
+
+def _editar_celda(ruta, hoja, celda, valor):
+    libro = load_workbook(ruta)
+    libro[hoja][celda] = valor
+    libro.save(ruta)
+
+
+class TestHuellaLibro:
+    """Tests para huella_libro"""
+
+    def test_huella_estable(self, libro_sintetico):
+        """La huella no cambia si el libro no cambia"""
+        assert huella_libro(libro_sintetico) == huella_libro(libro_sintetico)
+        assert huella_libro(libro_sintetico, True) == huella_libro(libro_sintetico, True)
+
+    def test_huella_incluye_version_parser(self, libro_sintetico):
+        """Cambiar la versión del parser invalida la huella"""
+        # Arrange
+        huella_original = huella_libro(libro_sintetico)
+
+        # Act
+        with patch.object(cache_modelo, 'VERSION_PARSER', 'otra'):
+            huella_nueva = huella_libro(libro_sintetico)
+
+        # Assert
+        assert huella_nueva != huella_original
+
+    def test_huella_incluye_opciones_de_ingesta(self, libro_editable):
+        """Las opciones de ingesta que cambian el modelo cambian ambas huellas"""
+        # Arrange
+        huella_original = huella_libro(libro_editable)
+        hojas_original = huellas_hojas(libro_editable)
+
+        # Act
+        with patch.dict(cache_modelo.INGESTA_CONFIG, {'recortar_por_metadatos': True}):
+            huella_nueva = huella_libro(libro_editable)
+            hojas_nueva = huellas_hojas(libro_editable)
+
+        # Assert
+        assert huella_nueva != huella_original
+        assert all(hojas_nueva[hoja] != hojas_original[hoja] for hoja in hojas_original)
+
+
+class TestConstruirModeloCacheado:
+    """Tests para construir_modelo_cacheado"""
+
+    def test_primera_llamada_igual_a_construir_modelo(self, libro_sintetico, tmp_path):
+        """Sin caché previa devuelve lo mismo que construir_modelo"""
+        # Act
+        metadatos, datos = construir_modelo_cacheado(libro_sintetico, tmp_path / 'cache')
+        metadatos_ref, datos_ref = construir_modelo(libro_sintetico)
+
+        # Assert
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+
+    def test_segunda_llamada_no_lee_excel(self, libro_sintetico, tmp_path):
+        """Con la caché válida no se vuelve a construir el modelo"""
+        # Arrange
+        metadatos_ref, datos_ref = construir_modelo_cacheado(libro_sintetico, tmp_path)
+
+        # Act
+        with patch.object(cache_modelo, 'construir_modelo') as construir:
+            metadatos, datos = construir_modelo_cacheado(libro_sintetico, tmp_path)
+
+        # Assert
+        construir.assert_not_called()
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+
+    def test_compacto_desde_cache(self, libro_sintetico, tmp_path):
+        """La caché guarda el modelo completo y compacto se aplica al devolverlo"""
+        # Arrange
+        metadatos_ref, datos_ref = construir_modelo_cacheado(libro_sintetico, tmp_path)
+
+        # Act
+        metadatos, datos = construir_modelo_cacheado(libro_sintetico, tmp_path, compacto=True)
+        metadatos_sin, datos_sin = construir_modelo_cacheado(libro_sintetico, tmp_path)
+
+        # Assert
+        assert isinstance(metadatos['categoria'].dtype, pd.CategoricalDtype)
+        assert isinstance(datos['id_serie'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(datos_sin, datos_ref)
+        pd.testing.assert_frame_equal(metadatos_sin, metadatos_ref)
+
+    def test_invalida_al_cambiar_el_libro(self, tmp_path):
+        """Si el libro cambia, la caché se reconstruye y se descartan los archivos viejos"""
+        # Arrange
+        ruta = tmp_path / 'libro.xlsx'
+        directorio_cache = tmp_path / 'cache'
+        crear_libro_sintetico(ruta, n_hojas=1, n_columnas=4, n_filas=20, semilla=1)
+        _, datos_viejos = construir_modelo_cacheado(ruta, directorio_cache)
+        archivos_viejos = set(os.listdir(directorio_cache))
+
+        # Act
+        crear_libro_sintetico(ruta, n_hojas=1, n_columnas=6, n_filas=30, semilla=2)
+        _, datos_nuevos = construir_modelo_cacheado(ruta, directorio_cache)
+
+        # Assert
+        pd.testing.assert_frame_equal(datos_nuevos, construir_modelo(ruta)[1])
+        assert len(datos_nuevos) != len(datos_viejos)
+        archivos_nuevos = set(os.listdir(directorio_cache))
+        assert len(archivos_nuevos) == len(archivos_viejos)
+        assert archivos_nuevos != archivos_viejos
+
+    def test_invalida_al_cambiar_el_recorte(self, libro_editable, tmp_path):
+        """Activar recortar_por_metadatos no devuelve el modelo sin recortar de la caché"""
+        # Arrange
+        _editar_celda(libro_editable, 'Hoja1', 'B6', datetime(1990, 4, 1))
+        _, sin_recorte = construir_modelo_cacheado(libro_editable, tmp_path / 'cache')
+
+        # Act
+        with patch.dict(cache_modelo.INGESTA_CONFIG, {'recortar_por_metadatos': True}):
+            _, recortado = construir_modelo_cacheado(libro_editable, tmp_path / 'cache')
+            _, esperado = construir_modelo(libro_editable)
+
+        # Assert
+        pd.testing.assert_frame_equal(recortado, esperado)
+        assert len(recortado) < len(sin_recorte)
+
+    def test_usar_cache_false_no_escribe(self, libro_sintetico, tmp_path):
+        """Con usar_cache=False no se crean archivos de caché"""
+        # Act
+        construir_modelo_cacheado(libro_sintetico, tmp_path / 'cache', usar_cache=False)
+
+        # Assert
+        assert not (tmp_path / 'cache').exists()
+
+    def test_respaldo_pickle_sin_pyarrow(self, libro_sintetico, tmp_path):
+        """Sin formato columnar disponible la caché usa pickle"""
+        # Act
+        with patch.object(cache_modelo, 'FORMATO_COLUMNAR', None):
+            construir_modelo_cacheado(libro_sintetico, tmp_path / 'cache')
+            metadatos, datos = construir_modelo_cacheado(libro_sintetico, tmp_path / 'cache')
+
+        # Assert
+        archivos = [nombre for _, _, nombres in os.walk(tmp_path / 'cache') for nombre in nombres]
+        assert archivos and all(nombre.endswith(('.pkl', '.json')) for nombre in archivos)
+        pd.testing.assert_frame_equal(datos, construir_modelo(libro_sintetico)[1])
+
+    def test_limpiar_cache(self, libro_sintetico, tmp_path):
+        """limpiar_cache elimina manifiesto y archivos del libro"""
+        # Arrange
+        construir_modelo_cacheado(libro_sintetico, tmp_path / 'cache')
+
+        # Act
+        limpiar_cache(libro_sintetico, tmp_path / 'cache', incluir_hojas=True)
+
+        # Assert
+        assert os.listdir(tmp_path / 'cache') == []
+
+
+class TestHuellasHojas:
+    """Tests para huellas_hojas"""
+
+    def test_una_huella_por_hoja(self, libro_editable):
+        """Devuelve una huella por cada hoja, en orden del libro"""
+        huellas = huellas_hojas(libro_editable)
+        assert list(huellas) == ['Hoja1', 'Hoja2', 'Hoja3']
+
+    def test_solo_cambia_la_hoja_editada(self, libro_editable):
+        """Editar un número en una hoja cambia únicamente su huella"""
+        # Arrange
+        antes = huellas_hojas(libro_editable)
+
+        # Act
+        _editar_celda(libro_editable, 'Hoja2', 'B10', 12345.5)
+        despues = huellas_hojas(libro_editable)
+
+        # Assert
+        assert [hoja for hoja in antes if antes[hoja] != despues[hoja]] == ['Hoja2']
+
+    def test_archivo_no_xlsx(self, tmp_path):
+        """Un archivo que no es XLSX no tiene huellas por hoja"""
+        ruta = tmp_path / 'texto.xlsx'
+        ruta.write_text('no es un zip')
+        assert huellas_hojas(ruta) is None
+
+
+class TestConstruirModeloIncremental:
+    """Tests para la reingesta incremental por hoja"""
+
+    def test_primera_vez_relee_todo(self, libro_editable, tmp_path):
+        """Sin manifiesto previo todas las hojas se leen y el modelo es el completo"""
+        # Act
+        metadatos, datos, reporte = construir_modelo_incremental(libro_editable, tmp_path / 'cache')
+
+        # Assert
+        metadatos_ref, datos_ref = construir_modelo(libro_editable)
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+        assert reporte == {'reutilizadas': [], 'reparseadas': ['Hoja1', 'Hoja2', 'Hoja3']}
+
+    def test_sin_cambios_no_lee_hojas(self, libro_editable, tmp_path):
+        """Si nada cambió se reutilizan todas las hojas sin decodificarlas"""
+        # Arrange
+        construir_modelo_incremental(libro_editable, tmp_path / 'cache')
+        reiniciar_contador_parseos()
+
+        # Act
+        metadatos, datos, reporte = construir_modelo_incremental(libro_editable, tmp_path / 'cache')
+
+        # Assert
+        assert sum(CONTADOR_PARSEOS.values()) == 0
+        assert reporte['reparseadas'] == []
+        pd.testing.assert_frame_equal(datos, construir_modelo(libro_editable)[1])
+
+    def test_relee_solo_la_hoja_modificada(self, libro_editable, tmp_path):
+        """Al editar una hoja solo esa se vuelve a leer y el resultado es correcto"""
+        # Arrange
+        construir_modelo_incremental(libro_editable, tmp_path / 'cache')
+        _editar_celda(libro_editable, 'Hoja2', 'C12', 999.25)
+        reiniciar_contador_parseos()
+
+        # Act
+        metadatos, datos, reporte = construir_modelo_incremental(libro_editable, tmp_path / 'cache')
+
+        # Assert
+        assert dict(CONTADOR_PARSEOS) == {'Hoja2': 1}
+        assert reporte == {'reutilizadas': ['Hoja1', 'Hoja3'], 'reparseadas': ['Hoja2']}
+        metadatos_ref, datos_ref = construir_modelo(libro_editable)
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+        assert 999.25 in datos['valor'].values
+
+    def test_cacheado_usa_reingesta_incremental(self, libro_editable, tmp_path, capsys):
+        """construir_modelo_cacheado informa las hojas reutilizadas al invalidarse"""
+        # Arrange
+        construir_modelo_cacheado(libro_editable, tmp_path / 'cache')
+        _editar_celda(libro_editable, 'Hoja3', 'B8', 1.5)
+
+        # Act
+        construir_modelo_cacheado(libro_editable, tmp_path / 'cache')
+
+        # Assert
+        salida = capsys.readouterr().out
+        assert 'Hojas reutilizadas desde caché: 2/3' in salida
+        assert 'Hoja3' in salida
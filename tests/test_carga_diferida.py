@@ -0,0 +1,162 @@
+"""
+Tests para el módulo carga_diferida.py
+"""
+
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from src import carga_diferida
+from src.analizar_series import CONTADOR_PARSEOS, construir_modelo, reiniciar_contador_parseos
+from src.cache_modelo import leer_datos_hoja
+from src.carga_diferida import SeriesDiferidas
+from src.config import CACHE_CONFIG, DATA_CONFIG
+from src.modelo import cargar_modelo_canonico
+
+
+def _serie_de_referencia(datos, id_serie):
+    serie = datos[datos['id_serie'] == id_serie]
+    return serie[['fecha', 'valor']].reset_index(drop=True)
+
+
+class TestSeriesDiferidas:
+    """Tests para la carga de series bajo demanda"""
+
+    def test_inicio_solo_con_catalogo(self, libro_sintetico, tmp_path):
+        """Al crear el acceso no se decodifica ninguna hoja completa"""
+        # Arrange
+        reiniciar_contador_parseos()
+
+        # Act
+        series = SeriesDiferidas(libro_sintetico, directorio_cache=tmp_path / 'cache')
+
+        # Assert
+        assert sum(CONTADOR_PARSEOS.values()) == 0
+        assert len(series.metadatos) == 36
+        assert len(series) == 0
+
+    def test_obtener_serie_igual_al_modelo(self, libro_sintetico, tmp_path):
+        """La serie cargada bajo demanda coincide con la de construir_modelo"""
+        # Arrange
+        _, datos_ref = construir_modelo(libro_sintetico)
+        series = SeriesDiferidas(libro_sintetico, directorio_cache=tmp_path / 'cache')
+        id_serie = series.metadatos['id_serie'].iloc[14]
+
+        # Act
+        serie = series.obtener_serie(id_serie)
+
+        # Assert
+        pd.testing.assert_frame_equal(serie, _serie_de_referencia(datos_ref, id_serie))
+
+    def test_obtener_datos_enriquecidos(self, libro_sintetico, tmp_path):
+        """obtener_datos devuelve el formato largo con tipo y categoría"""
+        # Arrange
+        series = SeriesDiferidas(libro_sintetico, directorio_cache=tmp_path / 'cache')
+        ids = list(series.metadatos['id_serie'].iloc[[0, 13, 30]])
+
+        # Act
+        datos = series.obtener_datos(ids)
+
+        # Assert
+        assert list(datos.columns) == ['id_serie', 'clave_serie', 'fecha', 'valor', 'tipo', 'categoria']
+        assert set(datos['id_serie']) == set(ids)
+        metadatos = series.metadatos.set_index('id_serie')
+        assert (datos['tipo'].to_numpy() == metadatos.loc[datos['id_serie'], 'tipo'].to_numpy()).all()
+
+    def test_lru_acotado(self, libro_sintetico, tmp_path):
+        """Nunca hay más de max_series series en memoria"""
+        # Arrange
+        series = SeriesDiferidas(libro_sintetico, max_series=5, directorio_cache=tmp_path / 'cache')
+        ids = list(series.metadatos['id_serie'].iloc[:8])
+
+        # Act
+        datos = series.obtener_datos(ids)
+
+        # Assert
+        assert set(datos['id_serie']) == set(ids)
+        assert len(series) <= 5
+        assert series.estadisticas['desalojos'] == 3
+        assert series.series_en_memoria() == ids[3:]
+
+    def test_acierto_no_vuelve_a_leer(self, libro_sintetico, tmp_path):
+        """Una serie ya cargada se sirve desde memoria"""
+        # Arrange
+        series = SeriesDiferidas(libro_sintetico, directorio_cache=tmp_path / 'cache')
+        id_serie = series.metadatos['id_serie'].iloc[0]
+        series.obtener_serie(id_serie)
+
+        # Act
+        with patch.object(carga_diferida, 'leer_datos_hoja') as lector:
+            series.obtener_serie(id_serie)
+
+        # Assert
+        lector.assert_not_called()
+        assert series.estadisticas == {'aciertos': 1, 'fallos': 1, 'desalojos': 0}
+
+    def test_serie_desconocida(self, libro_sintetico, tmp_path):
+        """Pedir un id_serie fuera del catálogo es un error"""
+        # Arrange
+        series = SeriesDiferidas(libro_sintetico, directorio_cache=tmp_path / 'cache')
+
+        # Act & Assert
+        with pytest.raises(KeyError):
+            series.obtener_serie('no_existe')
+
+    def test_cargar_todas_igual_al_modelo(self, libro_sintetico, tmp_path):
+        """cargar_todas trae los mismos valores que el modelo completo"""
+        # Arrange
+        _, datos_ref = construir_modelo(libro_sintetico)
+        series = SeriesDiferidas(libro_sintetico, max_series=2, directorio_cache=tmp_path / 'cache')
+
+        # Act
+        datos = series.cargar_todas()
+
+        # Assert
+        pd.testing.assert_frame_equal(
+            datos[['id_serie', 'fecha', 'valor']].reset_index(drop=True),
+            datos_ref[['id_serie', 'fecha', 'valor']].astype({'id_serie': datos['id_serie'].dtype})
+            .reset_index(drop=True),
+        )
+        assert len(series) == 0
+
+
+class TestLeerDatosHoja:
+    """Tests para la lectura de una hoja desde la caché por hoja"""
+
+    def test_segunda_lectura_desde_cache(self, libro_sintetico, tmp_path):
+        """La segunda lectura de una hoja no vuelve a decodificar el libro"""
+        # Arrange
+        cache = tmp_path / 'cache'
+        completa = leer_datos_hoja(libro_sintetico, 'Hoja2', directorio_cache=cache)
+        ids = list(completa['id_serie'].unique()[:2])
+        reiniciar_contador_parseos()
+
+        # Act
+        parcial = leer_datos_hoja(libro_sintetico, 'Hoja2', ids, directorio_cache=cache)
+
+        # Assert
+        assert sum(CONTADOR_PARSEOS.values()) == 0
+        pd.testing.assert_frame_equal(
+            parcial.reset_index(drop=True),
+            completa[completa['id_serie'].isin(ids)].reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    @patch.dict(DATA_CONFIG, {'validar_calidad': True})
+    def test_catalogo_sin_series_excluidas(self, libro_irregular, tmp_path):
+        """Con un modelo canónico validado en caché, el catálogo excluye las mismas series"""
+        # Arrange
+        directorio = tmp_path / 'cache'
+        sin_validar = SeriesDiferidas(libro_irregular, directorio_cache=directorio)
+        with patch.dict(CACHE_CONFIG, {'directorio': str(directorio)}):
+            metadatos, _ = cargar_modelo_canonico(libro_irregular)
+
+        # Act
+        series = SeriesDiferidas(libro_irregular, directorio_cache=directorio)
+
+        # Assert
+        ids = sin_validar.metadatos['id_serie']
+        excluida = ids[~ids.isin(metadatos['id_serie'])].iloc[0]
+        assert len(ids) == 36
+        assert series.metadatos['id_serie'].tolist() == metadatos['id_serie'].tolist()
+        with pytest.raises(KeyError):
+            series.obtener_serie(excluida)
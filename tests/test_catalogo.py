@@ -0,0 +1,148 @@
+"""
+Tests para el módulo catalogo.py
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.analizar_series import construir_modelo
+from src.catalogo import (
+    CLAVE_SIN_METADATOS,
+    asignar_claves,
+    construir_catalogo,
+    enriquecer_datos,
+    filtrar_por_claves,
+)
+
+
+class TestAsignarClaves:
+    """Tests para las claves enteras de series"""
+
+    def test_modelo_incluye_claves_densas(self, libro_sintetico):
+        """construir_modelo agrega clave_serie 0..n-1 en metadatos y datos"""
+        # Act
+        metadatos, datos = construir_modelo(libro_sintetico)
+
+        # Assert
+        assert metadatos['clave_serie'].dtype == np.int32
+        assert datos['clave_serie'].dtype == np.int32
+        assert metadatos['clave_serie'].tolist() == list(range(len(metadatos)))
+        esperado = metadatos.set_index('id_serie')['clave_serie']
+        assert (datos['clave_serie'] == datos['id_serie'].map(esperado)).all()
+
+    def test_series_sin_metadatos(self):
+        """Las filas de series sin metadatos reciben CLAVE_SIN_METADATOS"""
+        # Arrange
+        metadatos = pd.DataFrame({'id_serie': ['H__col1', 'H__col2']})
+        datos = pd.DataFrame({'id_serie': ['H__col2', 'H__col9', 'H__col1'], 'valor': [1.0, 2.0, 3.0]})
+
+        # Act
+        metadatos, datos = asignar_claves(metadatos, datos)
+
+        # Assert
+        assert datos['clave_serie'].tolist() == [1, CLAVE_SIN_METADATOS, 0]
+        assert list(datos.columns) == ['id_serie', 'clave_serie', 'valor']
+
+    def test_recalcula_claves_existentes(self, libro_sintetico):
+        """Volver a asignar claves sobre metadatos filtrados las renumera"""
+        # Arrange
+        metadatos, datos = construir_modelo(libro_sintetico)
+        metadatos = metadatos.iloc[::2]
+
+        # Act
+        metadatos, datos = asignar_claves(metadatos, datos)
+
+        # Assert
+        assert metadatos['clave_serie'].tolist() == list(range(len(metadatos)))
+        assert (datos['clave_serie'] == CLAVE_SIN_METADATOS).sum() > 0
+
+
+class TestCatalogo:
+    """Tests para el catálogo y las búsquedas por clave"""
+
+    def test_catalogo_por_clave(self, libro_sintetico):
+        """La fila i del catálogo describe la serie de clave i"""
+        # Arrange
+        metadatos, _ = construir_modelo(libro_sintetico)
+
+        # Act
+        catalogo = construir_catalogo(metadatos)
+
+        # Assert
+        assert list(catalogo.columns) == ['id_serie', 'hoja', 'columna', 'tipo', 'categoria', 'unidad']
+        assert catalogo['id_serie'].tolist() == metadatos['id_serie'].tolist()
+        fila = catalogo.loc[3]
+        assert fila['id_serie'] == f"{fila['hoja']}__col{fila['columna']}"
+
+    def test_catalogo_de_metadatos_filtrados(self, libro_sintetico):
+        """Con metadatos filtrados las claves ausentes quedan vacías"""
+        # Arrange
+        metadatos, _ = construir_modelo(libro_sintetico)
+
+        # Act
+        catalogo = construir_catalogo(metadatos.iloc[1::2])
+
+        # Assert
+        assert catalogo.index.tolist() == list(range(len(metadatos) - len(metadatos) % 2))
+        assert catalogo['tipo'].iloc[::2].isna().all()
+
+    def test_filtrar_igual_a_isin(self, libro_sintetico):
+        """Filtrar por claves equivale a filtrar por id_serie"""
+        # Arrange
+        metadatos, datos = construir_modelo(libro_sintetico)
+        seleccion = metadatos.iloc[[0, 4, 5]]
+
+        # Act
+        filtrado = filtrar_por_claves(datos, seleccion['clave_serie'])
+
+        # Assert
+        esperado = datos[datos['id_serie'].isin(seleccion['id_serie'])]
+        pd.testing.assert_frame_equal(filtrado, esperado)
+
+    def test_filtrar_descarta_series_sin_metadatos(self):
+        """Las filas con CLAVE_SIN_METADATOS nunca se seleccionan"""
+        # Arrange
+        datos = pd.DataFrame({'clave_serie': np.array([0, -1, 1], dtype=np.int32)})
+
+        # Act
+        filtrado = filtrar_por_claves(datos, [0, 1])
+
+        # Assert
+        assert filtrado['clave_serie'].tolist() == [0, 1]
+
+    def test_enriquecer_igual_a_map(self, libro_sintetico):
+        """Enriquecer por clave da lo mismo que mapear por id_serie"""
+        # Arrange
+        metadatos, datos = construir_modelo(libro_sintetico)
+
+        # Act
+        enriquecidos = enriquecer_datos(datos, construir_catalogo(metadatos))
+
+        # Assert
+        por_id = metadatos.set_index('id_serie')
+        for columna in ['tipo', 'categoria']:
+            esperado = datos['id_serie'].map(por_id[columna])
+            assert enriquecidos[columna].tolist() == esperado.tolist()
+        assert 'tipo' not in datos.columns
+
+    def test_enriquecer_conserva_categoricas(self, libro_sintetico):
+        """Con el modelo compacto las columnas agregadas siguen siendo categóricas"""
+        # Arrange
+        metadatos, datos = construir_modelo(libro_sintetico, compacto=True)
+
+        # Act
+        enriquecidos = enriquecer_datos(datos, construir_catalogo(metadatos))
+
+        # Assert
+        assert isinstance(enriquecidos['tipo'].dtype, pd.CategoricalDtype)
+
+    def test_enriquecer_rechaza_claves_fuera_del_catalogo(self):
+        """Claves inválidas producen un error claro"""
+        # Arrange
+        metadatos = pd.DataFrame({'id_serie': ['H__col1'], 'hoja': ['H'], 'tipo': ['A'],
+                                  'categoria': ['B'], 'unidad': ['u']})
+        metadatos, datos = asignar_claves(metadatos, pd.DataFrame({'id_serie': ['H__col1', 'H__col2']}))
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            enriquecer_datos(datos, construir_catalogo(metadatos))
@@ -74,6 +74,17 @@ class TestConfigConstants:
         assert isinstance(config.EXPORT_CONFIG['image_format'], str)
         assert isinstance(config.EXPORT_CONFIG['image_dpi'], int)
     
+    def test_ingesta_config_structure(self):
+        """Test que verifica la estructura de INGESTA_CONFIG"""
+        for key in ['celdas_por_bloque', 'workers', 'motor_excel', 'modelo_compacto', 'valor_float32',
+                    'recortar_por_metadatos']:
+            assert key in config.INGESTA_CONFIG
+        assert isinstance(config.INGESTA_CONFIG['celdas_por_bloque'], int)
+        assert config.INGESTA_CONFIG['celdas_por_bloque'] > 0
+        assert isinstance(config.INGESTA_CONFIG['workers'], int)
+        assert config.INGESTA_CONFIG['workers'] >= 1
+        assert config.INGESTA_CONFIG['motor_excel'] in ['auto', 'calamine', 'openpyxl']
+    
     def test_messages_structure(self):
         """Test que verifica la estructura de MESSAGES"""
         required_keys = ['loading', 'success', 'error', 'file_not_found', 
@@ -0,0 +1,159 @@
+"""
+Tests para el módulo consulta.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src.almacen_series import AlmacenSeries
+from src.analizar_series import construir_modelo
+from src.consulta import Consulta
+from src.modelo import preparar_modelo
+from src.reportes.utils_reportes import generar_estadisticas
+
+
+@pytest.fixture
+def modelo(libro_sintetico):
+    """Modelo canónico (enriquecido con tipo y categoría) del libro sintético"""
+    return preparar_modelo(*construir_modelo(libro_sintetico))
+
+
+@pytest.fixture
+def consulta(modelo):
+    """Consulta sobre el almacén del modelo"""
+    return Consulta(AlmacenSeries.desde_modelo(*modelo))
+
+
+class TestFiltrar:
+    """Tests para los filtros de la consulta"""
+
+    def test_filtros_combinados_igual_que_pandas(self, modelo, consulta):
+        """tipo, categoría y fechas dan las mismas filas que las máscaras sobre datos"""
+        # Arrange
+        metadatos, datos = modelo
+        tipos = list(metadatos['tipo'].unique()[:2])
+        inicio, fin = '1991-03-01', '1993-06-30'
+
+        # Act
+        resultado = consulta.filtrar(tipo=tipos, desde=inicio).filtrar(hasta=fin).seleccionar(
+            'id_serie', 'fecha', 'valor', 'tipo'
+        ).a_dataframe()
+
+        # Assert
+        esperado = datos[
+            datos['tipo'].isin(tipos) & (datos['fecha'] >= inicio) & (datos['fecha'] <= fin)
+        ][['id_serie', 'fecha', 'valor', 'tipo']].reset_index(drop=True)
+        pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False, check_categorical=False)
+
+    def test_filtros_sucesivos_se_intersecan(self, modelo, consulta):
+        """Dos filtros por series conservan solo las comunes"""
+        # Arrange
+        metadatos, _ = modelo
+        ids = list(metadatos['id_serie'])
+
+        # Act
+        claves = consulta.filtrar(series=ids[:5]).filtrar(series=ids[3:8]).claves()
+
+        # Assert
+        np.testing.assert_array_equal(claves, metadatos['clave_serie'].iloc[3:5])
+
+    def test_consulta_inmutable(self, consulta):
+        """filtrar devuelve una consulta nueva sin modificar la original"""
+        # Act
+        filtrada = consulta.filtrar(tipo='Social')
+
+        # Assert
+        assert consulta.claves() is None
+        assert filtrada.claves() is not None
+
+    def test_fechas_con_busqueda_binaria(self, consulta):
+        """El rango de fechas se resuelve en el almacén, sin máscaras sobre todas las filas"""
+        # Act
+        with patch.object(consulta.almacen, 'posiciones_en_rango',
+                          wraps=consulta.almacen.posiciones_en_rango) as posiciones:
+            consulta.filtrar(categoria='PIB', desde='1992-01-01').valores()
+
+        # Assert
+        posiciones.assert_called_once()
+
+    def test_columna_desconocida(self, consulta):
+        """seleccionar rechaza columnas que no existen"""
+        with pytest.raises(KeyError):
+            consulta.seleccionar('no_existe')
+
+
+class TestAgregar:
+    """Tests para las agregaciones"""
+
+    def test_agrupar_por_tipo(self, modelo, consulta):
+        """Las agregaciones por grupo coinciden con groupby sobre datos"""
+        # Arrange
+        _, datos = modelo
+        funciones = ['count', 'mean', 'std', 'min', 'max']
+
+        # Act
+        resultado = consulta.agrupar('tipo').agregar(*funciones)
+
+        # Assert
+        esperado = datos.groupby('tipo', observed=True)['valor'].agg(funciones)
+        pd.testing.assert_frame_equal(resultado, esperado, check_index_type=False, check_categorical=False)
+
+    def test_agregaciones_con_nombre(self, modelo, consulta):
+        """Las agregaciones con nombre usan las columnas indicadas"""
+        # Arrange
+        _, datos = modelo
+
+        # Act
+        resultado = consulta.agrupar('categoria').agregar(
+            series=('clave_serie', 'nunique'), registros=('valor', 'count')
+        )
+
+        # Assert
+        esperado = datos.groupby('categoria', observed=True).agg(
+            series=('clave_serie', 'nunique'), registros=('valor', 'count')
+        )
+        pd.testing.assert_frame_equal(resultado, esperado, check_index_type=False, check_categorical=False)
+
+    def test_frecuencia_mensual(self, modelo, consulta):
+        """agrupar con frecuencia trunca la fecha antes de agregar"""
+        # Arrange
+        _, datos = modelo
+
+        # Act
+        resultado = consulta.agrupar(frecuencia='M').agregar('mean')
+
+        # Assert
+        esperado = datos.groupby(datos['fecha'].dt.to_period('M'))['valor'].mean()
+        np.testing.assert_allclose(resultado.to_numpy(), esperado.to_numpy())
+        np.testing.assert_array_equal(resultado.index, esperado.index.to_timestamp())
+
+    def test_sin_grupos(self, modelo, consulta):
+        """Sin grupos se obtiene un escalar o una Series por agregación"""
+        # Arrange
+        _, datos = modelo
+
+        # Act
+        promedio = consulta.agregar('mean')
+        extremos = consulta.agregar(inicio=('fecha', 'min'), fin=('fecha', 'max'))
+
+        # Assert
+        assert promedio == pytest.approx(datos['valor'].mean())
+        assert extremos['inicio'] == datos['fecha'].min()
+        assert extremos['fin'] == datos['fecha'].max()
+
+    def test_estadisticas_de_reporte(self, modelo, consulta):
+        """generar_estadisticas con almacén da lo mismo que sobre el DataFrame"""
+        # Arrange
+        metadatos, datos = modelo
+
+        # Act
+        con_consulta = generar_estadisticas(datos, metadatos, consulta.almacen)
+        sin_consulta = generar_estadisticas(datos, metadatos)
+
+        # Assert
+        numericas = con_consulta.pop('estadisticas_numericas')
+        assert numericas == pytest.approx(sin_consulta.pop('estadisticas_numericas'))
+        con_consulta.pop('fecha_generacion')
+        sin_consulta.pop('fecha_generacion')
+        assert con_consulta == sin_consulta
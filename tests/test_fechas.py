@@ -0,0 +1,191 @@
+"""
+Tests para el módulo fechas.py
+"""
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from unittest.mock import patch
+from src import fechas
+from src.analizar_series import construir_modelo
+from src.fechas import UNIDAD_FECHAS, convertir_fechas, convertir_serial_excel, inferir_formato
+from src.lectura_streaming import construir_modelo_streaming
+
+
+def _fechas(*textos):
+    return np.array([np.datetime64(t, UNIDAD_FECHAS) if t else np.datetime64('NaT', UNIDAD_FECHAS) for t in textos])
+
+
+class TestConvertirSerialExcel:
+    """Tests para la conversión de números de serie de Excel"""
+
+    def test_seriales_conocidos(self):
+        """Los seriales coinciden con las fechas que muestra Excel"""
+        # Act
+        resultado = convertir_serial_excel([1, 59, 61, 43831, 43831.5])
+
+        # Assert
+        np.testing.assert_array_equal(resultado, _fechas(
+            '1900-01-01', '1900-02-28', '1900-03-01', '2020-01-01', '2020-01-01T12:00'
+        ))
+
+    def test_seriales_invalidos(self):
+        """El 29/02/1900 ficticio, los vacíos y los fuera de rango quedan en NaT"""
+        # Act
+        resultado = convertir_serial_excel([60, np.nan, 0, -5, 3e6])
+
+        # Assert
+        assert np.isnat(resultado).all()
+
+
+class TestInferirFormato:
+    """Tests para la inferencia del formato de fechas en texto"""
+
+    def test_dia_primero_por_evidencia(self):
+        """Un día mayor a 12 decide entre día/mes y mes/día"""
+        assert inferir_formato(['01/02/2020', '13/02/2020']) == '%d/%m/%Y'
+
+    def test_mes_primero_por_defecto(self):
+        """Sin evidencia se mantiene el criterio de pandas (mes primero)"""
+        assert inferir_formato(['01/02/2020', '03/04/2020']) == '%m/%d/%Y'
+
+    def test_sin_textos(self):
+        """Sin celdas de texto no hay formato"""
+        assert inferir_formato([dt.datetime(2020, 1, 1), 43831, None]) is None
+
+    def test_preferido_desempata(self):
+        """El formato preferido gana solo si reconoce tantos textos como el mejor"""
+        assert inferir_formato(['01/02/2020', '03/04/2020'], preferido='%d/%m/%Y') == '%d/%m/%Y'
+        assert inferir_formato(['01/02/2020', '13/02/2020'], preferido='%m/%d/%Y') == '%d/%m/%Y'
+        assert inferir_formato(['01/02/2020'], preferido='%Y-%m-%d') == '%m/%d/%Y'
+
+
+class TestConvertirFechas:
+    """Tests para la conversión de columnas y filas de celdas"""
+
+    def test_timestamps_tipados(self):
+        """Los timestamps ya tipados pasan sin cambios"""
+        # Arrange
+        valores = pd.Series([dt.datetime(2020, 1, 1), None, pd.Timestamp('2021-06-30')], dtype=object)
+
+        # Act
+        resultado = convertir_fechas(valores)
+
+        # Assert
+        np.testing.assert_array_equal(resultado, _fechas('2020-01-01', None, '2021-06-30'))
+        np.testing.assert_array_equal(
+            resultado, pd.to_datetime(valores, errors='coerce').to_numpy()
+        )
+
+    def test_columna_datetime64(self):
+        """Una columna datetime64 solo se lleva a la unidad común"""
+        # Arrange
+        valores = pd.Series(pd.date_range('2020-01-01', periods=3).as_unit('ns'))
+
+        # Act
+        resultado = convertir_fechas(valores)
+
+        # Assert
+        assert resultado.dtype == np.dtype(f'datetime64[{UNIDAD_FECHAS}]')
+        np.testing.assert_array_equal(resultado, valores.to_numpy())
+
+    def test_textos_infiere_formato_una_vez(self):
+        """El formato de una columna de textos se infiere una sola vez"""
+        # Arrange
+        valores = ['01/02/2020', '13/02/2020', 'sin fecha', None]
+
+        # Act
+        with patch.object(fechas, 'inferir_formato', wraps=inferir_formato) as inferencia:
+            resultado = convertir_fechas(valores)
+
+        # Assert
+        assert inferencia.call_count == 1
+        np.testing.assert_array_equal(resultado, _fechas('2020-02-01', '2020-02-13', None, None))
+
+    def test_formato_explicito(self):
+        """Con formato explícito no se infiere"""
+        # Act
+        with patch.object(fechas, 'inferir_formato') as inferencia:
+            resultado = convertir_fechas(['2020.01.05'], formato='%Y.%m.%d')
+
+        # Assert
+        inferencia.assert_not_called()
+        np.testing.assert_array_equal(resultado, _fechas('2020-01-05'))
+
+    def test_celdas_mezcladas(self):
+        """Textos, seriales y timestamps en la misma fila se convierten cada uno a su modo"""
+        # Arrange
+        valores = ['Fecha', 43831, dt.datetime(2021, 3, 1), '2020-05-01', np.nan, True]
+
+        # Act
+        resultado = convertir_fechas(valores)
+
+        # Assert
+        np.testing.assert_array_equal(
+            resultado, _fechas(None, '2020-01-01', '2021-03-01', '2020-05-01', None, None)
+        )
+
+
+def _crear_libro(ruta, fechas_datos, fecha_datos, inicio, fin):
+    """Libro de una serie con las fechas de datos escritas con fecha_datos"""
+    libro = Workbook()
+    hoja = libro.active
+    hoja.title = 'Hoja1'
+    hoja.append(['Fecha', 'Serie'])
+    hoja.append([None, inicio])
+    hoja.append([None, 'PIB'])
+    hoja.append([None, 'Economía'])
+    hoja.append([None, 'USD'])
+    hoja.append([None, fin])
+    for posicion, fecha in enumerate(fechas_datos):
+        hoja.append([fecha_datos(fecha), float(posicion)])
+    libro.save(ruta)
+    return ruta
+
+
+class TestFechasEnLibro:
+    """Tests de integración con construir_modelo"""
+
+    def test_seriales_y_textos_igual_que_tipadas(self, tmp_path):
+        """Un libro con fechas como seriales o texto da el mismo modelo que con fechas tipadas"""
+        # Arrange: las fechas del encabezado en texto son ambiguas (01/05/2020) y
+        # se resuelven con el formato de la columna de fechas (15/01/2020)
+        fechas_datos = pd.date_range('2020-01-01', periods=5, freq='MS') + pd.Timedelta(days=14)
+
+        tipado = _crear_libro(tmp_path / 'tipado.xlsx', fechas_datos, lambda f: f.to_pydatetime(),
+                              dt.datetime(2020, 1, 1), dt.datetime(2020, 5, 1))
+        serial = _crear_libro(tmp_path / 'serial.xlsx', fechas_datos,
+                              lambda f: (f - pd.Timestamp('1899-12-30')).days, 43831, 43952)
+        texto = _crear_libro(tmp_path / 'texto.xlsx', fechas_datos, lambda f: f.strftime('%d/%m/%Y'),
+                             '01/01/2020', '01/05/2020')
+
+        # Act
+        metadatos_ref, datos_ref = construir_modelo(tipado)
+        modelos = [construir_modelo(serial), construir_modelo(texto), construir_modelo_streaming(texto)]
+
+        # Assert
+        assert metadatos_ref['fecha_fin'].iloc[0] == pd.Timestamp('2020-05-01')
+        for metadatos, datos in modelos:
+            pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+            pd.testing.assert_frame_equal(datos, datos_ref)
+
+    def test_formatos_distintos_en_datos_y_encabezado(self, tmp_path):
+        """Fechas día/mes en la columna de datos e ISO en el encabezado se leen ambas"""
+        # Arrange
+        fechas_datos = pd.date_range('2020-01-01', periods=5, freq='MS') + pd.Timedelta(days=14)
+        tipado = _crear_libro(tmp_path / 'tipado.xlsx', fechas_datos, lambda f: f.to_pydatetime(),
+                              dt.datetime(2020, 1, 1), dt.datetime(2020, 5, 1))
+        texto = _crear_libro(tmp_path / 'texto.xlsx', fechas_datos, lambda f: f.strftime('%d/%m/%Y'),
+                             '2020-01-01', '2020-05-01')
+
+        # Act
+        metadatos_ref, datos_ref = construir_modelo(tipado)
+        modelos = [construir_modelo(texto), construir_modelo_streaming(texto)]
+
+        # Assert
+        for metadatos, datos in modelos:
+            assert metadatos[['fecha_inicio', 'fecha_fin']].notna().all().all()
+            pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+            pd.testing.assert_frame_equal(datos, datos_ref)
@@ -0,0 +1,116 @@
+"""
+Tests para el módulo ingesta_multiple.py
+"""
+
+import pytest
+import pandas as pd
+from src.analizar_series import construir_modelo
+from src.ingesta_multiple import (
+    SEPARADOR_ORIGEN,
+    cargar_modelo,
+    construir_modelo_multiple,
+    resolver_libros,
+)
+from scripts.crear_datos_ejemplo import crear_libro_sintetico
+
+
+@pytest.fixture
+def carpeta_libros(tmp_path):
+    """Carpeta con tres libros sintéticos distintos y un archivo ajeno"""
+    carpeta = tmp_path / 'mensual'
+    carpeta.mkdir()
+    for i, nombre in enumerate(['enero', 'febrero', 'marzo']):
+        crear_libro_sintetico(carpeta / f"{nombre}.xlsx", n_hojas=2, n_columnas=5, n_filas=24, semilla=i)
+    (carpeta / 'notas.txt').write_text('no es un libro')
+    (carpeta / '~$enero.xlsx').write_text('bloqueo de Excel')
+    return carpeta
+
+
+class TestResolverLibros:
+    """Tests para la resolución de los libros a ingerir"""
+
+    def test_directorio(self, carpeta_libros):
+        """Un directorio devuelve solo sus libros Excel, ordenados"""
+        # Act
+        libros = resolver_libros(carpeta_libros)
+
+        # Assert
+        assert [libro.name for libro in libros] == ['enero.xlsx', 'febrero.xlsx', 'marzo.xlsx']
+
+    def test_glob(self, carpeta_libros):
+        """Un patrón glob selecciona los libros que coinciden"""
+        # Act
+        libros = resolver_libros(str(carpeta_libros / '*o.xlsx'))
+
+        # Assert
+        assert [libro.name for libro in libros] == ['enero.xlsx', 'febrero.xlsx', 'marzo.xlsx']
+
+    def test_libro_suelto_y_sin_coincidencias(self, carpeta_libros):
+        """Un libro se devuelve tal cual y un patrón vacío no devuelve nada"""
+        # Act & Assert
+        assert resolver_libros(carpeta_libros / 'enero.xlsx') == [carpeta_libros / 'enero.xlsx']
+        assert resolver_libros(str(carpeta_libros / '*.xls')) == []
+
+
+class TestConstruirModeloMultiple:
+    """Tests para la unión de varios libros en un modelo"""
+
+    @pytest.mark.parametrize('workers', [1, 3])
+    def test_union_con_ids_por_origen(self, carpeta_libros, workers):
+        """Cada libro aporta sus series con el id prefijado por el archivo"""
+        # Act
+        metadatos, datos, reporte = construir_modelo_multiple(
+            carpeta_libros, workers=workers, usar_cache=False
+        )
+
+        # Assert
+        for nombre in ['enero', 'febrero', 'marzo']:
+            meta_ref, datos_ref = construir_modelo(carpeta_libros / f"{nombre}.xlsx")
+            meta = metadatos[metadatos['archivo'] == nombre]
+            assert meta['id_serie'].tolist() == [
+                nombre + SEPARADOR_ORIGEN + id_serie for id_serie in meta_ref['id_serie']
+            ]
+            filas = datos[datos['id_serie'].str.startswith(nombre + SEPARADOR_ORIGEN)]
+            pd.testing.assert_series_equal(
+                filas['valor'].reset_index(drop=True), datos_ref['valor'], check_names=False
+            )
+        assert metadatos['id_serie'].is_unique
+        assert metadatos['clave_serie'].tolist() == list(range(len(metadatos)))
+
+    def test_reporte_por_libro(self, carpeta_libros):
+        """El reporte tiene series, filas y tiempo de cada libro"""
+        # Act
+        metadatos, datos, reporte = construir_modelo_multiple(carpeta_libros, usar_cache=False)
+
+        # Assert
+        assert reporte['archivo'].tolist() == ['enero.xlsx', 'febrero.xlsx', 'marzo.xlsx']
+        assert reporte['series'].sum() == len(metadatos)
+        assert reporte['filas'].sum() == len(datos)
+        assert (reporte['segundos'] > 0).all()
+
+    def test_sin_libros(self, tmp_path):
+        """Un origen sin libros produce FileNotFoundError"""
+        # Act & Assert
+        with pytest.raises(FileNotFoundError):
+            construir_modelo_multiple(tmp_path)
+
+    def test_cargar_modelo_con_un_libro(self, carpeta_libros, tmp_path, monkeypatch):
+        """Con un único libro se mantienen los id_serie originales"""
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+
+        # Act
+        metadatos, _ = cargar_modelo(carpeta_libros / 'enero.xlsx', usar_cache=False)
+
+        # Assert
+        assert not metadatos['id_serie'].str.contains(SEPARADOR_ORIGEN, regex=False).any()
+        assert 'archivo' not in metadatos.columns
+
+    def test_cargar_modelo_con_carpeta_imprime_reporte(self, carpeta_libros, capsys):
+        """Con varios libros se imprime el reporte de ingesta"""
+        # Act
+        metadatos, datos = cargar_modelo(carpeta_libros, usar_cache=False, compacto=True)
+
+        # Assert
+        assert 'Libros ingeridos: 3' in capsys.readouterr().out
+        assert isinstance(metadatos['archivo'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,115 @@
+"""
+Tests para el módulo intercambio_arrow.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src import modelo
+from src.almacen_series import AlmacenSeries
+from src.analizar_series import construir_modelo
+from src.config import CACHE_CONFIG
+from src.intercambio_arrow import abrir_ipc, columna_numpy, guardar_ipc, leer_ipc
+from src.modelo import cargar_modelo_canonico, preparar_modelo
+
+
+@pytest.fixture
+def modelo_canonico(libro_sintetico):
+    """Modelo canónico del libro sintético"""
+    return preparar_modelo(*construir_modelo(libro_sintetico))
+
+
+class TestArchivosIpc:
+    """Tests para la escritura y lectura de archivos Arrow IPC"""
+
+    def test_ida_y_vuelta(self, modelo_canonico, tmp_path):
+        """Metadatos y datos se recuperan iguales, con sus tipos"""
+        # Arrange
+        metadatos, datos = modelo_canonico
+
+        # Act
+        guardar_ipc(metadatos, tmp_path / 'metadatos.arrow')
+        guardar_ipc(datos, tmp_path / 'datos.arrow')
+
+        # Assert
+        pd.testing.assert_frame_equal(leer_ipc(tmp_path / 'metadatos.arrow'), metadatos.reset_index(drop=True))
+        pd.testing.assert_frame_equal(leer_ipc(tmp_path / 'datos.arrow'), datos)
+
+    def test_columnas_sin_copia(self, modelo_canonico, tmp_path):
+        """Las columnas numéricas y de fechas son vistas del archivo mapeado"""
+        # Arrange
+        _, datos = modelo_canonico
+        guardar_ipc(datos, tmp_path / 'datos.arrow')
+
+        # Act
+        leidos = leer_ipc(tmp_path / 'datos.arrow', columnas=['clave_serie', 'fecha', 'valor'])
+
+        # Assert
+        for columna in leidos.columns:
+            arreglo = leidos[columna].to_numpy()
+            assert not arreglo.flags.owndata
+            assert not arreglo.flags.writeable
+
+    def test_columna_numpy(self, modelo_canonico, tmp_path):
+        """columna_numpy devuelve los valores de la columna sin convertir el resto"""
+        # Arrange
+        _, datos = modelo_canonico
+        guardar_ipc(datos, tmp_path / 'datos.arrow')
+
+        # Act
+        valores = columna_numpy(abrir_ipc(tmp_path / 'datos.arrow'), 'valor')
+
+        # Assert
+        np.testing.assert_array_equal(valores, datos['valor'].to_numpy())
+        assert not valores.flags.writeable
+
+
+class TestCacheArrow:
+    """Tests para la caché del modelo canónico en formato Arrow"""
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path):
+        with patch.dict(CACHE_CONFIG, {'directorio': str(tmp_path / 'cache'), 'formato_modelo': 'arrow'}):
+            yield tmp_path / 'cache'
+
+    def test_modelo_desde_archivo_mapeado(self, libro_sintetico, cache_temporal):
+        """La segunda carga mapea los archivos .arrow y da el mismo modelo"""
+        # Arrange
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico)
+
+        # Act
+        metadatos_cache, datos_cache = cargar_modelo_canonico(libro_sintetico)
+
+        # Assert
+        assert len(list(cache_temporal.glob('canonico_*_datos.arrow'))) == 1
+        pd.testing.assert_frame_equal(metadatos_cache, metadatos.reset_index(drop=True))
+        pd.testing.assert_frame_equal(datos_cache, datos)
+        assert not datos_cache['valor'].to_numpy().flags.owndata
+
+    def test_cambio_de_formato_reconstruye(self, libro_sintetico, cache_temporal):
+        """Una caché en otro formato no se reutiliza"""
+        # Arrange
+        with patch.dict(CACHE_CONFIG, {'formato_modelo': 'parquet'}):
+            cargar_modelo_canonico(libro_sintetico)
+
+        # Act
+        with patch.object(modelo, 'preparar_modelo', wraps=preparar_modelo) as preparar:
+            cargar_modelo_canonico(libro_sintetico)
+
+        # Assert
+        preparar.assert_called_once()
+        assert [p.suffix for p in cache_temporal.glob('canonico_*_datos.*')] == ['.arrow']
+
+    def test_almacen_sin_copia(self, libro_sintetico):
+        """El almacén armado con el modelo mapeado reutiliza sus columnas"""
+        # Arrange
+        cargar_modelo_canonico(libro_sintetico)
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico)
+
+        # Act
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Assert
+        assert np.shares_memory(almacen.valores, datos['valor'].to_numpy())
+        assert np.shares_memory(almacen.fechas, datos['fecha'].to_numpy())
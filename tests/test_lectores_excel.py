@@ -0,0 +1,111 @@
+"""
+Tests para el módulo lectores_excel.py
+"""
+
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from src.analizar_series import construir_modelo
+from src.lectores_excel import (
+    REGISTRO_MOTOR,
+    abrir_libro,
+    motores_disponibles,
+    seleccionar_motor,
+)
+
+
+class TestSeleccionarMotor:
+    """Tests para la resolución del motor de lectura"""
+
+    def test_auto_prefiere_el_primer_disponible(self):
+        """En modo 'auto' se elige el motor más rápido instalado"""
+        # Act
+        motor = seleccionar_motor('auto')
+
+        # Assert
+        assert motor == motores_disponibles()[0]
+
+    def test_auto_sin_calamine_usa_openpyxl(self):
+        """Si calamine no está instalado se vuelve a openpyxl"""
+        # Arrange
+        with patch('src.lectores_excel.motor_disponible', side_effect=lambda m: m == 'openpyxl'):
+            # Act
+            motor = seleccionar_motor('auto')
+
+        # Assert
+        assert motor == 'openpyxl'
+
+    def test_motor_no_disponible_vuelve_a_openpyxl(self):
+        """Un motor pedido pero no instalado se reemplaza por openpyxl"""
+        # Act
+        motor = seleccionar_motor('inexistente')
+
+        # Assert
+        assert motor == 'openpyxl'
+
+    def test_por_defecto_desde_config(self):
+        """Sin motor explícito se usa INGESTA_CONFIG['motor_excel']"""
+        # Arrange
+        with patch.dict('src.lectores_excel.INGESTA_CONFIG', {'motor_excel': 'openpyxl'}):
+            # Act
+            motor = seleccionar_motor()
+
+        # Assert
+        assert motor == 'openpyxl'
+
+
+class TestAbrirLibro:
+    """Tests para la apertura de libros con registro del motor usado"""
+
+    def test_registra_motor_usado(self, libro_sintetico):
+        """Cada apertura queda registrada con el motor efectivo"""
+        # Arrange
+        usos_previos = REGISTRO_MOTOR['usos']['openpyxl']
+
+        # Act
+        libro = abrir_libro(libro_sintetico, 'openpyxl')
+
+        # Assert
+        assert libro.engine == 'openpyxl'
+        assert REGISTRO_MOTOR['ultimo'] == 'openpyxl'
+        assert REGISTRO_MOTOR['usos']['openpyxl'] == usos_previos + 1
+
+    def test_construir_modelo_registra_motor(self, libro_sintetico):
+        """construir_modelo deja registrado el motor con el que leyó el libro"""
+        # Act
+        construir_modelo(libro_sintetico, motor='openpyxl')
+
+        # Assert
+        assert REGISTRO_MOTOR['ultimo'] == 'openpyxl'
+
+
+class TestEquivalenciaMotores:
+    """Tests que comparan la salida de los distintos motores"""
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_calamine_identico_a_openpyxl(self, libro_sintetico, workers):
+        """calamine y openpyxl producen exactamente los mismos metadatos y datos"""
+        # Arrange
+        pytest.importorskip('python_calamine')
+
+        # Act
+        metadatos_ref, datos_ref = construir_modelo(libro_sintetico, workers=workers, motor='openpyxl')
+        metadatos, datos = construir_modelo(libro_sintetico, workers=workers, motor='calamine')
+
+        # Assert
+        assert REGISTRO_MOTOR['ultimo'] == 'calamine'
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+
+    def test_calamine_identico_con_libro_de_ejemplo(self, temp_excel_file):
+        """La equivalencia se mantiene con el libro de ejemplo de los tests"""
+        # Arrange
+        pytest.importorskip('python_calamine')
+
+        # Act
+        metadatos_ref, datos_ref = construir_modelo(temp_excel_file, motor='openpyxl')
+        metadatos, datos = construir_modelo(temp_excel_file, motor='calamine')
+
+        # Assert
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
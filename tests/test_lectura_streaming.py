@@ -0,0 +1,136 @@
+"""
+Tests para el módulo lectura_streaming.py
+"""
+
+import pytest
+import pandas as pd
+from src.analizar_series import construir_modelo, CONTADOR_PARSEOS, reiniciar_contador_parseos
+from src.lectura_streaming import iterar_modelo, construir_modelo_streaming
+
+
+class TestIterarModelo:
+    """Tests para el generador de bloques en streaming"""
+
+    def test_bloques_de_datos_acotados(self, libro_sintetico):
+        """Ningún bloque de datos supera el límite de celdas configurado"""
+        # Arrange
+        celdas_por_bloque = 100
+
+        # Act
+        bloques = [
+            datos for _, _, datos in iterar_modelo(libro_sintetico, celdas_por_bloque)
+            if datos is not None
+        ]
+
+        # Assert
+        assert len(bloques) > 1
+        assert all(len(bloque) <= celdas_por_bloque for bloque in bloques)
+
+    def test_metadatos_al_cerrar_cada_hoja(self, libro_sintetico):
+        """Cada hoja emite un único bloque de metadatos, al final"""
+        # Act
+        bloques = list(iterar_modelo(libro_sintetico, 100))
+
+        # Assert
+        hojas_con_meta = [hoja for hoja, meta, datos in bloques if datos is None]
+        assert hojas_con_meta == pd.ExcelFile(libro_sintetico).sheet_names
+        for hoja, meta, datos in bloques:
+            assert (datos is None) == (len(meta) > 0)
+
+    def test_una_lectura_por_hoja(self, libro_sintetico):
+        """El streaming recorre cada hoja una sola vez"""
+        # Arrange
+        reiniciar_contador_parseos()
+
+        # Act
+        for _ in iterar_modelo(libro_sintetico, 100):
+            pass
+
+        # Assert
+        assert set(CONTADOR_PARSEOS.values()) == {1}
+
+
+class TestConstruirModeloStreaming:
+    """Tests de equivalencia entre el modo streaming y la lectura completa"""
+
+    @pytest.mark.parametrize('libro', ['libro_sintetico', 'libro_irregular'])
+    @pytest.mark.parametrize('celdas_por_bloque', [50, 1000, 1_000_000])
+    def test_equivalente_a_lectura_completa(self, libro, celdas_por_bloque, request):
+        """El modelo en streaming coincide con el de construir_modelo"""
+        # Arrange
+        ruta = request.getfixturevalue(libro)
+
+        # Act
+        metadatos_ref, datos_ref = construir_modelo(ruta)
+        metadatos, datos = construir_modelo_streaming(ruta, celdas_por_bloque)
+
+        # Assert
+        assert datos['id_serie'].dtype == datos_ref['id_serie'].dtype
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+
+    def test_bloques_sin_valores(self, tmp_path):
+        """Un bloque sin celdas válidas no cambia el tipo de id_serie respecto de la lectura completa"""
+        # Arrange
+        from openpyxl import Workbook
+        fechas = pd.date_range('2020-01-01', periods=12, freq='MS').to_pydatetime()
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(['Fecha', 'A', 'B'])
+        hoja.append([None, fechas[0], fechas[0]])
+        hoja.append([None, 'Económico', 'Social'])
+        hoja.append([None, 'PIB', 'Empleo'])
+        hoja.append([None, 'USD', '%'])
+        hoja.append([None, fechas[-1], fechas[-1]])
+        for i, fecha in enumerate(fechas):
+            valores = [None, None] if 4 <= i < 8 else [float(i), float(-i)]
+            hoja.append([fecha, *valores])
+        ruta = tmp_path / 'huecos.xlsx'
+        libro.save(ruta)
+
+        # Act
+        metadatos_ref, datos_ref = construir_modelo(ruta)
+        metadatos, datos = construir_modelo_streaming(ruta, celdas_por_bloque=6)
+
+        # Assert
+        assert datos['id_serie'].dtype == datos_ref['id_serie'].dtype
+        pd.testing.assert_frame_equal(metadatos, metadatos_ref)
+        pd.testing.assert_frame_equal(datos, datos_ref)
+
+    def test_switch_en_construir_modelo(self, libro_sintetico):
+        """construir_modelo(streaming=True) mantiene el contrato de retorno"""
+        # Act
+        metadatos, datos = construir_modelo(libro_sintetico, streaming=True)
+
+        # Assert
+        assert list(datos.columns) == ['id_serie', 'clave_serie', 'fecha', 'valor']
+        assert set(datos['id_serie']) <= set(metadatos['id_serie'])
+        assert datos.index.tolist() == list(range(len(datos)))
+
+    def test_recorte_por_metadatos_equivalente(self, tmp_path):
+        """Con recortar_por_metadatos el streaming recorta igual que la lectura completa"""
+        # Arrange
+        from unittest.mock import patch
+        from openpyxl import Workbook
+        fechas = pd.date_range('2020-01-01', periods=12, freq='MS').to_pydatetime()
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(['Fecha', 'A', 'B'])
+        hoja.append([None, fechas[2], fechas[0]])
+        hoja.append([None, 'Económico', 'Social'])
+        hoja.append([None, 'PIB', 'Empleo'])
+        hoja.append([None, 'USD', '%'])
+        hoja.append([None, fechas[8], None])
+        for i, fecha in enumerate(fechas):
+            hoja.append([fecha, float(i), float(-i)])
+        ruta = tmp_path / 'recorte.xlsx'
+        libro.save(ruta)
+
+        # Act
+        with patch.dict('src.analizar_series.INGESTA_CONFIG', {'recortar_por_metadatos': True}):
+            metadatos_ref, datos_ref = construir_modelo(ruta)
+            metadatos, datos = construir_modelo_streaming(ruta, celdas_por_bloque=4)
+
+        # Assert
+        pd.testing.assert_frame_equal(datos, datos_ref)
+        assert datos.groupby('id_serie').size().to_dict() == {'Sheet__col1': 7, 'Sheet__col2': 12}
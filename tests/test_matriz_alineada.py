@@ -0,0 +1,125 @@
+"""
+Tests para el módulo matriz_alineada.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src.almacen_series import AlmacenSeries
+from src.analizar_series import construir_modelo
+from src.matriz_alineada import MatrizAlineada
+from src.modelo import preparar_modelo
+
+
+@pytest.fixture
+def modelo(libro_sintetico):
+    """Modelo canónico del libro sintético"""
+    return preparar_modelo(*construir_modelo(libro_sintetico))
+
+
+@pytest.fixture
+def almacen(modelo):
+    """Almacén del modelo"""
+    return AlmacenSeries.desde_modelo(*modelo)
+
+
+class TestMatrizAlineada:
+    """Tests para la matriz fecha × serie"""
+
+    def test_igual_al_pivot_por_serie(self, modelo, almacen):
+        """Cada columna tiene los valores de su serie en las fechas del eje"""
+        # Arrange
+        _, datos = modelo
+
+        # Act
+        ancho = almacen.matriz().a_dataframe()
+
+        # Assert
+        esperado = datos.pivot(index='fecha', columns='id_serie', values='valor')
+        pd.testing.assert_frame_equal(ancho[esperado.columns], esperado, check_names=False)
+
+    def test_medias_por_tipo(self, modelo, almacen):
+        """medias_por equivale a pivot_table con aggfunc='mean'"""
+        # Arrange
+        _, datos = modelo
+
+        # Act
+        medias = almacen.matriz().medias_por('tipo')
+
+        # Assert
+        esperado = datos.pivot_table(index='fecha', columns='tipo', values='valor',
+                                     aggfunc='mean', observed=True)
+        assert list(medias.columns) == list(esperado.columns)
+        np.testing.assert_allclose(medias.to_numpy(), esperado.to_numpy())
+
+    def test_correlacion_en_rango(self, modelo, almacen):
+        """La correlación de un recorte coincide con la del DataFrame filtrado"""
+        # Arrange
+        _, datos = modelo
+        inicio, fin = '1991-03-01', '1993-06-30'
+
+        # Act
+        correlacion = almacen.matriz().recortar(inicio, fin).correlacion('categoria')
+
+        # Assert
+        filtrados = datos[(datos['fecha'] >= inicio) & (datos['fecha'] <= fin)]
+        esperado = filtrados.pivot_table(index='fecha', columns='categoria', values='valor',
+                                         aggfunc='mean', observed=True).corr()
+        np.testing.assert_allclose(correlacion.to_numpy(), esperado.to_numpy())
+
+    def test_recortar_sin_copiar(self, almacen):
+        """recortar devuelve vistas de la matriz original"""
+        # Arrange
+        matriz = almacen.matriz()
+
+        # Act
+        recorte = matriz.recortar('1992-01-01', '1992-12-31')
+
+        # Assert
+        assert np.shares_memory(recorte.valores, matriz.valores)
+        assert len(recorte.fechas) == 12
+
+    def test_se_arma_una_vez(self, almacen):
+        """El almacén reutiliza la matriz ya armada"""
+        assert almacen.matriz() is almacen.matriz()
+
+    def test_fechas_repetidas_se_promedian(self, modelo):
+        """Las observaciones de una serie en la misma fecha se promedian como en pivot_table"""
+        # Arrange
+        metadatos, datos = modelo
+        repetidas = datos.iloc[::7].assign(valor=lambda df: df['valor'] + 10.0)
+        datos = pd.concat([datos, repetidas], ignore_index=True)
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+
+        # Act
+        matriz = almacen.matriz()
+
+        # Assert
+        esperado = datos.pivot_table(index='fecha', columns='id_serie', values='valor', aggfunc='mean')
+        ancho = matriz.a_dataframe()
+        pd.testing.assert_frame_equal(ancho[esperado.columns], esperado, check_names=False)
+        medias = datos.pivot_table(index='fecha', columns='tipo', values='valor',
+                                   aggfunc='mean', observed=True)
+        np.testing.assert_allclose(matriz.medias_por('tipo').to_numpy(), medias.to_numpy())
+        np.testing.assert_allclose(
+            matriz.recortar('1991-03-01', '1993-06-30').correlacion('tipo').to_numpy(),
+            medias.loc['1991-03-01':'1993-06-30'].corr().to_numpy()
+        )
+
+    def test_matriz_compartida_en_disco(self, almacen, tmp_path):
+        """La matriz de un almacén abierto desde disco se guarda una vez y los demás la mapean"""
+        # Arrange
+        almacen.guardar(tmp_path / 'almacen')
+        primera = AlmacenSeries.abrir(tmp_path / 'almacen').matriz()
+
+        # Act
+        with patch.object(MatrizAlineada, 'desde_almacen') as armar:
+            segunda = AlmacenSeries.abrir(tmp_path / 'almacen').matriz()
+
+        # Assert
+        armar.assert_not_called()
+        assert (tmp_path / 'almacen' / 'matriz' / 'valores.npy').exists()
+        assert not segunda.valores.flags.writeable
+        np.testing.assert_array_equal(segunda.valores, almacen.matriz().valores)
+        np.testing.assert_array_equal(segunda.fechas, primera.fechas)
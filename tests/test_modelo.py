@@ -0,0 +1,150 @@
+"""
+Tests para el módulo modelo.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src import modelo
+from src.analizar_series import construir_modelo
+from src.catalogo import construir_catalogo, enriquecer_datos, filtrar_por_claves
+from src.config import CACHE_CONFIG, DATA_CONFIG
+from src.modelo import cargar_modelo_canonico, preparar_modelo
+from src.utils import limpiar_dataframe
+from src.validacion import reporte_calidad
+
+
+@pytest.fixture
+def cache_temporal(tmp_path):
+    """Dirige la caché del modelo crudo y del canónico a un directorio temporal"""
+    directorio = tmp_path / 'cache'
+    with patch.dict(CACHE_CONFIG, {'directorio': str(directorio)}):
+        yield directorio
+
+
+class TestPrepararModelo:
+    """Tests para preparar_modelo"""
+
+    def test_igual_a_la_secuencia_anterior(self, libro_sintetico):
+        """Da lo mismo que limpiar, descartar series sin tipo, filtrar y enriquecer por separado"""
+        # Arrange
+        metadatos, datos = construir_modelo(libro_sintetico)
+        metadatos.loc[[2, 5], 'tipo'] = np.nan
+        datos.loc[[0, 7], 'valor'] = np.nan
+        datos.loc[3, 'clave_serie'] = -1
+
+        # Act
+        metadatos_finales, datos_finales = preparar_modelo(metadatos, datos)
+
+        # Assert
+        esperados_meta = metadatos.dropna(subset=['tipo', 'categoria'])
+        esperados = filtrar_por_claves(limpiar_dataframe(datos), esperados_meta['clave_serie'])
+        esperados = enriquecer_datos(esperados, construir_catalogo(esperados_meta)).reset_index(drop=True)
+        pd.testing.assert_frame_equal(metadatos_finales, esperados_meta)
+        pd.testing.assert_frame_equal(datos_finales, esperados, check_categorical=False, check_dtype=False)
+
+    def test_columnas_enriquecidas_categoricas(self, libro_sintetico):
+        """tipo y categoria se agregan como categóricas"""
+        # Arrange
+        metadatos, datos = construir_modelo(libro_sintetico)
+
+        # Act
+        _, datos_finales = preparar_modelo(metadatos, datos)
+
+        # Assert
+        for columna in ('tipo', 'categoria'):
+            assert isinstance(datos_finales[columna].dtype, pd.CategoricalDtype)
+            assert datos_finales[columna].notna().all()
+
+
+class TestCargarModeloCanonico:
+    """Tests para la caché del modelo canónico"""
+
+    def test_segunda_carga_desde_cache(self, libro_sintetico, cache_temporal):
+        """La segunda carga lee el modelo ya preparado, sin volver a construirlo"""
+        # Arrange
+        primero = cargar_modelo_canonico(libro_sintetico)
+
+        # Act
+        with patch.object(modelo, 'preparar_modelo') as preparar, \
+             patch.object(modelo, 'cargar_modelo') as cargar:
+            segundo = cargar_modelo_canonico(libro_sintetico)
+
+        # Assert
+        preparar.assert_not_called()
+        cargar.assert_not_called()
+        pd.testing.assert_frame_equal(segundo[0], primero[0])
+        pd.testing.assert_frame_equal(segundo[1], primero[1])
+
+    def test_reconstruye_si_cambia_el_libro(self, libro_sintetico, cache_temporal):
+        """Un libro modificado invalida la caché y se descartan los archivos anteriores"""
+        # Arrange
+        cargar_modelo_canonico(libro_sintetico)
+        estado = os.stat(libro_sintetico)
+        os.utime(libro_sintetico, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10**9))
+
+        # Act
+        with patch.object(modelo, 'preparar_modelo', wraps=preparar_modelo) as preparar:
+            cargar_modelo_canonico(libro_sintetico)
+
+        # Assert
+        preparar.assert_called_once()
+        assert len(list(cache_temporal.glob('canonico_*_datos.*'))) == 1
+
+    def test_reconstruye_si_cambia_la_validacion(self, libro_irregular, cache_temporal):
+        """Activar la validación o cambiar el umbral no devuelve el modelo anterior de la caché"""
+        # Arrange
+        with patch.dict(DATA_CONFIG, {'validar_calidad': False}):
+            sin_validar, _ = cargar_modelo_canonico(libro_irregular)
+
+        # Act
+        with patch.dict(DATA_CONFIG, {'validar_calidad': True, 'missing_value_threshold': 0.1}):
+            validado, _ = cargar_modelo_canonico(libro_irregular)
+        with patch.dict(DATA_CONFIG, {'validar_calidad': True, 'missing_value_threshold': 0.5}):
+            tolerante, _ = cargar_modelo_canonico(libro_irregular)
+
+        # Assert
+        with patch.dict(DATA_CONFIG, {'validar_calidad': True, 'missing_value_threshold': 0.1}):
+            esperado, _ = cargar_modelo_canonico(libro_irregular, usar_cache=False)
+        pd.testing.assert_frame_equal(validado, esperado)
+        assert len(validado) < len(tolerante) == len(sin_validar)
+
+    def test_calidad_no_queda_de_otra_carga(self, libro_irregular, cache_temporal):
+        """Un modelo leído de la caché sin validar no deja la tabla de calidad anterior"""
+        # Arrange
+        with patch.dict(DATA_CONFIG, {'validar_calidad': False}):
+            cargar_modelo_canonico(libro_irregular)
+        with patch.dict(DATA_CONFIG, {'validar_calidad': True}):
+            cargar_modelo_canonico(libro_irregular)
+        assert len(reporte_calidad()) > 0
+
+        # Act
+        with patch.dict(DATA_CONFIG, {'validar_calidad': False}):
+            cargar_modelo_canonico(libro_irregular)
+
+        # Assert
+        assert reporte_calidad().empty
+
+    def test_sin_cache_no_escribe(self, libro_sintetico, cache_temporal):
+        """Con usar_cache=False no se escribe ninguna caché"""
+        # Act
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico, usar_cache=False)
+
+        # Assert
+        assert not cache_temporal.exists()
+        assert {'tipo', 'categoria'} <= set(datos.columns)
+
+    def test_compacto(self, libro_sintetico, cache_temporal):
+        """La opción compacto se aplica también al modelo leído de la caché"""
+        # Arrange
+        cargar_modelo_canonico(libro_sintetico)
+
+        # Act
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico, compacto=True)
+
+        # Assert
+        assert isinstance(datos['id_serie'].dtype, pd.CategoricalDtype)
+        assert isinstance(metadatos['tipo'].dtype, pd.CategoricalDtype)
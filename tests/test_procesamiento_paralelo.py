@@ -0,0 +1,181 @@
+"""
+Tests para el módulo procesamiento_paralelo.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src.agregacion import AgregadoEstadisticas
+from src.analizar_series import construir_modelo
+from src.config import CACHE_CONFIG
+from src.modelo import cargar_modelo_canonico, preparar_modelo
+from src.procesamiento_paralelo import (
+    agregar_fragmento,
+    combinar_agregados,
+    ejecutar_por_fragmentos,
+    ejecutar_sobre_cache,
+    estadisticas_en_paralelo,
+    fragmentar,
+    resumir_series,
+)
+from src.reportes.utils_reportes import generar_estadisticas
+from src.validacion import aplicar_validacion
+from tests.test_agregacion import comparar_estadisticas
+
+
+@pytest.fixture
+def modelo(libro_sintetico):
+    """Modelo canónico del libro sintético"""
+    return preparar_modelo(*construir_modelo(libro_sintetico))
+
+
+def contar_filas(metadatos, datos):
+    """Función de prueba: series y filas de un fragmento"""
+    return len(metadatos), len(datos), datos['clave_serie'].nunique()
+
+
+class TestFragmentar:
+    """Tests para la división en fragmentos por clave"""
+
+    def test_cortes_entre_series(self):
+        """Ningún corte parte una serie y los rangos cubren todas las filas"""
+        # Arrange
+        claves = np.repeat(np.arange(10), [5, 1, 30, 2, 2, 8, 1, 1, 20, 4])
+
+        # Act
+        rangos = fragmentar(claves, 4)
+
+        # Assert
+        assert rangos[0][0] == 0 and rangos[-1][1] == len(claves)
+        assert all(fin == inicio for (_, fin), (inicio, _) in zip(rangos[:-1], rangos[1:]))
+        assert all(claves[inicio - 1] != claves[inicio] for inicio, _ in rangos[1:])
+
+    def test_menos_series_que_fragmentos(self):
+        """Con menos series que fragmentos pedidos no hay rangos vacíos"""
+        # Act
+        rangos = fragmentar(np.array([3, 3, 3, 7]), 8)
+
+        # Assert
+        assert rangos == [(0, 3), (3, 4)]
+
+
+class TestEjecutarPorFragmentos:
+    """Tests para el scatter-gather en procesos worker"""
+
+    def test_estadisticas_iguales_a_generar_estadisticas(self, modelo):
+        """Las estadísticas juntadas de los workers coinciden con las de un solo proceso"""
+        # Arrange
+        metadatos, datos = modelo
+
+        # Act
+        resultado = estadisticas_en_paralelo(metadatos, datos, workers=3)
+
+        # Assert
+        comparar_estadisticas(resultado, generar_estadisticas(datos, metadatos))
+
+    def test_cada_serie_en_un_fragmento(self, modelo):
+        """Cada serie y sus filas quedan en exactamente un fragmento"""
+        # Arrange
+        metadatos, datos = modelo
+
+        # Act
+        parciales = ejecutar_por_fragmentos(contar_filas, metadatos, datos, workers=3, columnas=['valor'])
+
+        # Assert
+        assert len(parciales) == 3
+        assert sum(series for series, _, _ in parciales) == len(metadatos)
+        assert sum(filas for _, filas, _ in parciales) == len(datos)
+        assert sum(claves for _, _, claves in parciales) == datos['clave_serie'].nunique()
+
+    def test_datos_desordenados(self, modelo):
+        """Si datos no está ordenado por clave, se ordena antes de fragmentar"""
+        # Arrange
+        metadatos, datos = modelo
+        mezclados = datos.sample(frac=1, random_state=0)
+
+        # Act
+        agregado = ejecutar_por_fragmentos(agregar_fragmento, metadatos, mezclados, combinar_agregados, workers=2)
+
+        # Assert
+        assert isinstance(agregado, AgregadoEstadisticas)
+        comparar_estadisticas(agregado.estadisticas(metadatos), generar_estadisticas(datos, metadatos))
+
+    def test_resumen_por_serie(self, modelo):
+        """El resumen por serie no depende de la cantidad de workers y coincide con groupby"""
+        # Arrange
+        metadatos, datos = modelo
+        esperado = datos.groupby('id_serie')['valor'].agg(['count', 'mean', 'std', 'min', 'max'])
+
+        # Act
+        secuencial = resumir_series(metadatos, datos, workers=1)
+        paralelo = resumir_series(metadatos, datos, workers=3)
+
+        # Assert
+        pd.testing.assert_frame_equal(paralelo, secuencial)
+        esperado = esperado.reindex(secuencial.index)
+        assert (secuencial['cantidad'] == esperado['count']).all()
+        np.testing.assert_allclose(secuencial['promedio'], esperado['mean'])
+        np.testing.assert_allclose(secuencial['desviacion'], esperado['std'])
+        assert (secuencial['fecha_min'] == datos.groupby('id_serie')['fecha'].min().reindex(secuencial.index)).all()
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_metadatos_con_parte_de_las_series(self, modelo, workers):
+        """Las filas de series que no están en metadatos no se cuentan"""
+        # Arrange
+        metadatos, datos = modelo
+        parciales = metadatos.iloc[::2]
+        incluidas = datos[datos['clave_serie'].isin(parciales['clave_serie'])]
+
+        # Act
+        resumen = resumir_series(parciales, datos, workers=workers)
+        estadisticas = estadisticas_en_paralelo(parciales, datos, workers=workers)
+
+        # Assert
+        assert resumen.index.tolist() == parciales['id_serie'].tolist()
+        assert resumen['cantidad'].sum() == len(incluidas)
+        comparar_estadisticas(estadisticas, generar_estadisticas(incluidas, parciales))
+
+    def test_modelo_validado(self, libro_irregular):
+        """El resultado de aplicar_validacion (que solo filtra metadatos) se resume sin errores"""
+        # Arrange
+        metadatos, datos, calidad = aplicar_validacion(*construir_modelo(libro_irregular))
+
+        # Act
+        secuencial = resumir_series(metadatos, datos, workers=1)
+        paralelo = resumir_series(metadatos, datos, workers=2)
+
+        # Assert
+        assert calidad['excluida'].any()
+        pd.testing.assert_frame_equal(paralelo, secuencial)
+        assert secuencial.index.tolist() == metadatos['id_serie'].tolist()
+
+
+class TestEjecutarSobreCache:
+    """Tests para el reparto sobre la caché del modelo canónico"""
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path):
+        with patch.dict(CACHE_CONFIG, {'directorio': str(tmp_path / 'cache'), 'formato_modelo': 'arrow'}):
+            yield tmp_path / 'cache'
+
+    def test_workers_mapean_la_cache(self, libro_sintetico):
+        """Los workers leen el archivo Arrow de la caché y se obtiene lo mismo que en memoria"""
+        # Arrange
+        metadatos, datos = cargar_modelo_canonico(libro_sintetico)
+
+        # Act
+        with patch('src.procesamiento_paralelo.guardar_ipc') as guardar:
+            agregado = ejecutar_sobre_cache(
+                agregar_fragmento, libro_sintetico, combinar_agregados, workers=2,
+                columnas=['fecha', 'valor', 'tipo', 'categoria']
+            )
+
+        # Assert
+        guardar.assert_not_called()
+        comparar_estadisticas(agregado.estadisticas(metadatos), generar_estadisticas(datos, metadatos))
+
+    def test_sin_cache(self, libro_sintetico):
+        """Sin un modelo canónico vigente en caché no se lee el libro"""
+        with pytest.raises(FileNotFoundError):
+            ejecutar_sobre_cache(contar_filas, libro_sintetico)
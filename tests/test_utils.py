@@ -5,7 +5,7 @@ Tests para el módulo utils.py
 import pytest
 import pandas as pd
 import numpy as np
-from src.utils import limpiar_dataframe
+from src.utils import limpiar_dataframe, compactar_modelo, reporte_memoria
 
 
 class TestLimpiarDataframe:
@@ -154,4 +154,68 @@ class TestLimpiarDataframe:
         assert isinstance(df_limpio, pd.DataFrame)
         # Debe eliminar filas con None en columnas clave
         assert df_limpio['id_serie'].notna().all()
-        assert df_limpio['fecha'].notna().all() 
\ No newline at end of file
+        assert df_limpio['fecha'].notna().all() 
+
+class TestCompactarModelo:
+    """Tests para el modelo con tipos compactos"""
+
+    def test_tipos_compactos(self, libro_sintetico):
+        """Las columnas de texto pasan a categóricas y las fechas a datetime64"""
+        # Arrange
+        from src.analizar_series import construir_modelo
+        metadatos, datos = construir_modelo(libro_sintetico, compacto=False)
+
+        # Act
+        metadatos_c, datos_c = compactar_modelo(metadatos, datos, valor_float32=True)
+
+        # Assert
+        for columna in ['id_serie', 'hoja', 'tipo', 'categoria', 'unidad']:
+            assert isinstance(metadatos_c[columna].dtype, pd.CategoricalDtype)
+        assert isinstance(datos_c['id_serie'].dtype, pd.CategoricalDtype)
+        assert datos_c['id_serie'].cat.categories.equals(metadatos_c['id_serie'].cat.categories)
+        assert pd.api.types.is_datetime64_dtype(datos_c['fecha'])
+        assert not datos_c['fecha'].isna().any()
+        assert datos_c['valor'].dtype == np.float32
+
+    def test_mismos_valores(self, libro_sintetico):
+        """El modelo compacto conserva exactamente los mismos valores"""
+        # Arrange
+        from src.analizar_series import construir_modelo
+        metadatos, datos = construir_modelo(libro_sintetico, compacto=False)
+
+        # Act
+        metadatos_c, datos_c = construir_modelo(libro_sintetico, compacto=True)
+
+        # Assert
+        pd.testing.assert_frame_equal(metadatos_c.astype(metadatos.dtypes.to_dict()), metadatos)
+        pd.testing.assert_frame_equal(datos_c.astype(datos.dtypes.to_dict()), datos)
+
+    def test_se_preserva_al_limpiar_y_enriquecer(self, libro_sintetico):
+        """limpiar_dataframe y el enriquecimiento por id_serie mantienen las categóricas"""
+        # Arrange
+        from src.analizar_series import construir_modelo
+        metadatos, datos = construir_modelo(libro_sintetico, compacto=True)
+
+        # Act
+        from src.catalogo import construir_catalogo, enriquecer_datos
+        datos = limpiar_dataframe(datos)
+        datos = enriquecer_datos(datos, construir_catalogo(metadatos))
+
+        # Assert
+        assert isinstance(datos['id_serie'].dtype, pd.CategoricalDtype)
+        assert isinstance(datos['tipo'].dtype, pd.CategoricalDtype)
+
+    def test_reporte_memoria_muestra_reduccion(self, libro_sintetico):
+        """El reporte de memoria compara bytes por columna antes y después"""
+        # Arrange
+        from src.analizar_series import construir_modelo
+        metadatos, datos = construir_modelo(libro_sintetico, compacto=False)
+        _, datos_c = compactar_modelo(metadatos, datos)
+
+        # Act
+        reporte = reporte_memoria(datos, datos_c)
+
+        # Assert
+        assert list(reporte.index) == ['id_serie', 'clave_serie', 'fecha', 'valor', 'total']
+        assert reporte.loc['id_serie', 'bytes_despues'] < reporte.loc['id_serie', 'bytes_antes']
+        assert reporte.loc['total', 'reduccion_pct'] > 0
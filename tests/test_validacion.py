@@ -0,0 +1,156 @@
+"""
+Tests para el módulo validacion.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src import validacion
+from src.analizar_series import construir_modelo
+from src.catalogo import asignar_claves
+from src.config import CACHE_CONFIG
+from src.modelo import cargar_modelo_canonico
+from src.validacion import reporte_calidad, validar_modelo
+
+FECHAS = pd.date_range('2020-01-01', periods=20, freq='MS')
+
+
+def modelo_manual(series):
+    """
+    Arma (metadatos, datos) con una hoja y una serie por entrada.
+
+    Args:
+        series: {nombre: (posiciones en FECHAS, fecha_inicio, fecha_fin)}
+    """
+    filas_meta, bloques = [], []
+    for nombre, (posiciones, inicio, fin) in series.items():
+        filas_meta.append({'id_serie': nombre, 'hoja': 'Hoja1', 'tipo': 'T', 'categoria': 'C',
+                           'unidad': 'u', 'fecha_inicio': pd.Timestamp(inicio) if inicio else pd.NaT,
+                           'fecha_fin': pd.Timestamp(fin) if fin else pd.NaT})
+        bloques.append(pd.DataFrame({'id_serie': nombre, 'fecha': FECHAS[posiciones],
+                                     'valor': np.arange(len(posiciones), dtype=float)}))
+    return asignar_claves(pd.DataFrame(filas_meta), pd.concat(bloques, ignore_index=True))
+
+
+class TestValidarModelo:
+    """Tests para la tabla de calidad"""
+
+    def test_faltantes_en_el_periodo_propio(self):
+        """La proporción de faltantes se mide dentro del período de cada serie"""
+        # Arrange
+        metadatos, datos = modelo_manual({
+            'completa': (list(range(20)), '2020-01-01', '2021-08-01'),
+            'corta':    (list(range(5)), '2020-01-01', '2020-05-01'),
+            'con_huecos': ([0, 1, 2, 10, 11, 19], '2020-01-01', '2021-08-01'),
+        })
+
+        # Act
+        calidad = validar_modelo(metadatos, datos, umbral=0.1).set_index('id_serie')
+
+        # Assert
+        assert calidad.loc['completa', 'proporcion_faltantes'] == 0
+        assert calidad.loc['corta', 'proporcion_faltantes'] == 0
+        assert calidad.loc['con_huecos', 'proporcion_faltantes'] == pytest.approx(14 / 20)
+        assert list(calidad['excluida']) == [False, False, True]
+
+    def test_fechas_desordenadas_y_duplicadas(self):
+        """Cuenta retrocesos de fecha en el orden de la hoja y fechas repetidas"""
+        # Arrange
+        metadatos, datos = modelo_manual({
+            'ordenada':    (list(range(6)), '2020-01-01', '2020-06-01'),
+            'desordenada': ([0, 1, 3, 2, 4, 5], '2020-01-01', '2020-06-01'),
+            'duplicada':   ([0, 1, 1, 2, 3, 4, 5], '2020-01-01', '2020-06-01'),
+        })
+
+        # Act
+        calidad = validar_modelo(metadatos, datos).set_index('id_serie')
+
+        # Assert
+        assert list(calidad['fechas_desordenadas']) == [0, 1, 0]
+        assert list(calidad['fechas_duplicadas']) == [0, 0, 1]
+        assert not calidad['excluida'].any()
+
+    def test_encabezado_invalido(self):
+        """Sin fechas válidas en el encabezado se usa el período observado"""
+        # Arrange
+        metadatos, datos = modelo_manual({
+            'sin_inicio': (list(range(4, 10)), None, '2020-10-01'),
+            'invertida':  (list(range(6)), '2020-06-01', '2020-01-01'),
+            'fuera':      (list(range(8)), '2020-01-01', '2020-06-01'),
+        })
+
+        # Act
+        calidad = validar_modelo(metadatos, datos).set_index('id_serie')
+
+        # Assert
+        assert list(calidad['encabezado_valido']) == [False, False, True]
+        assert list(calidad['proporcion_faltantes']) == [0, 0, 0]
+        assert list(calidad['fuera_de_rango']) == [0, 0, 2]
+
+    def test_igual_en_el_libro_sintetico(self, libro_sintetico):
+        """En el libro sintético ninguna serie tiene faltantes en su período"""
+        # Arrange
+        metadatos, datos = construir_modelo(libro_sintetico)
+
+        # Act
+        calidad = validar_modelo(metadatos, datos)
+
+        # Assert
+        assert len(calidad) == len(metadatos)
+        np.testing.assert_array_equal(calidad['observaciones'],
+                                      datos.groupby('clave_serie').size().to_numpy())
+        assert not calidad['excluida'].any()
+        assert calidad['encabezado_valido'].all()
+
+    def test_columnas_requeridas(self):
+        """Los datos sin las columnas de EXCEL_STRUCTURE['required_columns'] se rechazan"""
+        # Arrange
+        metadatos, datos = modelo_manual({'a': (list(range(3)), '2020-01-01', '2020-03-01')})
+
+        # Act / Assert
+        with pytest.raises(ValueError, match='valor'):
+            validar_modelo(metadatos, datos.drop(columns='valor'))
+
+
+class TestValidacionEnModeloCanonico:
+    """Tests para la validación durante la ingesta"""
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path):
+        with patch.dict(CACHE_CONFIG, {'directorio': str(tmp_path / 'cache')}):
+            yield
+
+    def test_excluye_series_sobre_el_umbral(self, libro_sintetico):
+        """Las series marcadas como excluidas no llegan al modelo canónico"""
+        # Arrange
+        original = validar_modelo
+
+        def con_exclusion(metadatos, datos, umbral=None):
+            calidad = original(metadatos, datos, umbral)
+            calidad.loc[:4, 'excluida'] = True
+            return calidad
+
+        # Act
+        with patch.object(validacion, 'validar_modelo', con_exclusion):
+            metadatos, datos = cargar_modelo_canonico(libro_sintetico)
+
+        # Assert
+        excluidas = reporte_calidad().loc[:4, 'id_serie']
+        assert not metadatos['id_serie'].isin(excluidas).any()
+        assert not datos['id_serie'].isin(excluidas).any()
+
+    def test_tabla_desde_cache(self, libro_sintetico):
+        """La tabla de calidad se guarda y se recupera con el modelo en caché"""
+        # Arrange
+        cargar_modelo_canonico(libro_sintetico)
+        esperada = reporte_calidad()
+        validacion.ULTIMA_CALIDAD.clear()
+
+        # Act
+        with patch.object(validacion, 'validar_modelo') as validar:
+            cargar_modelo_canonico(libro_sintetico)
+
+        # Assert
+        validar.assert_not_called()
+        pd.testing.assert_frame_equal(reporte_calidad(), esperada, check_dtype=False)
@@ -5,9 +5,38 @@ Callbacks para los gráficos del dashboard
 import plotly.express as px
 import plotly.graph_objects as go
 from dash import Input, Output
+from src.almacen_series import AlmacenSeries
+from src.catalogo import COLUMNAS_CATALOGO
+from src.consulta import Consulta
 
-def setup_chart_callbacks(app, datos):
-    """Configura los callbacks para los gráficos"""
+def setup_chart_callbacks(app, datos, series=None, almacen=None):
+    """
+    Configura los callbacks para los gráficos.
+
+    Cada gráfico se arma con una Consulta sobre un AlmacenSeries: los
+    filtros por tipo, categoría y fechas se resuelven por clave y por
+    búsqueda binaria, y los resúmenes agregan solo las columnas que usan.
+    En carga diferida (series de SeriesDiferidas y datos en None) cada
+    actualización trae solo las series del tipo y la categoría elegidos y
+    consulta un almacén armado con ellas, por lo que los resúmenes cubren esa
+    selección. Sin almacen ni series, el almacén se arma una vez con datos.
+    """
+    if almacen is None and series is None:
+        # Una fila por serie con las columnas de metadatos que datos trae
+        metadatos = datos[datos['clave_serie'] >= 0].drop_duplicates('clave_serie')
+        metadatos = metadatos.reindex(columns=COLUMNAS_CATALOGO + ['clave_serie'])
+        almacen = AlmacenSeries.desde_modelo(metadatos, datos)
+    
+    def consulta_de(tipo_seleccionado, categoria_seleccionada):
+        """Consulta sobre las series disponibles para la selección actual"""
+        if almacen is not None:
+            return Consulta(almacen)
+        catalogo = series.metadatos
+        seleccion = catalogo[
+            (catalogo['tipo'] == tipo_seleccionado) |
+            (catalogo['categoria'] == categoria_seleccionada)
+        ]
+        return Consulta.desde_modelo(catalogo, series.obtener_datos(seleccion['id_serie']))
     
     @app.callback(
         [Output('grafico-series-temporales', 'figure'),
@@ -23,17 +52,13 @@ def setup_chart_callbacks(app, datos):
     def actualizar_graficos(tipo_seleccionado, categoria_seleccionada, fecha_inicio, fecha_fin):
         """Actualiza todos los gráficos basado en las selecciones"""
         # Filtrar datos según selecciones
-        datos_filtrados = datos.copy()
-        
+        consulta = consulta_de(tipo_seleccionado, categoria_seleccionada)
         if fecha_inicio and fecha_fin:
-            datos_filtrados = datos_filtrados[
-                (datos_filtrados['fecha'] >= fecha_inicio) &
-                (datos_filtrados['fecha'] <= fecha_fin)
-            ]
+            consulta = consulta.filtrar(desde=fecha_inicio, hasta=fecha_fin)
         
         # Gráfico de series temporales
         fig_temporal = px.line(
-            datos_filtrados[datos_filtrados['tipo'] == tipo_seleccionado],
+            consulta.filtrar(tipo=tipo_seleccionado).seleccionar('id_serie', 'fecha', 'valor').a_dataframe(),
             x='fecha', y='valor', color='id_serie',
             title=f'📈 Series Temporales - Tipo: {tipo_seleccionado}',
             labels={'fecha': 'Fecha', 'valor': 'Valor'}
@@ -41,11 +66,9 @@ def setup_chart_callbacks(app, datos):
         fig_temporal.update_layout(showlegend=False)
         
         # Distribución por tipos
-        resumen_tipos = datos_filtrados.groupby('tipo').agg({
-            'id_serie': 'nunique',
-            'valor': 'count'
-        }).reset_index()
-        resumen_tipos.columns = ['tipo', 'series', 'registros']
+        resumen_tipos = consulta.agrupar('tipo').agregar(
+            series=('clave_serie', 'nunique'), registros=('valor', 'count')
+        ).reset_index()
         
         fig_tipos = px.bar(
             resumen_tipos, x='tipo', y='registros',
@@ -54,11 +77,9 @@ def setup_chart_callbacks(app, datos):
         )
         
         # Distribución por categorías
-        resumen_cats = datos_filtrados.groupby('categoria').agg({
-            'id_serie': 'nunique',
-            'valor': 'count'
-        }).reset_index()
-        resumen_cats.columns = ['categoria', 'series', 'registros']
+        resumen_cats = consulta.agrupar('categoria').agregar(
+            series=('clave_serie', 'nunique'), registros=('valor', 'count')
+        ).reset_index()
         
         fig_cats = px.pie(
             resumen_cats, values='registros', names='categoria',
@@ -67,16 +88,18 @@ def setup_chart_callbacks(app, datos):
         
         # Boxplot por categoría
         fig_box = px.box(
-            datos_filtrados[datos_filtrados['categoria'] == categoria_seleccionada],
+            consulta.filtrar(categoria=categoria_seleccionada).seleccionar('tipo', 'valor').a_dataframe(),
             x='tipo', y='valor',
             title=f'📦 Distribución de Valores - Categoría: {categoria_seleccionada}'
         )
         
-        # Matriz de correlación
-        pivot_data = datos_filtrados.pivot_table(
-            index='fecha', columns='tipo', values='valor', aggfunc='mean'
+        # Matriz de correlación entre las medias diarias de cada tipo. Se agrupa
+        # la consulta en lugar de armar la matriz alineada del almacén, que
+        # ocupa fechas × series; los tipos sin valores quedan fuera
+        correlacion = (
+            consulta.agrupar('tipo', frecuencia='D').agregar('mean')
+            .unstack('tipo').dropna(axis=1, how='all').corr()
         )
-        correlacion = pivot_data.corr()
         
         fig_corr = px.imshow(
             correlacion,
@@ -84,4 +107,4 @@ def setup_chart_callbacks(app, datos):
             color_continuous_scale='RdBu'
         )
         
-        return fig_temporal, fig_tipos, fig_cats, fig_box, fig_corr 
\ No newline at end of file
+        return fig_temporal, fig_tipos, fig_cats, fig_box, fig_corr
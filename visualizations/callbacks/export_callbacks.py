@@ -6,8 +6,13 @@ import dash
 from dash import Input, Output
 from src.reportes import GeneradorReportes
 
-def setup_export_callbacks(app, datos, metadatos):
-    """Configura los callbacks para la exportación de reportes"""
+def setup_export_callbacks(app, datos, metadatos, series=None, almacen=None):
+    """
+    Configura los callbacks para la exportación de reportes.
+
+    En carga diferida los reportes necesitan todas las series: se leen al
+    exportar con series.cargar_todas(), sin ocupar el LRU.
+    """
     
     @app.callback(
         Output('alert-exportacion', 'children'),
@@ -29,7 +34,8 @@ def setup_export_callbacks(app, datos, metadatos):
         
         try:
             # Inicializar generador de reportes
-            generador = GeneradorReportes(datos, metadatos)
+            datos_reporte = series.cargar_todas() if series is not None else datos
+            generador = GeneradorReportes(datos_reporte, metadatos, almacen)
             
             if button_id == 'btn-pdf':
                 ruta = generador.generar_pdf()
@@ -11,6 +11,22 @@ class Controls:
     @staticmethod
     def create(datos):
         """Crea los controles del dashboard"""
+        return Controls._crear(
+            datos['tipo'].unique(), datos['categoria'].unique(),
+            datos['fecha'].min(), datos['fecha'].max()
+        )
+    
+    @staticmethod
+    def create_desde_catalogo(metadatos):
+        """Crea los controles a partir del catálogo, sin cargar las observaciones"""
+        return Controls._crear(
+            metadatos['tipo'].unique(), metadatos['categoria'].unique(),
+            metadatos['fecha_inicio'].min(), metadatos['fecha_fin'].max()
+        )
+    
+    @staticmethod
+    def _crear(tipos, categorias, fecha_min, fecha_max):
+        """Arma los controles con las opciones y el rango de fechas dados"""
         return dbc.Container([
             # Controles de selección
             dbc.Row([
@@ -18,8 +34,8 @@ class Controls:
                     html.Label("Seleccionar Tipo:", className="fw-bold"),
                     dcc.Dropdown(
                         id='dropdown-tipo',
-                        options=[{'label': t, 'value': t} for t in datos['tipo'].unique()],
-                        value=datos['tipo'].unique()[0],
+                        options=[{'label': t, 'value': t} for t in tipos],
+                        value=tipos[0],
                         clearable=False
                     )
                 ], width=3),
@@ -27,8 +43,8 @@ class Controls:
                     html.Label("Seleccionar Categoría:", className="fw-bold"),
                     dcc.Dropdown(
                         id='dropdown-categoria',
-                        options=[{'label': c, 'value': c} for c in datos['categoria'].unique()],
-                        value=datos['categoria'].unique()[0],
+                        options=[{'label': c, 'value': c} for c in categorias],
+                        value=categorias[0],
                         clearable=False
                     )
                 ], width=3),
@@ -36,8 +52,8 @@ class Controls:
                     html.Label("Rango de Fechas:", className="fw-bold"),
                     dcc.DatePickerRange(
                         id='date-picker-range',
-                        start_date=datos['fecha'].min(),
-                        end_date=datos['fecha'].max(),
+                        start_date=fecha_min,
+                        end_date=fecha_max,
                         display_format='DD/MM/YYYY'
                     )
                 ], width=3),
@@ -10,7 +10,9 @@ class Metrics:
     
     @staticmethod
     def create(metadatos, datos):
-        """Crea las métricas principales del dashboard"""
+        """Crea las métricas principales del dashboard (datos es None en carga diferida)"""
+        referencia = metadatos if datos is None else datos
+        registros = "Bajo demanda" if datos is None else f"{len(datos):,}"
         return dbc.Container([
             dbc.Row([
                 dbc.Col([
@@ -24,7 +26,7 @@ class Metrics:
                 dbc.Col([
                     dbc.Card([
                         dbc.CardBody([
-                            html.H4(f"{len(datos):,}", className="card-title text-success"),
+                            html.H4(registros, className="card-title text-success"),
                             html.P("Registros Totales", className="card-text")
                         ])
                     ])
@@ -32,7 +34,7 @@ class Metrics:
                 dbc.Col([
                     dbc.Card([
                         dbc.CardBody([
-                            html.H4(f"{datos['tipo'].nunique()}", className="card-title text-info"),
+                            html.H4(f"{referencia['tipo'].nunique()}", className="card-title text-info"),
                             html.P("Tipos Únicos", className="card-text")
                         ])
                     ])
@@ -40,7 +42,7 @@ class Metrics:
                 dbc.Col([
                     dbc.Card([
                         dbc.CardBody([
-                            html.H4(f"{datos['categoria'].nunique()}", className="card-title text-warning"),
+                            html.H4(f"{referencia['categoria'].nunique()}", className="card-title text-warning"),
                             html.P("Categorías Únicas", className="card-text")
                         ])
                     ])
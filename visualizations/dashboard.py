@@ -19,8 +19,9 @@ from dash import dcc, html, Input, Output, callback, State
 import dash_bootstrap_components as dbc
 
 # Cargar módulos del proyecto
-from src.analizar_series import construir_modelo
-from src.utils import limpiar_dataframe
+from src.almacen_series import AlmacenSeries
+from src.consulta import Consulta
+from src.modelo import cargar_modelo_canonico
 from src.reportes import GeneradorReportes
 
 # Configuración global
@@ -44,23 +45,11 @@ class SeriesTemporalesDashboard:
             # Verificar si el archivo existe
             if os.path.exists(ARCHIVO_EXCEL):
                 print("🔄 Cargando datos...")
-                self.metadatos, self.datos = construir_modelo(ARCHIVO_EXCEL)
+                # Series válidas, limpias y con tipo y categoría
+                self.metadatos, self.datos = cargar_modelo_canonico(ARCHIVO_EXCEL)
                 
-                # Limpiar datos
-                self.datos = limpiar_dataframe(self.datos)
-                self.metadatos = self.metadatos.dropna(subset=['tipo', 'categoria'])
-                
-                # Filtrar series válidas
-                series_validas = self.metadatos['id_serie'].unique()
-                self.datos = self.datos[self.datos['id_serie'].isin(series_validas)]
-                
-                # Agregar información de tipo y categoría a los datos
-                self.datos['tipo'] = self.datos['id_serie'].map(
-                    self.metadatos.set_index('id_serie')['tipo']
-                )
-                self.datos['categoria'] = self.datos['id_serie'].map(
-                    self.metadatos.set_index('id_serie')['categoria']
-                )
+                # Índice por serie y fecha para las consultas de los gráficos
+                self.almacen = AlmacenSeries.desde_modelo(self.metadatos, self.datos)
                 
                 self.data_loaded = True
                 print("✅ Datos cargados correctamente")
@@ -236,18 +225,14 @@ class SeriesTemporalesDashboard:
              Input('date-picker-range', 'end_date')]
         )
         def actualizar_graficos(tipo_seleccionado, categoria_seleccionada, fecha_inicio, fecha_fin):
-            # Filtrar datos según selecciones
-            datos_filtrados = self.datos.copy()
-            
+            # Filtrar datos según selecciones (consulta sobre el almacén)
+            consulta = Consulta(self.almacen)
             if fecha_inicio and fecha_fin:
-                datos_filtrados = datos_filtrados[
-                    (datos_filtrados['fecha'] >= fecha_inicio) &
-                    (datos_filtrados['fecha'] <= fecha_fin)
-                ]
+                consulta = consulta.filtrar(desde=fecha_inicio, hasta=fecha_fin)
             
             # Gráfico de series temporales
             fig_temporal = px.line(
-                datos_filtrados[datos_filtrados['tipo'] == tipo_seleccionado],
+                consulta.filtrar(tipo=tipo_seleccionado).seleccionar('id_serie', 'fecha', 'valor').a_dataframe(),
                 x='fecha', y='valor', color='id_serie',
                 title=f'📈 Series Temporales - Tipo: {tipo_seleccionado}',
                 labels={'fecha': 'Fecha', 'valor': 'Valor'}
@@ -255,11 +240,9 @@ class SeriesTemporalesDashboard:
             fig_temporal.update_layout(showlegend=False)
             
             # Distribución por tipos
-            resumen_tipos = datos_filtrados.groupby('tipo').agg({
-                'id_serie': 'nunique',
-                'valor': 'count'
-            }).reset_index()
-            resumen_tipos.columns = ['tipo', 'series', 'registros']
+            resumen_tipos = consulta.agrupar('tipo').agregar(
+                series=('clave_serie', 'nunique'), registros=('valor', 'count')
+            ).reset_index()
             
             fig_tipos = px.bar(
                 resumen_tipos, x='tipo', y='registros',
@@ -268,11 +251,9 @@ class SeriesTemporalesDashboard:
             )
             
             # Distribución por categorías
-            resumen_cats = datos_filtrados.groupby('categoria').agg({
-                'id_serie': 'nunique',
-                'valor': 'count'
-            }).reset_index()
-            resumen_cats.columns = ['categoria', 'series', 'registros']
+            resumen_cats = consulta.agrupar('categoria').agregar(
+                series=('clave_serie', 'nunique'), registros=('valor', 'count')
+            ).reset_index()
             
             fig_cats = px.pie(
                 resumen_cats, values='registros', names='categoria',
@@ -281,16 +262,16 @@ class SeriesTemporalesDashboard:
             
             # Boxplot por categoría
             fig_box = px.box(
-                datos_filtrados[datos_filtrados['categoria'] == categoria_seleccionada],
+                consulta.filtrar(categoria=categoria_seleccionada).seleccionar('tipo', 'valor').a_dataframe(),
                 x='tipo', y='valor',
                 title=f'📦 Distribución de Valores - Categoría: {categoria_seleccionada}'
             )
             
-            # Matriz de correlación
-            pivot_data = datos_filtrados.pivot_table(
-                index='fecha', columns='tipo', values='valor', aggfunc='mean'
+            # Matriz de correlación entre las medias diarias de cada tipo
+            correlacion = (
+                consulta.agrupar('tipo', frecuencia='D').agregar('mean')
+                .unstack('tipo').dropna(axis=1, how='all').corr()
             )
-            correlacion = pivot_data.corr()
             
             fig_corr = px.imshow(
                 correlacion,
@@ -320,7 +301,7 @@ class SeriesTemporalesDashboard:
             
             try:
                 # Inicializar generador de reportes
-                generador = GeneradorReportes(self.datos, self.metadatos)
+                generador = GeneradorReportes(self.datos, self.metadatos, self.almacen)
                 
                 if button_id == 'btn-pdf':
                     ruta = generador.generar_pdf()
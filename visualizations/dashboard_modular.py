@@ -17,7 +17,8 @@ from .utils import DataLoader
 class SeriesTemporalesDashboard:
     """Dashboard modular para análisis de series temporales"""
     
-    def __init__(self, archivo_excel='data/raw/Datos_Series_Leo.xlsx'):
+    def __init__(self, archivo_excel='data/raw/Datos_Series_Leo.xlsx', workers=None,
+                 usar_cache=True, compacto=None, carga_diferida=None):
         self.app = dash.Dash(
             __name__, 
             external_stylesheets=[dbc.themes.BOOTSTRAP],
@@ -25,7 +26,10 @@ class SeriesTemporalesDashboard:
         )
         
         # Inicializar cargador de datos
-        self.data_loader = DataLoader(archivo_excel)
+        self.data_loader = DataLoader(
+            archivo_excel, workers=workers, usar_cache=usar_cache, compacto=compacto,
+            carga_diferida=carga_diferida
+        )
         self.cargar_datos()
         self.setup_layout()
         self.setup_callbacks()
@@ -36,6 +40,8 @@ class SeriesTemporalesDashboard:
         if self.data_loaded:
             self.datos = self.data_loader.get_datos()
             self.metadatos = self.data_loader.get_metadatos()
+            self.series = self.data_loader.get_series()
+            self.almacen = self.data_loader.get_almacen()
     
     def setup_layout(self):
         """Configura el layout de la aplicación"""
@@ -47,7 +53,8 @@ class SeriesTemporalesDashboard:
         # Layout completo con datos
         self.app.layout = dbc.Container([
             Header.create(),
-            Controls.create(self.datos),
+            Controls.create_desde_catalogo(self.metadatos) if self.series is not None
+            else Controls.create(self.datos),
             Metrics.create(self.metadatos, self.datos),
             Charts.create()
         ], fluid=True)
@@ -58,10 +65,10 @@ class SeriesTemporalesDashboard:
             return
         
         # Configurar callbacks de gráficos
-        setup_chart_callbacks(self.app, self.datos)
+        setup_chart_callbacks(self.app, self.datos, self.series, self.almacen)
         
         # Configurar callbacks de exportación
-        setup_export_callbacks(self.app, self.datos, self.metadatos)
+        setup_export_callbacks(self.app, self.datos, self.metadatos, self.series, self.almacen)
     
     def run(self, debug=True, host='127.0.0.1', port=8050):
         """Ejecuta la aplicación"""
@@ -2,45 +2,59 @@
 Utilidad para cargar y procesar datos del dashboard
 """
 
-import os
 import sys
 sys.path.append('../src')
 
-from src.analizar_series import construir_modelo
-from src.utils import limpiar_dataframe
+from src.almacen_series import AlmacenSeries, abrir_almacen_compartido
+from src.carga_diferida import SeriesDiferidas
+from src.config import DASHBOARD_CONFIG
+from src.ingesta_multiple import es_origen_multiple, resolver_libros
+from src.modelo import cargar_modelo_canonico
 
 class DataLoader:
     """Clase para cargar y procesar datos del dashboard"""
     
-    def __init__(self, archivo_excel='data/raw/Datos_Series_Leo.xlsx'):
+    def __init__(self, archivo_excel='data/raw/Datos_Series_Leo.xlsx', workers=None,
+                 usar_cache=True, compacto=None, carga_diferida=None, almacen_compartido=None):
         self.archivo_excel = archivo_excel
+        self.workers = workers
+        self.usar_cache = usar_cache
+        self.compacto = compacto
+        if carga_diferida is None:
+            carga_diferida = DASHBOARD_CONFIG['carga_diferida']
+        self.carga_diferida = carga_diferida
+        if almacen_compartido is None:
+            almacen_compartido = DASHBOARD_CONFIG['almacen_compartido']
+        self.almacen_compartido = almacen_compartido and usar_cache
         self.metadatos = None
         self.datos = None
+        self.series = None
+        self.almacen = None
         self.data_loaded = False
     
     def cargar_datos(self):
         """Carga y procesa los datos"""
         try:
             # Verificar si el archivo existe
-            if os.path.exists(self.archivo_excel):
+            if resolver_libros(self.archivo_excel) and self.carga_diferida:
+                if not es_origen_multiple(self.archivo_excel):
+                    return self._cargar_catalogo()
+                print("⚠️ La carga diferida admite un solo libro; se cargan todos los datos")
+            
+            if resolver_libros(self.archivo_excel):
                 print("🔄 Cargando datos...")
-                self.metadatos, self.datos = construir_modelo(self.archivo_excel)
-                
-                # Limpiar datos
-                self.datos = limpiar_dataframe(self.datos)
-                self.metadatos = self.metadatos.dropna(subset=['tipo', 'categoria'])
-                
-                # Filtrar series válidas
-                series_validas = self.metadatos['id_serie'].unique()
-                self.datos = self.datos[self.datos['id_serie'].isin(series_validas)]
-                
-                # Agregar información de tipo y categoría a los datos
-                self.datos['tipo'] = self.datos['id_serie'].map(
-                    self.metadatos.set_index('id_serie')['tipo']
-                )
-                self.datos['categoria'] = self.datos['id_serie'].map(
-                    self.metadatos.set_index('id_serie')['categoria']
-                )
+                if self.almacen_compartido:
+                    # Todos los workers mapean los mismos archivos: una sola copia en memoria
+                    self.almacen = abrir_almacen_compartido(
+                        self.archivo_excel, self._construir_modelo, compacto=self.compacto
+                    )
+                    self.metadatos = self.almacen.metadatos
+                    self.datos = self.almacen.a_dataframe_compartido(columnas=('tipo', 'categoria'))
+                else:
+                    self.metadatos, self.datos = self._construir_modelo()
+                    
+                    # Copia por serie en arreglos contiguos para los filtros por tipo/categoría
+                    self.almacen = AlmacenSeries.desde_modelo(self.metadatos, self.datos)
                 
                 self.data_loaded = True
                 print("✅ Datos cargados correctamente")
@@ -54,10 +68,35 @@ class DataLoader:
             self.data_loaded = False
             return False
     
+    def _construir_modelo(self):
+        """Lee el modelo canónico: series válidas con tipo y categoría (ver src.modelo)"""
+        return cargar_modelo_canonico(
+            self.archivo_excel, usar_cache=self.usar_cache, workers=self.workers,
+            compacto=self.compacto
+        )
+    
+    def _cargar_catalogo(self):
+        """Carga solo el catálogo; las series se leen al pedirlas (ver SeriesDiferidas)"""
+        print("🔄 Cargando catálogo de series (carga diferida)...")
+        self.series = SeriesDiferidas(self.archivo_excel)
+        self.metadatos = self.series.metadatos
+        self.datos = None
+        self.data_loaded = True
+        print(f"✅ Catálogo cargado: {len(self.metadatos)} series")
+        return True
+    
     def get_datos(self):
-        """Retorna los datos procesados"""
+        """Retorna los datos procesados (None en carga diferida)"""
         return self.datos
     
+    def get_almacen(self):
+        """Retorna el AlmacenSeries de los datos (None en carga diferida)"""
+        return self.almacen
+    
+    def get_series(self):
+        """Retorna el acceso diferido a las series (None si se cargó todo)"""
+        return self.series
+    
     def get_metadatos(self):
         """Retorna los metadatos procesados"""
         return self.metadatos